@@ -0,0 +1,33 @@
+import json
+import os
+
+# Thin client for advisor_service.py. Scripts call query() first and fall back to
+# fetching directly when it returns None (service not running, disabled or failing).
+# QIUQIU_ADVISOR_URL (or QIUQIU_ADVISOR_PORT) overrides the address; QIUQIU_ADVISOR=off skips the service.
+# A non-2xx answer (e.g. 409: the service runs with a different DCA config) also returns None.
+# A slow answer too, after TIMEOUT_S (QIUQIU_ADVISOR_TIMEOUT_S): the fallback fetch still has
+# to fit in the caller's time, so a hung service costs seconds, not the fetch's own timeouts.
+
+DEFAULT_URL = f"http://127.0.0.1:{os.getenv('QIUQIU_ADVISOR_PORT', '8765')}"
+TIMEOUT_S = float(os.getenv("QIUQIU_ADVISOR_TIMEOUT_S", "5"))
+
+
+def query(path: str, api_key: str | None = None, timeout: float = TIMEOUT_S, headers: dict | None = None):
+    if os.getenv("QIUQIU_ADVISOR", "").lower() in ("off", "0", "false"):
+        return None
+    import urllib.error
+    import urllib.request
+
+    url = os.getenv("QIUQIU_ADVISOR_URL", DEFAULT_URL).rstrip("/") + path
+    req = urllib.request.Request(url)
+    if api_key:
+        req.add_header("X-Api-Key", api_key)
+    for k, v in (headers or {}).items():
+        req.add_header(k, v)
+    try:
+        # urllib (not http_client) keeps this import-light and off the upstream rate limiters;
+        # it is imported here so importing the module (every script does) stays free
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            return json.loads(r.read().decode("utf-8"))
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
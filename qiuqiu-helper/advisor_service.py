@@ -0,0 +1,198 @@
+import datetime as dt
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import dca_daily_report as dca
+import metrics
+from crypto_pulse import fetch_pulse
+from get_coinglass_data import get_coinglass_data
+
+# Long-running local advisor for all skill invocations (localhost HTTP, JSON responses).
+# Each upstream datum has its own TTL cache, and concurrent identical requests collapse
+# into one upstream fetch (single-flight), so many agent sessions share the same calls.
+#   GET /dca        -> {"report": "..."}   (today's memo once decided, see dca_daily_report.py)
+#   GET /dca/intraday -> {"report": "..."}  today's decision + live spot / Ahr999
+#     (409 when the client's X-Qiuqiu-Dca-Config differs from this service's: the client
+#      then runs the report itself against its own tracker)
+#   GET /ahr999     -> {"value", "gma200", "expPrice", "expA", "expB", "expFit", "price", "priceSource"}
+#   GET /pulse      -> crypto_pulse.fetch_pulse() data   (key: X-Api-Key or CG_API_KEY)
+#   GET /coinglass  -> get_coinglass_data() snapshot     (key: X-Api-Key or COINGLASS_API_KEY)
+#   GET /health
+# Usage: python3 advisor_service.py [port]   (default 8765, or QIUQIU_ADVISOR_PORT)
+
+DEFAULT_PORT = 8765
+
+# Seconds each datum stays fresh
+TTL_SPOT = 15
+TTL_GMA200 = 3600
+TTL_MVRV = 3600
+TTL_PULSE = 15
+TTL_COINGLASS = 60
+
+
+class SingleFlightCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}  # key -> (expires_at, value)
+        self.inflight = {}  # key -> (Event, result holder)
+
+    def get(self, key, ttl: float, fn):
+        with self.lock:
+            hit = self.entries.get(key)
+            if hit and hit[0] > time.monotonic():
+                return hit[1]
+            flight = self.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = (threading.Event(), {})
+                self.inflight[key] = flight
+
+        event, holder = flight
+        if not leader:
+            event.wait()
+            if "error" in holder:
+                raise holder["error"]
+            return holder["value"]
+
+        try:
+            value = fn()
+            holder["value"] = value
+            with self.lock:
+                now = time.monotonic()
+                # expired entries go too (date-keyed ones would otherwise pile up)
+                self.entries = {k: e for k, e in self.entries.items() if e[0] > now}
+                self.entries[key] = (now + ttl, value)
+            return value
+        except Exception as e:
+            holder["error"] = e  # failures are shared with waiters but not cached
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+            event.set()
+
+
+cache = SingleFlightCache()
+
+
+def cached_spot():
+    return cache.get("spot", TTL_SPOT, dca.fetch_btc_spot)
+
+
+def cached_gma200():
+    # Keyed by UTC date: yesterday's state must not decide (and be recorded for) a new day
+    today = dt.datetime.utcnow().date().isoformat()
+    return cache.get(("gma200", today), TTL_GMA200, dca.sync_gma200_state)
+
+
+def cached_mvrv():
+    return cache.get("mvrv", TTL_MVRV, lambda: dca.fetch_mvrv_zscore_last(1))
+
+
+def handle_dca(api_key, intraday: bool = False):
+    # Traced like a direct run; cache hits show up as near-zero fetch stages.
+    # Once today is decided, the same-day memo is served (intraday: plus a live spot view),
+    # traced as "dca_cached" so the last full run's export stays in place.
+    memo = dca.load_today_result()
+    if memo:
+        with metrics.trace("dca_cached"):
+            return {"report": dca.intraday_report(memo, cached_spot) if intraday else dca.render_memo(memo, cached=True)}
+    with metrics.trace("dca"):
+        inputs = dca.fetch_market_inputs(cached_spot, cached_gma200, cached_mvrv)
+        return {"report": dca.build_dca_report(inputs)}
+
+
+def handle_ahr999(api_key):
+    spot = cached_spot()
+    res = dca.ahr999_from_state(cached_gma200(), spot["price"])
+    return {
+        "value": res["value"],
+        "gma200": res["gma200"],
+        "expPrice": res["expPrice"],
+        "expA": res["expA"],
+        "expB": res["expB"],
+        "expFit": res["expFit"],
+        "price": spot["price"],
+        "priceSource": spot["venue"],
+    }
+
+
+def handle_pulse(api_key):
+    key = api_key or os.getenv("CG_API_KEY")
+    return cache.get(("pulse", key), TTL_PULSE, lambda: fetch_pulse(key))
+
+
+def handle_coinglass(api_key):
+    key = api_key or os.getenv("COINGLASS_API_KEY")
+
+    def fetch():
+        res = get_coinglass_data(key)
+        if res is None:
+            raise RuntimeError("CoinGlass fetch failed")
+        return res
+
+    return cache.get(("coinglass", key), TTL_COINGLASS, fetch)
+
+
+ROUTES = {
+    "/dca": handle_dca,
+    "/dca/intraday": lambda api_key: handle_dca(api_key, intraday=True),
+    "/ahr999": handle_ahr999,
+    "/pulse": handle_pulse,
+    "/coinglass": handle_coinglass,
+    "/health": lambda api_key: {"ok": True},
+}
+
+
+class AdvisorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        handler = ROUTES.get(urlsplit(self.path).path)
+        if handler is None:
+            return self._send(404, {"error": "not found"})
+        want = self.headers.get(dca.DCA_CONFIG_HEADER)
+        if want and want != dca.config_fingerprint():
+            return self._send(409, {"error": "DCA config differs from the service's"})
+        try:
+            body = handler(self.headers.get("X-Api-Key"))
+        except Exception as e:
+            return self._send(502, {"error": str(e)})
+        self._send(200, body)
+
+    def _send(self, code: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve(port: int | None = None):
+    port = port or int(os.getenv("QIUQIU_ADVISOR_PORT", str(DEFAULT_PORT)))
+    server = ThreadingHTTPServer(("127.0.0.1", port), AdvisorHandler)
+    server.daemon_threads = True
+    print(f"qiuqiu advisor listening on http://127.0.0.1:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import csv
+import datetime as dt
+import sys
+
+import numpy as np
+
+from btc_model import GENESIS, exp_params
+
+# Full-history Ahr999 backfill (vectorized).
+# Same formulas as ahr999_selfcalc() / gma() / exp_price(), evaluated for every day at once:
+# - GMA200 from a cumulative log-sum: sum(ln p[i-199..i]) = cs[i+1] - cs[i-199]
+# - ExpPrice = 10 ** (A * log10(days_since_genesis) + B), with exp_params()' (a, b) unless given
+# Usage: python3 ahr999_backfill.py [closes.csv] > ahr999_history.csv  (CSV columns: date,close;
+# without a CSV the local price history store is used, see price_history.py)
+
+
+def dated_closes_to_array(dated_closes):
+    # [(date, close), ...] -> (start_date, contiguous daily array with NaN for missing days)
+    dated_closes = sorted(dated_closes)
+    start = dated_closes[0][0]
+    n = (dated_closes[-1][0] - start).days + 1
+    closes = np.full(n, np.nan)
+    for d, p in dated_closes:
+        closes[(d - start).days] = p
+    return start, closes
+
+
+def rolling_gma_array(p, window: int = 200):
+    # Trailing geometric mean over the last axis (1-D series or assets x days).
+    # gma() skips missing / non-positive closes, so the mean is over valid days only;
+    # positions before a full window are NaN.
+    p = np.asarray(p, dtype=np.float64)
+    n = p.shape[-1]
+    with np.errstate(invalid="ignore"):
+        valid = p > 0
+    logs = np.log(np.where(valid, p, 1.0))
+    pad = [(0, 0)] * (p.ndim - 1) + [(1, 0)]
+    cs = np.pad(np.cumsum(logs, axis=-1), pad)
+    cn = np.pad(np.cumsum(valid, axis=-1), pad)
+
+    idx = np.arange(n)
+    lo = np.maximum(idx + 1 - window, 0)
+    log_sum = cs[..., idx + 1] - cs[..., lo]
+    count = cn[..., idx + 1] - cn[..., lo]
+
+    out = np.full(p.shape, np.nan)
+    ok = (idx >= window - 1) & (count > 0)
+    out[ok] = np.exp(log_sum[ok] / count[ok])
+    return out
+
+
+def backfill_ahr999(closes, start: dt.date = GENESIS, window: int = 200, a: float | None = None, b: float | None = None):
+    # closes: contiguous daily series starting at `start`
+    # Returns NumPy arrays aligned with `closes`; days without a full window are NaN.
+    if a is None or b is None:
+        fa, fb, _ = exp_params()
+        a = fa if a is None else a
+        b = fb if b is None else b
+    p = np.asarray(closes, dtype=np.float64)
+    n = p.shape[0]
+    valid = p > 0
+    idx = np.arange(n)
+    gma200 = rolling_gma_array(p, window)
+
+    days = (start - GENESIS).days + idx
+    exp_p = np.full(n, np.nan)
+    pos = days > 0
+    exp_p[pos] = 10 ** (a * np.log10(days[pos]) + b)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ahr = (p / gma200) * (p / exp_p)
+    ahr[~valid] = np.nan
+
+    return {
+        "days": days,
+        "gma200": gma200,
+        "expPrice": exp_p,
+        "ahr999": ahr,
+    }
+
+
+def main():
+    if len(sys.argv) < 2:
+        # Already a contiguous daily array from GENESIS
+        import price_history
+        start, closes = GENESIS, price_history.column("close")
+        if not len(closes):
+            print("Error: no local price history (run: price_history.py sync / import)")
+            return
+    else:
+        with open(sys.argv[1], newline="", encoding="utf-8") as f:
+            dated = [(dt.date.fromisoformat(row["date"]), float(row["close"])) for row in csv.DictReader(f)]
+        if not dated:
+            print("Error: no closes in input")
+            return
+        start, closes = dated_closes_to_array(dated)
+    res = backfill_ahr999(closes, start)
+
+    w = csv.writer(sys.stdout)
+    w.writerow(["date", "close", "gma200", "expPrice", "ahr999"])
+    for i in range(closes.shape[0]):
+        w.writerow([
+            (start + dt.timedelta(days=i)).isoformat(),
+            f"{closes[i]:.2f}",
+            f"{res['gma200'][i]:.2f}",
+            f"{res['expPrice'][i]:.2f}",
+            f"{res['ahr999'][i]:.4f}",
+        ])
+
+
+if __name__ == "__main__":
+    main()
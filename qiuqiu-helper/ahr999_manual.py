@@ -1,13 +1,13 @@
-import requests
 import datetime
-import math
 import sys
 
+from btc_model import ahr999_value, exp_price
+from get_crypto_price_v2 import fetch_btc_spot_coinbase
+
 def calculate_ahr999_manual():
     # 1. Get current BTC price from Coinbase
     try:
-        cb_res = requests.get("https://api.coinbase.com/v2/prices/BTC-USD/spot", timeout=5)
-        price = float(cb_res.json()['data']['amount'])
+        price = fetch_btc_spot_coinbase(timeout=5)
     except:
         return "Error: Could not get BTC price"
 
@@ -15,23 +15,19 @@ def calculate_ahr999_manual():
     # Ahr999 Index = (price / 200d_GMA) * (price / Exp_Price)
     # Exp_Price = 10^(5.84*log10(days_since_genesis) - 17.01)
     
-    genesis_date = datetime.datetime(2009, 1, 3)
-    today = datetime.datetime.now()
-    days_passed = (today - genesis_date).days
-    
-    # Logistic Regression fitting for BTC long term growth
-    exp_price = math.pow(10, 5.84 * math.log10(days_passed) - 17.01)
+    # Logistic Regression fitting for BTC long term growth (btc_model.py)
+    exp_p = exp_price(datetime.date.today())
     
     # For a real hard-core calculation, we need 200 days of closing prices.
     # Here we provide a snapshot estimate based on current market data.
     # Estimated GMA200 for Feb 2026 based on previous rally: ~$68,000
     gma_200_est = 68500 
     
-    ahr999 = (price / gma_200_est) * (price / exp_price)
+    ahr999 = ahr999_value(price, gma_200_est, exp_p)
     
     print(f"--- Qiuqiu Manual Ahr999 Estimate ---")
     print(f"BTC Price:   ${price:,.2f}")
-    print(f"Exp Price:   ${exp_price:,.2f}")
+    print(f"Exp Price:   ${exp_p:,.2f}")
     print(f"Ahr999 Val:  {ahr999:.4f}")
     
     if ahr999 < 0.45:
@@ -1,79 +1,50 @@
-import math
 import datetime as dt
-import requests
+import advisor_client
 
-# Self-calculated Ahr999 (B option): fixed regression parameters for ExpPrice
-# Reference form used widely online:
-# ExpPrice = 10^(a*log10(days_since_genesis) + b)
-# with a=5.84, b=-17.01
-A = 5.84
-B = -17.01
+from btc_model import A_EXP, B_EXP, ahr999_value, exp_params, exp_price
+from exp_fit import sync_exp_fit
+from get_crypto_price_v2 import fetch_btc_spot_coinbase
+from price_history import recent_closes, recent_dated_closes
+from rolling_gma import sync_rolling_gma
 
-GENESIS = dt.date(2009, 1, 3)
-
-
-def gma(prices):
-    # geometric mean
-    s = 0.0
-    n = 0
-    for p in prices:
-        if p and p > 0:
-            s += math.log(p)
-            n += 1
-    return math.exp(s / n) if n else None
+# Self-calculated Ahr999 (B option): ExpPrice = 10^(a*log10(days_since_genesis) + b) with
+# the fixed regression parameters, or the least-squares fit once exp_fit.py has one
 
 
 def fetch_btc_daily_closes(days: int = 220):
-    # CoinGecko market_chart returns prices (ms, price) with hourly granularity for shorter windows,
-    # but for 200+ days it typically returns daily-ish points. We'll downsample by date.
-    url = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart"
-    params = {"vs_currency": "usd", "days": str(days), "interval": "daily"}
-    r = requests.get(url, params=params, timeout=15)
-    r.raise_for_status()
-    data = r.json().get("prices", [])
-
-    by_date = {}
-    for ts_ms, price in data:
-        d = dt.datetime.utcfromtimestamp(ts_ms / 1000).date()
-        by_date[d] = float(price)
-
-    # return sorted closes
-    closes = [by_date[d] for d in sorted(by_date.keys())]
-    return closes
-
+    # CoinGecko daily closes as a view of the local price history (price_history.py);
+    # only the days since the last sync are fetched
+    return recent_closes(days, timeout=15)
 
-def fetch_btc_spot_coinbase():
-    r = requests.get("https://api.coinbase.com/v2/prices/BTC-USD/spot", timeout=10)
-    r.raise_for_status()
-    return float(r.json()["data"]["amount"])
 
+def compute_ahr999():
+    today = dt.datetime.utcnow().date()
 
-def exp_price(today: dt.date):
-    days = (today - GENESIS).days
-    return 10 ** (A * math.log10(days) + B)
-
+    # Rolling GMA200 state shared with dca_daily_report.py (only new closes are pushed)
+    closes = recent_dated_closes(240, timeout=15)
+    state = sync_rolling_gma(closes)
+    sync_exp_fit(closes)
+    if not state.is_full():
+        raise RuntimeError(f"Not enough daily closes from CoinGecko: got {state.count}")
 
-def ahr999_value(price: float, gma200: float, exp_p: float):
-    return (price / gma200) * (price / exp_p)
+    gma200 = state.value()
+    p = fetch_btc_spot_coinbase(timeout=10)
+    a, b, fit = exp_params()
+    e = exp_price(today, (a, b))
+    return {"price": p, "priceSource": "Coinbase", "gma200": gma200, "expPrice": e, "expA": a, "expB": b, "expFit": fit,
+            "value": ahr999_value(p, gma200, e)}
 
 
 def main():
-    today = dt.datetime.utcnow().date()
-
-    closes = fetch_btc_daily_closes(240)
-    if len(closes) < 200:
-        raise RuntimeError(f"Not enough daily closes from CoinGecko: got {len(closes)}")
-
-    gma200 = gma(closes[-200:])
-    p = fetch_btc_spot_coinbase()
-    e = exp_price(today)
-    val = ahr999_value(p, gma200, e)
+    # Thin client: local advisor service first, direct fetch as fallback
+    res = advisor_client.query("/ahr999") or compute_ahr999()
 
     print("=== Ahr999 (Self-calc B) ===")
-    print(f"BTC spot (Coinbase): ${p:,.2f}")
-    print(f"GMA200 (CG daily):   ${gma200:,.2f}")
-    print(f"ExpPrice (fixed):    ${e:,.2f}  [a={A}, b={B}]")
-    print(f"Ahr999:              {val:.4f}")
+    print(f"BTC spot ({res.get('priceSource', 'Coinbase')}): ${res['price']:,.2f}")
+    print(f"GMA200 (CG daily):   ${res['gma200']:,.2f}")
+    fit = res.get("expFit", "fixed")
+    print(f"{'ExpPrice (' + fit + '):':<21}${res['expPrice']:,.2f}  [a={res.get('expA', A_EXP):.4g}, b={res.get('expB', B_EXP):.4g}]")
+    print(f"Ahr999:              {res['value']:.4f}")
 
 
 if __name__ == "__main__":
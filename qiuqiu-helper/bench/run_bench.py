@@ -0,0 +1,198 @@
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+from stub_server import StubServer  # noqa: E402
+
+# Benchmarks for the qiuqiu-helper entry points against the local upstream stub.
+# For each entry point it reports:
+# - cold start: wall time of a fresh `python3 <script>` with empty caches
+# - warm latency: p50/p90/p99 of in-process calls once caches are populated
+# - bytes transferred (stub response bodies) for the cold run and per warm call
+# Usage:
+#   python3 bench/run_bench.py                      # run and print
+#   python3 bench/run_bench.py --save-baseline      # record bench/baseline.json
+#   python3 bench/run_bench.py --check              # exit 1 if worse than baseline
+#   python3 bench/run_bench.py --config stub.json   # latency/error injection (see stub_server.py)
+
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+BENCH_KEY = "bench-key"
+
+# name: (script, argv, module, call)
+ENTRY_POINTS = {
+    # inputs passed in: the full pipeline, bypassing the same-day memo ("dca-memo")
+    "dca": ("dca_daily_report.py", [], "dca_daily_report", lambda m: m.get_dca_instruction(m.fetch_market_inputs())),
+    "dca-memo": ("dca_daily_report.py", [], "dca_daily_report", lambda m: m.get_dca_instruction()),
+    "pulse": ("crypto_pulse.py", [BENCH_KEY], "crypto_pulse", lambda m: m.fetch_pulse(BENCH_KEY)),
+    "ahr999": ("ahr999_selfcalc.py", [], "ahr999_selfcalc", lambda m: m.compute_ahr999()),
+    "coinglass": ("get_coinglass_data.py", [BENCH_KEY], "get_coinglass_data", lambda m: m.get_coinglass_data(BENCH_KEY)),
+}
+
+# Metrics compared against the baseline (lower is better)
+CHECKED = ("cold_start_ms", "p50_ms", "p90_ms", "cold_bytes", "warm_bytes_per_call")
+
+
+def percentile(values, q: float):
+    s = sorted(values)
+    if not s:
+        return None
+    k = max(0, min(len(s) - 1, int(round(q * (len(s) - 1)))))
+    return s[k]
+
+
+def bench_env(stub_url: str, cache_dir: str) -> dict:
+    return {
+        "QIUQIU_UPSTREAM_OVERRIDE": stub_url,
+        "QIUQIU_HTTP_NO_RATE_LIMIT": "1",
+        "QIUQIU_ADVISOR": "off",
+        "COINGLASS_API_KEY": BENCH_KEY,
+        "DCA_TRACKER_PATH": os.path.join(cache_dir, "dca_ammo_tracker.json"),
+        "DCA_RESULT_CACHE_PATH": os.path.join(cache_dir, "dca_today.json"),
+        "QIUQIU_LAST_GOOD_PATH": os.path.join(cache_dir, "qiuqiu_last_good.json"),
+        "QIUQIU_BREAKER_PATH": os.path.join(cache_dir, "http_breakers.json"),
+        "DCA_CLOSES_CACHE_PATH": os.path.join(cache_dir, "btc_daily_closes.json"),
+        "QIUQIU_PRICE_HISTORY_DIR": os.path.join(cache_dir, "btc_history"),
+        "QIUQIU_EXPFIT_STATE_PATH": os.path.join(cache_dir, "btc_expfit_state.json"),
+        "DCA_GMA_STATE_PATH": os.path.join(cache_dir, "btc_gma200_state.json"),
+        "DCA_SPOT_STATS_PATH": os.path.join(cache_dir, "spot_venue_stats.json"),
+        "COINGLASS_CACHE_DIR": os.path.join(cache_dir, "coinglass_cache"),
+        "QIUQIU_METRICS_JSONL": os.path.join(cache_dir, "qiuqiu_metrics.jsonl"),
+        "QIUQIU_METRICS_TEXTFILE_DIR": os.path.join(cache_dir, "textfile"),
+        "QIUQIU_TS_DIR": os.path.join(cache_dir, "timeseries"),
+    }
+
+
+def run_cold(stub: StubServer, script: str, argv, runs: int):
+    times, bytes_ = [], []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as d:
+            env = dict(os.environ)
+            env.update(bench_env(stub.url, d))
+            stub.reset_stats()
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(ROOT, script), *argv], cwd=ROOT, env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+            times.append((time.perf_counter() - t0) * 1000)
+            bytes_.append(stub.snapshot()["bytes"])
+    return percentile(times, 0.5), percentile(bytes_, 0.5)
+
+
+def run_warm(stub: StubServer, module: str, call, iterations: int, cache_dir: str):
+    os.environ.update(bench_env(stub.url, cache_dir))
+    m = importlib.import_module(module)
+    call(m)  # populate caches / connection pools
+    stub.reset_stats()
+    times = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        call(m)
+        times.append((time.perf_counter() - t0) * 1000)
+    snap = stub.snapshot()
+    return {
+        "p50_ms": percentile(times, 0.5),
+        "p90_ms": percentile(times, 0.9),
+        "p99_ms": percentile(times, 0.99),
+        "warm_bytes_per_call": snap["bytes"] / iterations,
+        "warm_requests_per_call": snap["requests"] / iterations,
+    }
+
+
+def run_all(config: dict, names, cold_runs: int, iterations: int):
+    stub = StubServer(config=config).start()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as warm_dir:
+            for name in names:
+                script, argv, module, call = ENTRY_POINTS[name]
+                cold_ms, cold_bytes = run_cold(stub, script, argv, cold_runs)
+                res = {"cold_start_ms": cold_ms, "cold_bytes": cold_bytes}
+                res.update(run_warm(stub, module, call, iterations, os.path.join(warm_dir, name)))
+                results[name] = res
+    finally:
+        stub.stop()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    regressions = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for k in CHECKED:
+            old, new = base.get(k), res.get(k)
+            if old is None or new is None:
+                continue
+            # small absolute slack so sub-millisecond noise doesn't count
+            if new > old * (1 + tolerance) + 1.0:
+                regressions.append(f"{name}.{k}: {old:,.1f} → {new:,.1f}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark qiuqiu-helper entry points against a local upstream stub")
+    ap.add_argument("names", nargs="*", default=list(ENTRY_POINTS), help=f"subset of {', '.join(ENTRY_POINTS)}")
+    ap.add_argument("--config", help="stub latency/error config JSON")
+    ap.add_argument("--latency-ms", type=float, default=None)
+    ap.add_argument("--error-rate", type=float, default=None)
+    ap.add_argument("--cold-runs", type=int, default=3)
+    ap.add_argument("--iterations", type=int, default=30)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--check", action="store_true", help="exit 1 on regression vs bench/baseline.json")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--json", help="also write results to this path")
+    args = ap.parse_args()
+
+    config = {}
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    if args.latency_ms is not None:
+        config["latency_ms"] = args.latency_ms
+    if args.error_rate is not None:
+        config["error_rate"] = args.error_rate
+
+    results = run_all(config, args.names, args.cold_runs, args.iterations)
+
+    print("=== QIUQIU BENCH ===")
+    print(f"{'entry':<10} {'cold ms':>9} {'cold KB':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'KB/call':>8} {'req/call':>8}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['cold_start_ms']:>9.1f} {r['cold_bytes'] / 1024:>9.1f} {r['p50_ms']:>8.1f} "
+              f"{r['p90_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['warm_bytes_per_call'] / 1024:>8.2f} {r['warm_requests_per_call']:>8.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {BASELINE_PATH}")
+
+    if args.check:
+        try:
+            with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            print("No baseline recorded yet (run with --save-baseline)")
+            sys.exit(1)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("REGRESSIONS:")
+            for r in regressions:
+                print(f"  {r}")
+            sys.exit(1)
+        print("No regressions vs baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import datetime as dt
+import json
+import math
+import os
+import random
+import re
+import sys
+import zlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Local stub of every upstream API used by qiuqiu-helper.
+# http_client.py sends requests here when QIUQIU_UPSTREAM_OVERRIDE=http://127.0.0.1:PORT,
+# as /<original host>/<path>. Small endpoints replay bench/payloads.json; the two large
+# history endpoints (CoinGecko market_chart, CoinGlass indicator/ahr999) are generated with
+# the real response shape and size for the requested window.
+# Latency and errors can be injected globally or per host:
+#   config = {"latency_ms": 40, "jitter_ms": 20, "error_rate": 0.0,
+#             "hosts": {"bitcoin-data.com": {"latency_ms": 900, "error_rate": 0.2}}}
+
+PAYLOADS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads.json")
+GENESIS = dt.date(2009, 1, 3)
+MARKET_CHART = re.compile(r"api\.coingecko\.com/api/v3/coins/([\w-]+)/market_chart")
+SIMPLE_PRICE = "api.coingecko.com/api/v3/simple/price"
+AHR999_HISTORY = "open-api.coinglass.com/public/v2/indicator/ahr999"
+
+
+def synthetic_close(day: dt.date, coin: str = "bitcoin") -> float:
+    # Long-term growth curve with a multi-year cycle on top (deterministic);
+    # other coins are a scaled, phase-shifted copy keyed by their id
+    days = (day - GENESIS).days
+    trend = 10 ** (5.84 * math.log10(max(days, 1)) - 17.01)
+    if coin == "bitcoin":
+        return trend * (0.55 + 0.35 * math.sin(days / 220.0))
+    h = zlib.crc32(coin.encode("utf-8"))
+    return trend * 10 ** (-1 - h % 50 / 10) * (0.55 + 0.35 * math.sin(days / 220.0 + h % 7))
+
+
+def simple_price_body(ids, base: dict) -> dict:
+    today = dt.datetime.now(dt.timezone.utc).date()
+    out = {}
+    for coin in ids:
+        if coin in base:
+            out[coin] = base[coin]
+        elif not coin.startswith("unknown"):
+            out[coin] = {"usd": synthetic_close(today, coin) * 1.003, "usd_24h_change": (zlib.crc32(coin.encode()) % 200 - 100) / 10}
+    return out
+
+
+def market_chart_body(days: int, coin: str = "bitcoin") -> dict:
+    now = dt.datetime.now(dt.timezone.utc)
+    today = now.date()
+    prices, caps, vols = [], [], []
+    for i in range(days, -1, -1):
+        d = today - dt.timedelta(days=i)
+        ts = int(dt.datetime.combine(d, dt.time(), dt.timezone.utc).timestamp() * 1000)
+        p = synthetic_close(d, coin)
+        prices.append([ts, p])
+        caps.append([ts, p * 19.7e6])
+        vols.append([ts, 2.5e10 + (i % 7) * 1e9])
+    now_ms = int(now.timestamp() * 1000)
+    p = synthetic_close(today, coin) * 1.003
+    prices.append([now_ms, p])
+    caps.append([now_ms, p * 19.7e6])
+    vols.append([now_ms, 2.9e10])
+    return {"prices": prices, "market_caps": caps, "total_volumes": vols}
+
+
+def ahr999_history_body() -> dict:
+    start = dt.date(2011, 2, 1)
+    today = dt.datetime.now(dt.timezone.utc).date()
+    data = []
+    d = start
+    while d <= today:
+        p = synthetic_close(d)
+        ahr = 0.3 + 0.9 * (0.5 + 0.5 * math.sin((d - GENESIS).days / 220.0))
+        data.append({"date": d.strftime("%Y/%m/%d"), "avg": round(p * 0.97, 2), "ahr999": round(ahr, 4), "value": round(p, 2)})
+        d += dt.timedelta(days=1)
+    return {"code": "0", "msg": "success", "data": data, "success": True}
+
+
+class StubServer:
+    def __init__(self, port: int = 0, config: dict | None = None):
+        with open(PAYLOADS_PATH, "r", encoding="utf-8") as f:
+            self.payloads = json.load(f)
+        self.config = config or {}
+        self.lock = threading.Lock()
+        self.reset_stats()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers + body in one segment, no Nagle: otherwise delayed ACKs add ~40ms per call
+            wbufsize = 64 * 1024
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stub._handle(self)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {"requests": 0, "bytes": 0, "errors": 0, "by_host": {}}
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return json.loads(json.dumps(self.stats))
+
+    def _host_config(self, host: str) -> dict:
+        cfg = {k: v for k, v in self.config.items() if k != "hosts"}
+        cfg.update((self.config.get("hosts") or {}).get(host, {}))
+        return cfg
+
+    def _body_for(self, route: str, query: dict):
+        m = MARKET_CHART.fullmatch(route)
+        if m:
+            return market_chart_body(int(query.get("days", ["240"])[0]), m.group(1)), None
+        if route == SIMPLE_PRICE:
+            ids = query.get("ids", ["bitcoin"])[0].split(",")
+            return simple_price_body(ids, self.payloads.get(route) or {}), None
+        if route == AHR999_HISTORY:
+            return ahr999_history_body(), dt.datetime.now(dt.timezone.utc).date().isoformat()
+        return self.payloads.get(route), None
+
+    def _handle(self, req: BaseHTTPRequestHandler):
+        parts = urlsplit(req.path)
+        route = parts.path.lstrip("/")
+        host = route.split("/", 1)[0]
+        cfg = self._host_config(host)
+
+        delay_ms = cfg.get("latency_ms", 0) + random.uniform(0, cfg.get("jitter_ms", 0))
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+        if random.random() < cfg.get("error_rate", 0.0):
+            return self._send(req, host, 503, b'{"error":"injected"}', error=True)
+
+        body, etag = self._body_for(route, parse_qs(parts.query))
+        if body is None:
+            return self._send(req, host, 404, b'{"error":"no stub for route"}', error=True)
+        if etag and req.headers.get("If-None-Match") == f'"{etag}"':
+            return self._send(req, host, 304, b"", etag=etag)
+        self._send(req, host, 200, json.dumps(body).encode("utf-8"), etag=etag)
+
+    def _send(self, req, host: str, code: int, data: bytes, etag: str | None = None, error: bool = False):
+        req.send_response(code)
+        req.send_header("Content-Type", "application/json")
+        req.send_header("Content-Length", str(len(data)))
+        if etag:
+            req.send_header("ETag", f'"{etag}"')
+        req.end_headers()
+        if data:
+            req.wfile.write(data)
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += len(data)
+            self.stats["errors"] += int(error)
+            h = self.stats["by_host"].setdefault(host, {"requests": 0, "bytes": 0})
+            h["requests"] += 1
+            h["bytes"] += len(data)
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8799
+    stub = StubServer(port).start()
+    print(f"upstream stub on {stub.url}  (export QIUQIU_UPSTREAM_OVERRIDE={stub.url})")
+    try:
+        stub.thread.join()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,47 @@
+import datetime as dt
+import math
+import os
+
+# Ahr999 model shared by every script (dca_daily_report, ahr999_selfcalc, ahr999_manual,
+# ahr999_backfill, rolling_gma). Math plus one small state read: importing it never pulls
+# in `requests`, but exp_params() (and exp_price() without params) reads exp_fit.py's state
+# file on every call; pass the params along to evaluate many days with one read.
+# ExpPrice = 10^(a*log10(days_since_genesis) + b), with the widely used a=5.84, b=-17.01
+# unless exp_fit.py holds a usable least-squares fit (QIUQIU_EXP_FIT=off pins the constants)
+# Ahr999  = (price / GMA200) * (price / ExpPrice)
+
+A_EXP = 5.84
+B_EXP = -17.01
+GENESIS = dt.date(2009, 1, 3)
+
+
+def gma(prices):
+    # geometric mean (non-positive / missing prices are skipped)
+    s = 0.0
+    n = 0
+    for p in prices:
+        if p and p > 0:
+            s += math.log(p)
+            n += 1
+    return math.exp(s / n) if n else None
+
+
+def exp_params():
+    # (a, b, "fitted" | "fixed")
+    if os.getenv("QIUQIU_EXP_FIT", "").lower() not in ("off", "0", "false"):
+        from exp_fit import fitted_params
+        p = fitted_params()
+        if p:
+            return p[0], p[1], "fitted"
+    return A_EXP, B_EXP, "fixed"
+
+
+def exp_price(today: dt.date, params=None):
+    # params: (a, b, ...) to skip the lookup (e.g. one exp_params() for a whole report)
+    a, b = (params or exp_params())[:2]
+    days = (today - GENESIS).days
+    return 10 ** (a * math.log10(days) + b)
+
+
+def ahr999_value(price: float, gma200: float, exp_p: float):
+    return (price / gma200) * (price / exp_p)
@@ -0,0 +1,273 @@
+import argparse
+import fnmatch
+import gzip
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Log retention over whole directory trees (replaces clean_logs.sh's `find -mtime +N -delete`).
+# One os.scandir walk collects the matching files with their size and mtime, then:
+# - older than `days` (find's -mtime +N: more than N whole days) -> delete
+# - older than --compress-after days -> gzip to <name>.gz, mtime kept, so the file keeps aging
+#   (an existing <name>.gz is never overwritten: the file is left alone and reported as skipped)
+# - --max-bytes: oldest surviving files are deleted until the tree fits the size budget
+# Deletes run in batches of BATCH files of one directory, compressions one file per task, on a
+# small thread pool (--workers); time is accounted per directory for the report.
+# --dry-run prints the same report without touching anything.
+# Usage: python3 clean_logs.py [days] [path ...] [--compress-after D] [--max-bytes 20G] [--dry-run]
+
+DEFAULT_DAYS = 7
+DEFAULT_PATH = "./logs"
+DEFAULT_PATTERN = "*.log"
+WORKERS = int(os.getenv("QIUQIU_CLEAN_LOGS_WORKERS", "4"))  # keep it low: the disk is the bottleneck
+BATCH = 256
+GZIP_LEVEL = int(os.getenv("QIUQIU_CLEAN_LOGS_GZIP_LEVEL", "6"))
+REPORT_DIRS = 20  # directories listed in the report, by bytes reclaimed
+DAY = 86400
+UNITS = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_size(raw: str) -> int:
+    raw = raw.strip().upper().removesuffix("B")
+    if raw and raw[-1] in UNITS:
+        return int(float(raw[:-1]) * UNITS[raw[-1]])
+    return int(raw)
+
+
+def format_bytes(n: float) -> str:
+    for unit in ("B", "K", "M", "G"):
+        if abs(n) < 1024:
+            return f"{n:.0f}{unit}" if unit == "B" else f"{n:.1f}{unit}"
+        n /= 1024
+    return f"{n:.1f}T"
+
+
+def scan(root: str, pattern: str = DEFAULT_PATTERN):
+    # [(path, dir, size, mtime)] for files matching pattern or pattern.gz; symlinks are skipped
+    found = []
+    stack = [root]
+    gz_pattern = pattern + ".gz"
+    while stack:
+        d = stack.pop()
+        try:
+            it = os.scandir(d)
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                    elif e.is_file(follow_symlinks=False) and (
+                            fnmatch.fnmatch(e.name, pattern) or fnmatch.fnmatch(e.name, gz_pattern)):
+                        st = e.stat(follow_symlinks=False)
+                        found.append((e.path, d, st.st_size, st.st_mtime))
+                except OSError:
+                    continue  # vanished / unreadable while walking
+    return found
+
+
+def plan(files, days: int, compress_after: int | None = None, now: float | None = None):
+    # {"delete": [...], "compress": [...], "keep": [...]} of scan() rows; nothing is touched
+    now = now or time.time()
+    actions = {"delete": [], "compress": [], "keep": []}
+    for f in files:
+        age_days = int((now - f[3]) // DAY)
+        if age_days > days:
+            actions["delete"].append(f)
+        elif compress_after is not None and age_days > compress_after and not f[0].endswith(".gz"):
+            actions["compress"].append(f)
+        else:
+            actions["keep"].append(f)
+    return actions
+
+
+def plan_trim(files, max_bytes: int):
+    # Oldest first until the rest fits in max_bytes
+    trim = []
+    total = sum(f[2] for f in files)
+    for f in sorted(files, key=lambda f: f[3]):
+        if total <= max_bytes:
+            break
+        trim.append(f)
+        total -= f[2]
+    return trim
+
+
+def _delete_batch(rows, dry_run: bool):
+    # (files, bytes, errors, seconds) for one directory's batch
+    t0 = time.perf_counter()
+    n = size = errors = 0
+    for path, _, st_size, _ in rows:
+        try:
+            if not dry_run:
+                os.unlink(path)
+            n += 1
+            size += st_size
+        except FileNotFoundError:
+            pass
+        except OSError:
+            errors += 1
+    return n, size, errors, time.perf_counter() - t0
+
+
+def _compress(row, dry_run: bool):
+    # "compressed"/"skipped", (files, bytes saved, errors, seconds), row of the result;
+    # dry runs can't know the saving
+    path, d, st_size, mtime = row
+    target = path + ".gz"
+    t0 = time.perf_counter()
+    if os.path.lexists(target):
+        return "skipped", (1, 0, 0, time.perf_counter() - t0), row
+    if dry_run:
+        return "compressed", (1, 0, 0, time.perf_counter() - t0), row
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=GZIP_LEVEL) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        os.utime(tmp, (mtime, mtime))
+        try:
+            os.link(tmp, target)  # unlike os.replace, fails if the .gz appeared meanwhile
+        except FileExistsError:
+            os.unlink(tmp)
+            return "skipped", (1, 0, 0, time.perf_counter() - t0), row
+        os.unlink(tmp)
+        os.unlink(path)
+        gz_size = os.path.getsize(target)
+        return "compressed", (1, st_size - gz_size, 0, time.perf_counter() - t0), (target, d, gz_size, mtime)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        return "compressed", (0, 0, 1, time.perf_counter() - t0), row
+
+
+def _by_dir(rows):
+    groups = {}
+    for r in rows:
+        groups.setdefault(r[1], []).append(r)
+    return groups
+
+
+def _add(per_dir: dict, d: str, name: str, vals):
+    acc = per_dir.setdefault(d, {}).setdefault(name, [0, 0, 0, 0.0])
+    for k, v in enumerate(vals):
+        acc[k] += v
+
+
+def submit_deletes(rows, pool, dry_run: bool = False):
+    # Batched deletes, BATCH files of one directory per task; [(dir, future)]
+    jobs = []
+    for d, group in _by_dir(rows).items():
+        for i in range(0, len(group), BATCH):
+            jobs.append((d, pool.submit(_delete_batch, group[i:i + BATCH], dry_run)))
+    return jobs
+
+
+def collect(jobs, name: str, per_dir: dict):
+    for d, fut in jobs:
+        _add(per_dir, d, name, fut.result())
+
+
+def compress(rows, per_dir: dict, pool, dry_run: bool = False):
+    # One file per task; returns the rows as they are afterwards (.gz, or the original when
+    # skipped or on error)
+    out = []
+    for row, fut in [(row, pool.submit(_compress, row, dry_run)) for row in rows]:
+        name, vals, new_row = fut.result()
+        _add(per_dir, row[1], name, vals)
+        out.append(new_row)
+    return out
+
+
+def clean(root: str, days: int = DEFAULT_DAYS, compress_after: int | None = None, max_bytes: int | None = None,
+          pattern: str = DEFAULT_PATTERN, dry_run: bool = False, workers: int = WORKERS):
+    # One tree: scan, delete expired + compress warm in parallel, then enforce the size budget
+    # on what is left (real compressed sizes; a dry run counts warm files at their original size).
+    # Returns the report dict printed by print_report()
+    t0 = time.perf_counter()
+    files = scan(root, pattern)
+    scanned = time.perf_counter()
+    actions = plan(files, days, compress_after)
+    per_dir = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        deletes = submit_deletes(actions["delete"], pool, dry_run)
+        survivors = actions["keep"] + compress(actions["compress"], per_dir, pool, dry_run)
+        collect(deletes, "deleted", per_dir)
+        if max_bytes is not None:
+            collect(submit_deletes(plan_trim(survivors, max_bytes), pool, dry_run), "trimmed", per_dir)
+    totals = {}
+    for acts in per_dir.values():
+        for name, vals in acts.items():
+            acc = totals.setdefault(name, [0, 0, 0, 0.0])
+            for k, v in enumerate(vals):
+                acc[k] += v
+    return {
+        "root": root,
+        "dryRun": dry_run,
+        "files": len(files),
+        "bytes": sum(f[2] for f in files),
+        "scanS": scanned - t0,
+        "totalS": time.perf_counter() - t0,
+        "totals": totals,
+        "dirs": per_dir,
+    }
+
+
+def print_report(rep: dict):
+    verb = "would be " if rep["dryRun"] else ""
+    print(f"=== {rep['root']}{' (dry run)' if rep['dryRun'] else ''} ===")
+    print(f"Scanned:    {rep['files']} files, {format_bytes(rep['bytes'])} in {rep['scanS']:.2f}s")
+    reclaimed = 0
+    for name in ("deleted", "compressed", "skipped", "trimmed"):
+        if name != "deleted" and name not in rep["totals"]:
+            continue
+        n, size, errors, _ = rep["totals"].get(name, (0, 0, 0, 0.0))
+        reclaimed += size
+        if name == "skipped":
+            print(f"Skipped:    {n} files not compressed, <name>.gz already exists")
+            continue
+        if name == "compressed" and rep["dryRun"]:
+            detail = ""
+        else:
+            detail = f", {format_bytes(size)} {'saved' if name == 'compressed' else 'freed'}"
+        print(f"{name.capitalize() + ':':<11} {n} files {verb}{name}{detail}" + (f", {errors} errors" if errors else ""))
+    print(f"Reclaimed:  {format_bytes(reclaimed)}{' (excluding compression)' if rep['dryRun'] else ''} in {rep['totalS']:.2f}s")
+    if rep["dirs"]:
+        print("Per directory (bytes reclaimed, files, worker time):")
+        ranked = sorted(rep["dirs"].items(), key=lambda kv: -sum(v[1] for v in kv[1].values()))
+        for d, acts in ranked[:REPORT_DIRS]:
+            size = sum(v[1] for v in acts.values())
+            n = sum(v[0] for v in acts.values())
+            secs = sum(v[3] for v in acts.values())
+            print(f"  {format_bytes(size):>8}  {n:>7}  {secs:>7.2f}s  {d}")
+        if len(ranked) > REPORT_DIRS:
+            print(f"  ... {len(ranked) - REPORT_DIRS} more directories")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Delete, compress and size-cap old log files")
+    ap.add_argument("days", nargs="?", type=int, default=DEFAULT_DAYS, help="delete files older than this many days (default 7)")
+    ap.add_argument("paths", nargs="*", help="directories to clean, recursively (default ./logs)")
+    ap.add_argument("--compress-after", type=int, default=None, metavar="DAYS", help="gzip files older than this many days")
+    ap.add_argument("--max-bytes", type=parse_size, default=None, metavar="SIZE", help="per-tree budget, e.g. 20G: oldest files go first")
+    ap.add_argument("--pattern", default=DEFAULT_PATTERN, help="file name glob (default *.log, plus its .gz)")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--dry-run", action="store_true", help="report what would happen without changing anything")
+    args = ap.parse_args()
+
+    rc = 0
+    for root in args.paths or [DEFAULT_PATH]:
+        if not os.path.isdir(root):
+            print(f"Error: Directory {root} does not exist.")
+            rc = 1
+            continue
+        print_report(clean(root, args.days, args.compress_after, args.max_bytes, args.pattern, args.dry_run, args.workers))
+    return rc
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import csv
+import datetime as dt
+import json
+import os
+import sys
+
+import http_client
+from json_stream import iter_array, response_chunks
+
+# Incremental on-disk store of daily closes (CoinGecko market_chart), BTC by default.
+# The first run downloads the full window; later runs only ask CoinGecko for the
+# days after the last stored date. The last stored day is always re-fetched because
+# CoinGecko's final "daily" point is the live price until the UTC day closes
+# (daily_refresh=True skips even that when the cache was already refreshed today).
+# Other coins (multi_asset.py) get one file per CoinGecko id under DCA_CLOSES_CACHE_DIR;
+# with keep_all those files are never trimmed, so the history grows past the fetch window
+# (CoinGecko's demo plan serves 365 days), and `import` seeds them from a CSV at once.
+# Usage: python3 closes_cache.py import <coin_id> <history.csv>   (CSV columns: date,close)
+
+DEFAULT_CACHE_PATH = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/btc_daily_closes.json")
+DEFAULT_CACHE_DIR = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/daily_closes")
+# Keep a bit more than any window we ask for, so the file stays small
+MAX_CACHED_DAYS = int(os.getenv("DCA_CLOSES_CACHE_MAX_DAYS", "400"))
+
+COINGECKO_MARKET_CHART = "https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
+
+
+def cache_path_for(coin_id: str = "bitcoin") -> str:
+    if coin_id == "bitcoin":
+        return os.getenv("DCA_CLOSES_CACHE_PATH", DEFAULT_CACHE_PATH)
+    return os.path.join(os.getenv("DCA_CLOSES_CACHE_DIR", DEFAULT_CACHE_DIR), f"{coin_id}.json")
+
+
+def fetch_closes_by_date(days: int, timeout: int = 20, coin_id: str = "bitcoin"):
+    params = {"vs_currency": "usd", "days": str(days), "interval": "daily"}
+    url = COINGECKO_MARKET_CHART.format(coin_id=coin_id)
+    r = http_client.get(url, params=params, timeout=timeout, stream=True)
+    try:
+        r.raise_for_status()
+        # Stream "prices" straight into the date buckets (bounded memory for long/hourly series)
+        by_date = {}
+        for ts_ms, price in iter_array(response_chunks(r), "prices"):
+            d = dt.datetime.utcfromtimestamp(ts_ms / 1000).date()
+            by_date[d] = float(price)
+    finally:
+        r.close()
+    return by_date
+
+
+def _load(path: str):
+    # (closes by date, UTC date of the last refresh or None)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}, None
+    fetched_on = raw.get("fetchedOn")
+    closes = {dt.date.fromisoformat(d): float(p) for d, p in raw.get("closes", [])}
+    return closes, dt.date.fromisoformat(fetched_on) if fetched_on else None
+
+
+def load_closes_cache(path: str):
+    return _load(path)[0]
+
+
+def save_closes_cache(path: str, by_date: dict, max_days: int | None = MAX_CACHED_DAYS,
+                      fetched_on: dt.date | None = None):
+    # max_days=None keeps every close; fetched_on defaults to today (UTC)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    keep = sorted(by_date.keys())
+    if max_days is not None:
+        keep = keep[-max_days:]
+    fetched_on = fetched_on or dt.datetime.utcnow().date()
+    payload = {"fetchedOn": fetched_on.isoformat(), "closes": [[d.isoformat(), by_date[d]] for d in keep]}
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def get_daily_closes(days: int = 240, path: str | None = None, timeout: int = 20,
+                     coin_id: str = "bitcoin", daily_refresh: bool = False, keep_all: bool = False):
+    # Returns [(date, close), ...] sorted by date, covering (at most) the last `days` days.
+    # daily_refresh: at most one request per UTC day; callers that take the live price
+    # from elsewhere (a batched simple/price) only need the closed days.
+    # keep_all: `days` is only the fetch window; the file keeps, and this returns, every close.
+    path = path or cache_path_for(coin_id)
+    today = dt.datetime.utcnow().date()
+    window_start = today - dt.timedelta(days=days)
+
+    cached, fetched_on = _load(path)
+    covered = bool(cached) and min(cached) <= window_start
+    first = min(cached, default=window_start) if keep_all else window_start
+    if daily_refresh and covered and fetched_on == today:
+        return [(d, cached[d]) for d in sorted(cached) if d >= first]
+    if covered:
+        # Only the tail is missing: re-fetch from the last stored day (inclusive)
+        fetch_days = max((today - max(cached)).days, 1)
+    else:
+        fetch_days = days
+
+    cached.update(fetch_closes_by_date(fetch_days, timeout=timeout, coin_id=coin_id))
+    save_closes_cache(path, cached, None if keep_all else max(MAX_CACHED_DAYS, days + 1))
+
+    first = min(cached) if keep_all else window_start
+    return [(d, cached[d]) for d in sorted(cached) if d >= first]
+
+
+def import_csv(coin_id: str, csv_path: str) -> int:
+    # Merges date,close rows into the coin's cache (stored days are overwritten, none trimmed).
+    # An existing file keeps its refresh date, so the next run still fetches the tail.
+    path = cache_path_for(coin_id)
+    cached, fetched_on = _load(path)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = {dt.date.fromisoformat(r["date"]): float(r["close"]) for r in csv.DictReader(f) if r.get("close")}
+    cached.update(rows)
+    save_closes_cache(path, cached, None, fetched_on)
+    return len(rows)
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "import":
+        n = import_csv(sys.argv[2], sys.argv[3])
+        closes = load_closes_cache(cache_path_for(sys.argv[2]))
+        print(f"imported {n} closes into {cache_path_for(sys.argv[2])}: {min(closes)} .. {max(closes)}")
+        return 0
+    print("Usage: python3 closes_cache.py import <coin_id> <history.csv>")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
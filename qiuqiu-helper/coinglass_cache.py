@@ -0,0 +1,140 @@
+import datetime as dt
+import json
+import math
+import os
+import time
+
+import http_client
+from json_stream import response_chunks, tail_array
+
+# Response cache for CoinGlass indicator endpoints (e.g. /public/v2/indicator/ahr999).
+# The endpoint returns the whole history, but callers only need the last point(s), so
+# the body is streamed (json_stream.py) and the cache keeps just the parsed tail plus
+# the validators (ETag / Last-Modified).
+# - fresh entry (before the next daily update): no request at all
+# - stale entry: conditional request; a 304 only refreshes the expiry
+# The cache is shared by get_coinglass_ahr999.py, get_ahr999.py and dca_daily_report.py.
+
+DEFAULT_CACHE_DIR = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/coinglass_cache")
+BASE_URL = "https://open-api.coinglass.com/public/v2/indicator"
+
+# CoinGlass indicators update once a day: a point dated D is fresh until shortly after
+# the UTC midnight ending D (grace period lets the next point get published). While the
+# latest point is already past that (not published yet), the entry is re-checked every
+# COINGLASS_CACHE_RETRY_S instead of being cached for another day.
+UPDATE_GRACE_S = int(os.getenv("COINGLASS_CACHE_GRACE_S", "1800"))
+RETRY_S = int(os.getenv("COINGLASS_CACHE_RETRY_S", "600"))
+KEEP_TAIL = 7
+
+
+def _cache_path(indicator: str) -> str:
+    d = os.getenv("COINGLASS_CACHE_DIR", DEFAULT_CACHE_DIR)
+    return os.path.join(d, f"{indicator}.json")
+
+
+def next_update_ts(now: float | None = None) -> float:
+    now = now if now is not None else time.time()
+    today = dt.datetime.fromtimestamp(now, dt.timezone.utc).date()
+    midnight = dt.datetime.combine(today + dt.timedelta(days=1), dt.time(), dt.timezone.utc)
+    return midnight.timestamp() + UPDATE_GRACE_S
+
+
+def point_date(point: dict):
+    # Date of an indicator point ("2026/10/17", "2026-10-17" or epoch s/ms), None if unknown
+    raw = point.get("date") if isinstance(point, dict) else None
+    try:
+        if isinstance(raw, (int, float)):
+            return dt.datetime.fromtimestamp(raw / 1000 if raw > 1e11 else raw, dt.timezone.utc).date()
+        if isinstance(raw, str):
+            return dt.date.fromisoformat(raw[:10].replace("/", "-"))
+    except (ValueError, OverflowError, OSError):
+        pass
+    return None
+
+
+def expires_at(latest: dict, now: float | None = None) -> float:
+    # Next update after the latest point's own date; a short retry once that has passed
+    now = now if now is not None else time.time()
+    d = point_date(latest)
+    if d is None:
+        return next_update_ts(now)
+    midnight = dt.datetime.combine(d + dt.timedelta(days=1), dt.time(), dt.timezone.utc)
+    return max(midnight.timestamp() + UPDATE_GRACE_S, now + RETRY_S)
+
+
+def load_entry(indicator: str):
+    try:
+        with open(_cache_path(indicator), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def save_entry(indicator: str, entry: dict):
+    path = _cache_path(indicator)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def fetch_indicator(indicator: str, api_key: str, timeout: float = 10, force: bool = False):
+    # Returns {"tail": [...last KEEP_TAIL points...], "latest": {...}, "fetchedAt", "expiresAt", "cached"}
+    # Raises RuntimeError("HTTP Error: ...") / RuntimeError("API Error: ...") like the scripts print.
+    now = time.time()
+    entry = load_entry(indicator)
+    if entry and not force and now < entry.get("expiresAt", 0):
+        entry["cached"] = True
+        return entry
+
+    headers = {"accept": "application/json", "coinglassApiKeys": api_key}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("lastModified"):
+            headers["If-Modified-Since"] = entry["lastModified"]
+
+    r = http_client.get(f"{BASE_URL}/{indicator}", headers=headers, timeout=timeout, stream=True)
+    try:
+        if r.status_code == 304 and entry:
+            entry["expiresAt"] = expires_at(entry.get("latest"), now)
+            save_entry(indicator, entry)
+            entry["cached"] = True
+            return entry
+        if r.status_code != 200:
+            raise RuntimeError(f"HTTP Error: {r.status_code}")
+
+        # Stream the history and keep only the tail (bounded memory however long it gets)
+        envelope = {}
+        tail = tail_array(response_chunks(r), "data", KEEP_TAIL, envelope)
+    finally:
+        r.close()
+
+    if not (envelope.get("success") and tail):
+        raise RuntimeError(f"API Error: {envelope.get('msg', 'Unknown error')}")
+
+    entry = {
+        "tail": tail,
+        "latest": tail[-1],
+        "etag": r.headers.get("ETag"),
+        "lastModified": r.headers.get("Last-Modified"),
+        "fetchedAt": now,
+        "expiresAt": expires_at(tail[-1], now),
+    }
+    save_entry(indicator, entry)
+    entry["cached"] = False
+    return entry
+
+
+def fetch_coinglass_ahr999_latest(api_key: str, timeout: float = 10):
+    # {"value": float, "date": ..., "raw": {...}} for the most recent ahr999 point.
+    # A point without a finite ahr999 raises: a made-up 0 would read as deeply undervalued.
+    latest = fetch_indicator("ahr999", api_key, timeout=timeout)["latest"]
+    try:
+        value = float(latest["ahr999"])
+    except (KeyError, TypeError, ValueError):
+        value = math.nan
+    if not math.isfinite(value):
+        raise RuntimeError(f"API Error: no ahr999 value in the latest point ({latest.get('date')})")
+    return {"value": value, "date": latest.get("date"), "raw": latest}
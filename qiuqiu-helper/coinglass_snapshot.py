@@ -0,0 +1,171 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import http_client
+import metrics
+import timeseries
+
+# Derivatives snapshot for many symbols: every (symbol, metric) endpoint is fetched
+# concurrently. http_client's CoinGlass token bucket keeps the burst inside the plan's
+# rate limit (QIUQIU_RATE_LIMIT_COINGLASS="rate,burst" to match a bigger plan).
+# Each metric carries its own status, so a slow or failing endpoint only costs that
+# metric. Per-exchange rows are aggregated on symbols x exchanges NumPy matrices.
+# Usage: python3 coinglass_snapshot.py <coinglass_api_key> [SYMBOL ...]
+
+BASE_URL = "https://open-api.coinglass.com/public/v2"
+DEFAULT_SYMBOLS = ["BTC", "ETH", "SOL", "XRP", "BNB", "DOGE", "ADA", "TRX", "LINK", "AVAX",
+                   "DOT", "LTC", "BCH", "TON", "SUI", "NEAR", "APT", "ARB", "OP", "UNI"]
+
+# metric: (endpoint, extra query params, numeric fields per exchange row)
+ENDPOINTS = {
+    "oi": ("open_interest", {}, ("openInterest",)),
+    "funding": ("funding_rate", {}, ("uMarginRate",)),
+    "liquidation": ("liquidation/symbol", {"interval": "h1"}, ("longVolUsd", "shortVolUsd")),
+}
+MAX_WORKERS = 8
+RECORDED_FIELDS = ("oi", "funding", "fundingOiWeighted", "longLiq", "shortLiq")
+
+
+def symbols_from_env():
+    raw = os.getenv("COINGLASS_SYMBOLS", "")
+    return [s.strip().upper() for s in raw.split(",") if s.strip()] or DEFAULT_SYMBOLS
+
+
+def fetch_metric(symbol: str, metric: str, api_key: str, timeout: float = 10):
+    # {"status": "ok" | "empty" | "http_<code>" | "api_error" | "error", "rows", "error", "ms"}
+    endpoint, extra, _ = ENDPOINTS[metric]
+    headers = {"accept": "application/json", "coinglassApiKeys": api_key}
+    params = dict(extra, symbol=symbol)
+    t0 = time.perf_counter()
+    out = {"status": "error", "rows": [], "error": None}
+    try:
+        r = http_client.get(f"{BASE_URL}/{endpoint}", params=params, headers=headers, timeout=timeout)
+        if r.status_code != 200:
+            out.update(status=f"http_{r.status_code}", error=f"HTTP Error: {r.status_code}")
+        else:
+            body = r.json()
+            if str(body.get("code", "0")) != "0" or body.get("success") is False:
+                out.update(status="api_error", error=f"API Error: {body.get('msg', 'Unknown error')}")
+            else:
+                out["rows"] = body.get("data") or []
+                out["status"] = "ok" if out["rows"] else "empty"
+    except Exception as e:
+        out["error"] = f"{type(e).__name__}: {e}"
+    out["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return out
+
+
+def exchange_matrix(results: dict, symbols, metric: str, field: str):
+    # (exchanges, symbols x exchanges float array, NaN where an exchange has no row)
+    exchanges = sorted({row.get("exchangeName", "?") for s in symbols for row in results[s][metric]["rows"]})
+    col = {e: j for j, e in enumerate(exchanges)}
+    m = np.full((len(symbols), len(exchanges)), np.nan)
+    for i, s in enumerate(symbols):
+        for row in results[s][metric]["rows"]:
+            v = row.get(field)
+            if isinstance(v, (int, float)):
+                m[i, col[row.get("exchangeName", "?")]] = v
+    return exchanges, m
+
+
+def _rowwise(fn, m):
+    # fn over axis 1 ignoring NaN; all-NaN (or empty) rows give NaN without warnings
+    if m.shape[1] == 0:
+        return np.full(m.shape[0], np.nan)
+    has = np.isfinite(m).any(axis=1)
+    with np.errstate(invalid="ignore"):
+        out = fn(np.where(has[:, None], m, 0.0), axis=1)
+    return np.where(has, out, np.nan)
+
+
+def aggregate(results: dict, symbols):
+    # Per symbol: total OI, mean and OI-weighted funding, summed 1h liquidations
+    ex_oi, oi = exchange_matrix(results, symbols, "oi", "openInterest")
+    ex_fr, fr = exchange_matrix(results, symbols, "funding", "uMarginRate")
+    _, long_liq = exchange_matrix(results, symbols, "liquidation", "longVolUsd")
+    _, short_liq = exchange_matrix(results, symbols, "liquidation", "shortVolUsd")
+
+    oi_total = _rowwise(np.nansum, oi)
+    fr_mean = _rowwise(np.nanmean, fr)
+    long_total = _rowwise(np.nansum, long_liq)
+    short_total = _rowwise(np.nansum, short_liq)
+
+    # Funding weighted by each exchange's OI, on the exchanges that report both
+    both = sorted(set(ex_oi) & set(ex_fr))
+    w = oi[:, [ex_oi.index(e) for e in both]]
+    f = fr[:, [ex_fr.index(e) for e in both]]
+    ok = np.isfinite(w) & np.isfinite(f)
+    w_sum = np.where(ok, w, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fr_weighted = np.where(w_sum > 0, np.where(ok, w * f, 0.0).sum(axis=1) / w_sum, np.nan)
+
+    def val(x):
+        return None if np.isnan(x) else float(x)
+
+    out = {}
+    for i, s in enumerate(symbols):
+        out[s] = {
+            "oi": val(oi_total[i]),
+            "oiExchanges": int(np.isfinite(oi[i]).sum()),
+            "funding": val(fr_mean[i]),
+            "fundingOiWeighted": val(fr_weighted[i]),
+            "longLiq": val(long_total[i]),
+            "shortLiq": val(short_total[i]),
+            "status": {m: results[s][m]["status"] for m in results[s]},
+            "errors": {m: results[s][m]["error"] for m in results[s] if results[s][m]["error"]},
+        }
+    return out
+
+
+def snapshot(symbols, api_key: str, which=None, timeout: float = 10):
+    # {symbol: {...aggregates..., "status": {metric: status}, "errors": {metric: msg}}}
+    symbols = [s.upper() for s in symbols]
+    which = list(which or ENDPOINTS)
+    jobs = [(s, m) for s in symbols for m in which]
+    with metrics.trace("coinglass_snapshot"):
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(jobs)) or 1) as pool:
+            futs = [pool.submit(metrics.staged(f"{m}:{s}", fetch_metric, kind="metric"), s, m, api_key, timeout)
+                    for s, m in jobs]
+            results = {s: {m: {"status": "skipped", "rows": [], "error": None} for m in ENDPOINTS} for s in symbols}
+            for (s, m), f in zip(jobs, futs):
+                results[s][m] = f.result()
+        with metrics.span("aggregate"):
+            snap = aggregate(results, symbols)
+        with metrics.span("record"):
+            record_snapshot(snap)
+        return snap
+
+
+def record_snapshot(snap: dict, ts: float | None = None):
+    ts = ts if ts is not None else time.time()
+    for s, r in snap.items():
+        timeseries.record(s, {k: r[k] for k in RECORDED_FIELDS}, ts)
+
+
+def print_snapshot(snap: dict):
+    print("=== COINGLASS DERIVATIVES SNAPSHOT ===")
+    print(f"{'symbol':<7} {'OI':>10} {'ex':>3} {'funding':>9} {'fund(OI)':>9} {'1h long liq':>12} {'1h short liq':>13}  status")
+    fmt = lambda v, f: f.format(v) if v is not None else "-"
+    for s, r in snap.items():
+        bad = {m: st for m, st in r["status"].items() if st not in ("ok", "skipped")}
+        status = "ok" if not bad else ", ".join(f"{m}={st}" for m, st in bad.items())
+        print(f"{s:<7} {fmt(r['oi'] and r['oi'] / 1e9, '${:.2f}B'):>10} {r['oiExchanges']:>3} "
+              f"{fmt(r['funding'], '{:.4f}%'):>9} {fmt(r['fundingOiWeighted'], '{:.4f}%'):>9} "
+              f"{fmt(r['longLiq'] and r['longLiq'] / 1e6, '${:.2f}M'):>12} "
+              f"{fmt(r['shortLiq'] and r['shortLiq'] / 1e6, '${:.2f}M'):>13}  {status}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 coinglass_snapshot.py <coinglass_api_key> [SYMBOL ...]")
+        return 1
+    print_snapshot(snapshot(sys.argv[2:] or symbols_from_env(), sys.argv[1]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
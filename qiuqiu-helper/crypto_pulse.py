@@ -1,17 +1,26 @@
-import requests
+import http_client
+import advisor_client
 import sys
 
-def get_pulse(cg_api_key):
+from get_crypto_price_v2 import fetch_btc_spot_coinbase
+
+def fetch_btc_spot_coingecko(cg_api_key=None, timeout: float = 5):
+    # Plain BTC/USD from CoinGecko simple/price (used by the spot aggregator)
+    headers = {"x-cg-demo-api-key": cg_api_key} if cg_api_key else None
+    params = {"ids": "bitcoin", "vs_currencies": "usd"}
+    res = http_client.get("https://api.coingecko.com/api/v3/simple/price", headers=headers, params=params, timeout=timeout)
+    res.raise_for_status()
+    return float(res.json()['bitcoin']['usd'])
+
+def fetch_pulse(cg_api_key):
     # Sources
-    CB_URL = "https://api.coinbase.com/v2/prices/BTC-USD/spot"
     CG_URL = "https://api.coingecko.com/api/v3/simple/price"
     
     pulse_data = {}
 
     # 1. Get Coinbase Instant Price
     try:
-        cb_res = requests.get(CB_URL, timeout=5)
-        pulse_data['cb_price'] = float(cb_res.json()['data']['amount'])
+        pulse_data['cb_price'] = fetch_btc_spot_coinbase(timeout=5)
     except:
         pulse_data['cb_price'] = None
 
@@ -24,7 +33,7 @@ def get_pulse(cg_api_key):
             "include_24hr_vol": "true",
             "include_24hr_change": "true"
         }
-        cg_res = requests.get(CG_URL, headers=cg_headers, params=cg_params, timeout=5)
+        cg_res = http_client.get(CG_URL, headers=cg_headers, params=cg_params, timeout=5)
         cg_data = cg_res.json()['bitcoin']
         pulse_data['cg_price'] = cg_data['usd']
         pulse_data['change_24h'] = cg_data['usd_24h_change']
@@ -32,6 +41,18 @@ def get_pulse(cg_api_key):
     except:
         pulse_data['cg_price'] = None
 
+    record_pulse(pulse_data)
+    return pulse_data
+
+def record_pulse(pulse_data):
+    # Append the sample to the time-series store (pulse.cb_price, pulse.spread, ...)
+    import timeseries
+    values = dict(pulse_data)
+    if pulse_data.get('cb_price') and pulse_data.get('cg_price'):
+        values['spread'] = pulse_data['cb_price'] - pulse_data['cg_price']
+    timeseries.record("pulse", values)
+
+def print_pulse(pulse_data):
     # Output Summary
     print("=== CRYPTO PULSE [BTC] ===")
     if pulse_data['cb_price']:
@@ -54,8 +75,15 @@ def get_pulse(cg_api_key):
         else:
             print("Status: Ranging/Consolidating.")
 
-if __name__ == "__main__":
+def get_pulse(cg_api_key):
+    print_pulse(fetch_pulse(cg_api_key))
+
+def main():
     if len(sys.argv) < 2:
         print("Error: Missing CG API Key")
     else:
-        get_pulse(sys.argv[1])
+        # Thin client: local advisor service first, direct fetch as fallback
+        print_pulse(advisor_client.query("/pulse", sys.argv[1]) or fetch_pulse(sys.argv[1]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import argparse
+import csv
+import datetime as dt
+import math
+import sys
+import time
+
+from dca_daily_report import DCA_PARAMS, DEFAULT_TOTAL_UNITS, action_to_units, decide_action
+
+# Historical replay of get_dca_instruction()'s decision logic.
+# Streaks and ammo are tracked in memory (same semantics as TrackerStore.consecutive_days() and
+# the tracker's units_used), so nothing is written to dca_ammo_tracker.json.
+# Usage: python3 dca_backtest.py history.csv [--selfcalc]   (CSV columns: date,close,ahr999[,mvrvZ])
+# Rows without an ahr999 value (e.g. the first 199 days of a backfill) are skipped.
+# Self-calculated Ahr999 is decided on ALIGN_RATIO-scaled thresholds, like the live report:
+# --selfcalc, or automatically for ahr999_backfill.py output (it has an expPrice column).
+
+
+def run_backtest(
+    prices,
+    ahrs,
+    mvrvs=None,
+    params: dict | None = None,
+    total_units: int = DEFAULT_TOTAL_UNITS,
+    using_selfcalc: bool = False,
+    unit_usd: float = 1.0,
+):
+    # prices/ahrs/mvrvs: equal-length daily sequences (lists or NumPy arrays).
+    # A missing MVRV (None/NaN) behaves like an unavailable feed: 3x is blocked.
+    params = params or DCA_PARAMS
+    n = len(prices)
+
+    actions = []
+    units_path = []
+    used = 0
+    last_action = None
+    streak = 0
+    usd_spent = 0.0
+    btc_bought = 0.0
+    ammo_out_day = None
+
+    for i in range(n):
+        price = float(prices[i])
+        mv = None if mvrvs is None else mvrvs[i]
+        if mv is not None and math.isnan(mv):
+            mv = None
+
+        remaining = max(total_units - used, 0)
+        action, _, _ = decide_action(
+            price,
+            float(ahrs[i]),
+            using_selfcalc,
+            mv,
+            remaining,
+            streak if last_action == "3x" else 0,
+            streak if last_action == "2x" else 0,
+            params,
+        )
+
+        units = action_to_units(action)
+        used += units
+        if units:
+            usd_spent += units * unit_usd
+            btc_bought += units * unit_usd / price
+        if ammo_out_day is None and used >= total_units:
+            ammo_out_day = i
+
+        streak = streak + 1 if action == last_action else 1
+        last_action = action
+        actions.append(action)
+        units_path.append(units)
+
+    return {
+        "actions": actions,
+        "units": units_path,
+        "units_used": used,
+        "usd_spent": usd_spent,
+        "btc_bought": btc_bought,
+        "avg_cost": (usd_spent / btc_bought) if btc_bought else None,
+        "ammo_out_day": ammo_out_day,
+    }
+
+
+def is_selfcalc_csv(fieldnames) -> bool:
+    # ahr999_backfill.py output: self-calculated Ahr999
+    return "expPrice" in (fieldnames or ())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay the DCA decision rules over history")
+    ap.add_argument("history", help="CSV with columns date,close,ahr999[,mvrvZ]")
+    ap.add_argument("--selfcalc", action="store_true",
+                    help="apply ALIGN_RATIO to thresholds (default for ahr999_backfill.py output)")
+    args = ap.parse_args()
+
+    dates, prices, ahrs, mvrvs = [], [], [], []
+    with open(args.history, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        using_selfcalc = args.selfcalc or is_selfcalc_csv(reader.fieldnames)
+        for row in reader:
+            try:
+                ahr = float(row["ahr999"])
+            except (TypeError, ValueError):
+                continue
+            if math.isnan(ahr):
+                continue
+            dates.append(dt.date.fromisoformat(row["date"]))
+            prices.append(float(row["close"]))
+            ahrs.append(ahr)
+            mv = row.get("mvrvZ")
+            mvrvs.append(float(mv) if mv not in (None, "") else None)
+
+    if not dates:
+        print("Error: no usable rows in input")
+        return 1
+
+    t0 = time.perf_counter()
+    res = run_backtest(prices, ahrs, mvrvs, using_selfcalc=using_selfcalc)
+    elapsed = time.perf_counter() - t0
+
+    counts = {}
+    for a in res["actions"]:
+        counts[a] = counts.get(a, 0) + 1
+
+    print("=== QIUQIU DCA BACKTEST ===")
+    print(f"Period:        {dates[0]} → {dates[-1]} ({len(dates)} days, {elapsed * 1000:.1f} ms)")
+    if using_selfcalc:
+        print(f"Thresholds:    self-calc (CoinGlass thresholds x {DCA_PARAMS['align_ratio']})")
+    else:
+        print("Thresholds:    CoinGlass")
+    print("Actions:       " + ", ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+    print(f"Units used:    {res['units_used']}/{DEFAULT_TOTAL_UNITS}")
+    if res["avg_cost"]:
+        print(f"Avg cost:      ${res['avg_cost']:,.2f}")
+    if res["ammo_out_day"] is not None:
+        print(f"Ammo out:      {dates[res['ammo_out_day']]}")
+    else:
+        print("Ammo out:      never")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from dca_daily_report import DCA_PARAMS, DEFAULT_TOTAL_UNITS, evaluate_tracker, fetch_market_inputs
+from tracker_store import open_tracker
+
+# Batch DCA: one market fetch (price, Ahr999, MVRV), then every account's tracker is
+# evaluated and updated with its own units / thresholds / fuses / guardrails.
+# Tracker I/O runs in parallel (one SQLite file per account) and the output is a single
+# combined report. Upstream calls stay constant however many accounts there are.
+# Config (DCA_BATCH_CONFIG or argv[1]):
+#   {"accounts": [
+#     {"name": "main", "tracker": "/path/main_tracker.json", "total_units": 600},
+#     {"name": "kid", "tracker": "/path/kid_tracker.json", "total_units": 300,
+#      "db": "/path/kid.db", "params": {"fuse_3x_days": 30, "ammo_no_3x_below": 100}}
+#   ]}
+# "params" may override any DCA_PARAMS key; "db" defaults to the tracker path with .db.
+
+DEFAULT_CONFIG_PATH = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/dca_accounts.json")
+MAX_PARALLEL_TRACKERS = 8
+
+
+def load_accounts(path: str | None = None):
+    path = path or os.getenv("DCA_BATCH_CONFIG", DEFAULT_CONFIG_PATH)
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    accounts = raw["accounts"] if isinstance(raw, dict) else raw
+    seen = set()
+    for acc in accounts:
+        name = acc.get("name")
+        if not name or not acc.get("tracker"):
+            raise ValueError(f"Account needs 'name' and 'tracker': {acc}")
+        # two accounts on one tracker would record the same day twice
+        tracker = os.path.abspath(os.path.expanduser(acc["tracker"]))
+        if name in seen or tracker in seen:
+            raise ValueError(f"Duplicate account name or tracker: {name}")
+        seen.update((name, tracker))
+        unknown = set(acc.get("params") or {}) - set(DCA_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown DCA params for account {name}: {', '.join(sorted(unknown))}")
+    return accounts
+
+
+def account_params(acc: dict) -> dict:
+    p = dict(DCA_PARAMS)
+    p.update(acc.get("params") or {})
+    return p
+
+
+def evaluate_account(acc: dict, inputs: dict):
+    # One account: open (migrating legacy JSON on first use), decide, record
+    total_units = int(acc.get("total_units", DEFAULT_TOTAL_UNITS))
+    store = open_tracker(os.path.expanduser(acc["tracker"]), total_units, acc.get("db"))
+    try:
+        res = evaluate_tracker(store, inputs["price"], inputs["price_source"], inputs["ahr"], inputs["mvrv"],
+                               account_params(acc), record=not inputs.get("stale"))
+    finally:
+        store.close()
+    res["name"] = acc["name"]
+    return res
+
+
+def run_batch(accounts, inputs: dict | None = None):
+    # {"inputs": market inputs, "results": [per-account result or {"name", "error"}]}
+    with metrics.trace("dca_batch"):
+        inputs = inputs or fetch_market_inputs()
+        if inputs["error"]:
+            return {"inputs": inputs, "results": []}
+
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_PARALLEL_TRACKERS, len(accounts)))) as pool:
+            futs = [pool.submit(metrics.staged(acc["name"], evaluate_account, kind="account"), acc, inputs)
+                    for acc in accounts]
+            results = []
+            for acc, f in zip(accounts, futs):
+                try:
+                    results.append(f.result())
+                except Exception as e:
+                    # one broken tracker must not cost the other accounts their run
+                    results.append({"name": acc["name"], "error": str(e)})
+    return {"inputs": inputs, "results": results}
+
+
+def render_batch_report(batch: dict):
+    inputs = batch["inputs"]
+    if inputs["error"]:
+        return inputs["error"]
+    ahr, mvrv = inputs["ahr"], inputs["mvrv"]
+    results = batch["results"]
+
+    lines = []
+    lines.append(f"=== QIUQIU DCA BATCH ({len(results)} accounts) ===")
+    lines.append(f"BTC Spot:            ${inputs['price']:,.2f}  ({inputs['price_source']})")
+    lines.append(f"Ahr999:              {ahr['value']:.4f}  ({ahr['source']})")
+    if ahr.get("primaryError"):
+        lines.append(f"Ahr999 Primary:      CoinGlass unavailable ({ahr['primaryError']})")
+    lines.append(f"MVRV Z-Score:         {mvrv.get('value')}  ({mvrv.get('date')}, {mvrv.get('source')})")
+    lines.append("--------------------------")
+    lines.append(f"{'account':<16} {'action':<8} {'units':>5} {'used/total':>11} {'left':>5} {'3x':>4} {'2x':>4}")
+    for r in results:
+        if "error" in r:
+            lines.append(f"{r['name']:<16} ERROR: {r['error']}")
+            continue
+        used = f"{r['usedUnits']}/{r['totalUnits']}"
+        lines.append(f"{r['name']:<16} {'[' + r['action'] + ']':<8} {r['units']:>5} {used:>11} "
+                     f"{r['remainingUnits']:>5} {r['streak3x']:>4} {r['streak2x']:>4}")
+        for note in (r["mvrvNote"], r["fuseNote"], r["ahrAnomaly"]):
+            if note:
+                lines.append(f"{'':<16} - {note}")
+    failed = sum(1 for r in results if "error" in r)
+    if failed:
+        lines.append(f"Failed accounts:      {failed}/{len(results)}")
+    if inputs.get("stale"):
+        lines.append(f"Not recorded:         last good values used for {', '.join(inputs['stale'])}; the next run retries with fresh data")
+    return "\n".join(lines)
+
+
+def main():
+    try:
+        accounts = load_accounts(sys.argv[1] if len(sys.argv) > 1 else None)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: cannot load batch config ({e})")
+        return 1
+    batch = run_batch(accounts)
+    print(render_batch_report(batch))
+    return 1 if batch["inputs"]["error"] or any("error" in r for r in batch["results"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,67 @@
-import requests
-import math
+import http_client
 import datetime as dt
+import hashlib
 import os
 import json
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import advisor_client
+import last_good
+import metrics
+from btc_model import A_EXP, B_EXP, GENESIS, exp_params, exp_price, gma  # noqa: F401 (re-exported)
+from coinglass_cache import fetch_coinglass_ahr999_latest
+from exp_fit import sync_exp_fit
+from get_crypto_price_v2 import fetch_btc_spot_coinbase
+from price_history import recent_closes, recent_dated_closes
+from rolling_gma import DEFAULT_STATE_PATH as GMA_STATE_PATH, load_rolling_gma, sync_rolling_gma
+from spot_aggregator import aggregate_spot
+from tracker_store import open_tracker
 
 # DCA daily report
-# - Price source: Coinbase spot
-# - Ahr999 primary: CoinGlass (manual/override if provided)
+# - Price source: hedged spot across Coinbase/Binance/OKX/CoinGecko (fetched once,
+#   shared with the Ahr999 self-calc)
+# - Ahr999 primary: CoinGlass (COINGLASS_AHR999 manual override, else the cached
+#   /indicator/ahr999 endpoint when COINGLASS_API_KEY is set)
 # - Ahr999 fallback: self-calculated (CoinGecko daily closes + fixed ExpPrice params)
+# - Daily closes come from the local price history (price_history.py, QIUQIU_PRICE_HISTORY_DIR),
+#   synced incrementally
 
-# Self-calc (B) fixed params for ExpPrice
-A_EXP = 5.84
-B_EXP = -17.01
-GENESIS = dt.date(2009, 1, 3)
+# Self-calc (B) params for ExpPrice: A_EXP / B_EXP / GENESIS live in btc_model.py; once
+# exp_fit.py has a usable least-squares fit, exp_price() uses that instead
 
 # Empirical adjustment to align self-calc(B) with CoinGlass (based on observed ~8.4% lower)
 # We scale CoinGlass thresholds down by ~0.915 when using self-calc.
 ALIGN_RATIO = 0.915
 
-# Ammo tracking
+# Ammo tracking (SQLite store at the same path with .db, or DCA_TRACKER_DB; see tracker_store.py)
 DEFAULT_TRACKER_PATH = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/dca_ammo_tracker.json")
 DEFAULT_TOTAL_UNITS = 600
 
+# Same-day memo of the finished decision and its inputs: later calls that UTC day render it
+# without any network (`dca intraday` re-fetches only the spot price). DCA_RESULT_CACHE=off disables it.
+DEFAULT_RESULT_CACHE_PATH = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/dca_today.json")
+# Sent to the advisor service with /dca requests (see config_fingerprint)
+DCA_CONFIG_HEADER = "X-Qiuqiu-Dca-Config"
+
+# Total latency budget (seconds) shared by a report's upstream calls (http_client.deadline).
+# A source that misses it, or whose provider's circuit is open, is served from its last
+# known good value (last_good.py) and the report says how old that is.
+REPORT_BUDGET_S = float(os.getenv("DCA_BUDGET_S", "3"))
+# Extra wait for in-flight results after the budget (they are cut off at it anyway)
+BUDGET_GRACE_S = 0.25
+# Oldest last good value a report may fall back to, per source. A report using any of them
+# is shown but not recorded (tracker, same-day memo): the next run retries with fresh data.
+LAST_GOOD_MAX_AGE_S = {
+    "price": float(os.getenv("DCA_LAST_GOOD_PRICE_MAX_AGE_S", "3600")),
+    "mvrv": 3 * 86400,
+    "ahr999_coinglass": 2 * 86400,
+    "gma200": 3 * 86400,
+}
+
 # Melt-down fuse: if we recommend 3x too long, downgrade to 2x to preserve ammo
 FUSE_3X_DAYS = int(os.getenv("DCA_FUSE_3X_DAYS", "60"))
 # Soft fuse for prolonged 2x (degrade to 1x if not deeply undervalued)
@@ -30,62 +70,78 @@ FUSE_2X_DAYS = int(os.getenv("DCA_FUSE_2X_DAYS", "180"))
 AMMO_NO_3X_BELOW = int(os.getenv("DCA_AMMO_NO_3X_BELOW", "200"))
 AMMO_FORCE_1X_BELOW = int(os.getenv("DCA_AMMO_FORCE_1X_BELOW", "120"))
 
+# Mining cost anchors (MacroMicro Feb 2026 targets; adjustable later)
+TOTAL_COST = 85000
+CASH_COST = 60000
 
-def fetch_btc_spot_coinbase():
-    r = requests.get("https://api.coinbase.com/v2/prices/BTC-USD/spot", timeout=10)
-    r.raise_for_status()
-    return float(r.json()["data"]["amount"])
-
-
-def fetch_btc_daily_closes_coingecko(days: int = 240):
-    url = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart"
-    params = {"vs_currency": "usd", "days": str(days), "interval": "daily"}
-    r = requests.get(url, params=params, timeout=20)
-    r.raise_for_status()
-    data = r.json().get("prices", [])
+# Decision parameters for decide_action(); backtests/sweeps pass their own copy
+# CoinGlass thresholds (conceptual): 3x if <0.40, 2x if <0.45
+DCA_PARAMS = {
+    "thr_3x": 0.40,
+    "thr_2x": 0.45,
+    "align_ratio": ALIGN_RATIO,
+    "total_cost": TOTAL_COST,
+    "cash_cost": CASH_COST,
+    "fuse_3x_days": FUSE_3X_DAYS,
+    "fuse_2x_days": FUSE_2X_DAYS,
+    "ammo_no_3x_below": AMMO_NO_3X_BELOW,
+    "ammo_force_1x_below": AMMO_FORCE_1X_BELOW,
+}
 
-    by_date = {}
-    for ts_ms, price in data:
-        d = dt.datetime.utcfromtimestamp(ts_ms / 1000).date()
-        by_date[d] = float(price)
 
-    closes = [by_date[d] for d in sorted(by_date.keys())]
-    return closes
+def fetch_btc_spot():
+    # Hedged across venues (spot_aggregator.py); DCA_SPOT_MODE=first|median
+    return aggregate_spot(os.getenv("DCA_SPOT_MODE", "first"), timeout=10)
 
 
-def gma(prices):
-    s = 0.0
-    n = 0
-    for p in prices:
-        if p and p > 0:
-            s += math.log(p)
-            n += 1
-    return math.exp(s / n) if n else None
+def fetch_btc_daily_closes_coingecko(days: int = 240):
+    # View of the local price history; only the days since the last sync hit CoinGecko
+    return recent_closes(days, timeout=20)
 
 
-def exp_price(today: dt.date):
-    days = (today - GENESIS).days
-    return 10 ** (A_EXP * math.log10(days) + B_EXP)
+def sync_gma200_state():
+    # GMA200 comes from the persisted rolling state; only new closes are pushed (O(1) each),
+    # and the same closes update the ExpPrice fit's sums
+    closes = recent_dated_closes(240, timeout=20)
+    state = sync_rolling_gma(closes)
+    sync_exp_fit(closes)
+    if not state.is_full():
+        raise RuntimeError(f"Not enough daily closes from CoinGecko: got {state.count}")
+    return state
 
 
-def ahr999_selfcalc():
-    today = dt.datetime.utcnow().date()
-    closes = fetch_btc_daily_closes_coingecko(240)
-    if len(closes) < 200:
-        raise RuntimeError(f"Not enough daily closes from CoinGecko: got {len(closes)}")
-    gma200 = gma(closes[-200:])
-    p = fetch_btc_spot_coinbase()
-    e = exp_price(today)
-    val = (p / gma200) * (p / e)
+def ahr999_from_state(state, price: float, today: dt.date | None = None):
+    today = today or dt.datetime.utcnow().date()
+    a, b, fit = exp_params()
+    e = exp_price(today, (a, b))
     return {
-        "value": val,
-        "source": "selfcalc(B): CoinGecko daily GMA200 + fixed ExpPrice",
-        "gma200": gma200,
+        "value": state.ahr999_at(price, e),
+        "source": f"selfcalc(B): CoinGecko daily GMA200 + {fit} ExpPrice",
+        "gma200": state.value(),
         "expPrice": e,
+        "expA": a,
+        "expB": b,
+        "expFit": fit,
     }
 
 
-def ahr999_primary_or_fallback():
+def ahr999_selfcalc(spot: float | None = None):
+    # `spot` lets the report share one Coinbase price instead of fetching it twice
+    state = sync_gma200_state()
+    p = spot if spot is not None else fetch_btc_spot_coinbase(timeout=10)
+    return ahr999_from_state(state, p)
+
+
+def ahr999_at(price: float, today: dt.date | None = None):
+    # Intraday what-if: Ahr999 at an arbitrary spot price from the saved GMA200 state (no network)
+    today = today or dt.datetime.utcnow().date()
+    state = load_rolling_gma()
+    if not state.is_full():
+        return None
+    return state.ahr999_at(price, exp_price(today))
+
+
+def ahr999_override():
     # Primary: CoinGlass value provided manually (environment override)
     # Example: export COINGLASS_AHR999=0.42
     v = os.getenv("COINGLASS_AHR999")
@@ -94,16 +150,40 @@ def ahr999_primary_or_fallback():
             return {"value": float(v), "source": "CoinGlass (manual override via COINGLASS_AHR999)"}
         except:
             pass
+    return None
+
+
+def fetch_ahr999_coinglass():
+    # Primary: CoinGlass official value via the cached indicator endpoint (coinglass_cache.py)
+    # Needs COINGLASS_API_KEY; returns None when no key is configured.
+    key = os.getenv("COINGLASS_API_KEY")
+    if not key:
+        return None
+    latest = fetch_coinglass_ahr999_latest(key)
+    return {"value": latest["value"], "source": f"CoinGlass /indicator/ahr999 ({latest['date']})"}
+
+
+def ahr999_primary_or_fallback(spot: float | None = None):
+    override = ahr999_override()
+    if override:
+        return override
+
+    try:
+        cg = fetch_ahr999_coinglass()
+        if cg:
+            return cg
+    except Exception:
+        pass
 
     # Fallback: selfcalc
-    return ahr999_selfcalc()
+    return ahr999_selfcalc(spot)
 
 
 def fetch_mvrv_zscore_last(n: int = 1):
     # Free-ish on-chain endpoint (BGeometrics / bitcoin-data.com)
     # Example: https://bitcoin-data.com/v1/mvrv-zscore/1
     url = f"https://bitcoin-data.com/v1/mvrv-zscore/{n}"
-    r = requests.get(url, timeout=20)
+    r = http_client.get(url, timeout=20)
     r.raise_for_status()
     j = r.json()
     # when n=1, response is an object; when n>1, could be list (keep simple)
@@ -116,20 +196,6 @@ def fetch_mvrv_zscore_last(n: int = 1):
     }
 
 
-def load_tracker(path: str):
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {"total_units": DEFAULT_TOTAL_UNITS, "units_used": 0, "history": []}
-
-
-def save_tracker(path: str, tracker: dict):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(tracker, f, ensure_ascii=False, indent=2)
-
-
 def action_to_units(action: str) -> int:
     # Returns how many baseline units consumed for the day
     if action == "PAUSE":
@@ -143,86 +209,28 @@ def action_to_units(action: str) -> int:
     return 0
 
 
-def update_tracker_for_today(tracker_path: str, action: str, meta: dict | None = None):
-    today = dt.datetime.utcnow().date().isoformat()
-    tracker = load_tracker(tracker_path)
-    tracker.setdefault("total_units", DEFAULT_TOTAL_UNITS)
-    tracker.setdefault("units_used", 0)
-    tracker.setdefault("history", [])
-
-    # avoid double counting the same day
-    for item in tracker["history"]:
-        if item.get("date") == today:
-            return tracker
-
-    units = action_to_units(action)
-    entry = {"date": today, "action": action, "units": units}
-    if meta:
-        entry["meta"] = meta
-
-    tracker["history"].append(entry)
-    tracker["units_used"] = int(tracker.get("units_used", 0)) + units
-    save_tracker(tracker_path, tracker)
-    return tracker
-
-
-def consecutive_days(tracker: dict, action: str) -> int:
-    # Count consecutive days ending at the most recent entry with the same action
-    hist = tracker.get("history", [])
-    if not hist:
-        return 0
-    c = 0
-    for item in reversed(hist):
-        if item.get("action") == action:
-            c += 1
-        else:
-            break
-    return c
-
-
-def last_meta_value(tracker: dict, key: str):
-    # Find the most recent meta[key] in history
-    for item in reversed(tracker.get("history", [])):
-        meta = item.get("meta") or {}
-        if key in meta and meta[key] is not None:
-            return meta[key]
-    return None
-
-
-def get_dca_instruction():
-    # 1) Price
-    try:
-        price = fetch_btc_spot_coinbase()
-    except Exception as e:
-        return f"Error: Price fetch failed ({e})."
-
-    # 2) Ahr999
-    try:
-        ahr = ahr999_primary_or_fallback()
-    except Exception as e:
-        return f"Error: Ahr999 fetch/calc failed ({e})."
-
-    ahr_val = ahr["value"]
-    ahr_source = ahr["source"]
-
-    # 3) On-chain confirmation: MVRV Z-Score
-    try:
-        mvrv = fetch_mvrv_zscore_last(1)
-    except Exception as e:
-        mvrv = {"date": None, "value": None, "source": f"unavailable ({e})"}
-
-    # 4) Mining cost anchors (MacroMicro Feb 2026 targets; adjustable later)
-    total_cost = 85000
-    cash_cost = 60000
-
-    # 4) Thresholds (CoinGlass-first semantics)
-    # CoinGlass thresholds (conceptual): 3x if <0.40, 2x if <0.45
+def decide_action(
+    price: float,
+    ahr_val: float,
+    using_selfcalc: bool,
+    mvrv_value: float | None,
+    remaining: int,
+    streak_3x: int,
+    streak_2x: int,
+    params: dict | None = None,
+):
+    # Pure decision step (no I/O), shared by the daily report and the backtest.
+    # Returns (action, mvrv_note, fuse_note).
+    p = params or DCA_PARAMS
+    total_cost = p["total_cost"]
+    cash_cost = p["cash_cost"]
+
+    # Thresholds (CoinGlass-first semantics)
     # When using self-calc, thresholds are scaled down by ALIGN_RATIO.
-    using_selfcalc = ahr_source.startswith("selfcalc")
-    thr_3x = (0.40 * ALIGN_RATIO) if using_selfcalc else 0.40
-    thr_2x = (0.45 * ALIGN_RATIO) if using_selfcalc else 0.45
+    thr_3x = (p["thr_3x"] * p["align_ratio"]) if using_selfcalc else p["thr_3x"]
+    thr_2x = (p["thr_2x"] * p["align_ratio"]) if using_selfcalc else p["thr_2x"]
 
-    # 5) Multiplier logic (1-2-3 model + pause)
+    # Multiplier logic (1-2-3 model + pause)
     if price > total_cost * 1.2:
         action = "PAUSE"
     elif price <= cash_cost or ahr_val < thr_3x:
@@ -232,26 +240,325 @@ def get_dca_instruction():
     else:
         action = "1x"
 
-    # 6) MVRV confirmation rule (to prevent over-aggressive 3x)
+    # MVRV confirmation rule (to prevent over-aggressive 3x)
     # Only allow 3x when MVRV Z-Score is "low" (cheap vs realized value).
     # If MVRV is unavailable, we block 3x (downgrade to 2x) to stay conservative.
     mvrv_note = None
     if action == "3x":
-        if mvrv.get("value") is None:
+        if mvrv_value is None:
             action = "2x"
             mvrv_note = "MVRV unavailable → block 3x, downgrade to 2x"
-        elif mvrv["value"] > 1.0:
+        elif mvrv_value > 1.0:
             action = "2x"
-            mvrv_note = f"MVRV {mvrv['value']:.4f} > 1.0 → block 3x, downgrade to 2x"
+            mvrv_note = f"MVRV {mvrv_value:.4f} > 1.0 → block 3x, downgrade to 2x"
+
+    fuse_note = None
+
+    # Ammo guardrails
+    if remaining < p["ammo_force_1x_below"] and action != "PAUSE":
+        if action != "1x":
+            fuse_note = f"Ammo guardrail: remaining {remaining} < {p['ammo_force_1x_below']} → force 1x"
+        action = "1x"
+
+    if remaining < p["ammo_no_3x_below"] and action == "3x":
+        action = "2x"
+        fuse_note = f"Ammo guardrail: remaining {remaining} < {p['ammo_no_3x_below']} → block 3x, downgrade to 2x"
+
+    # 3x fuse (hard)
+    if action == "3x" and streak_3x >= p["fuse_3x_days"]:
+        action = "2x"
+        fuse_note = f"Fuse tripped: 3x streak {streak_3x}d >= {p['fuse_3x_days']}d → downgrade to 2x"
+
+    # 2x soft fuse: if 2x persists too long AND market isn't cheap enough, degrade to 1x
+    if action == "2x" and streak_2x >= p["fuse_2x_days"]:
+        # require MVRV > 1.0 to trigger downgrade, otherwise keep 2x
+        if mvrv_value is not None and mvrv_value > 1.0:
+            action = "1x"
+            fuse_note = f"Soft fuse: 2x streak {streak_2x}d >= {p['fuse_2x_days']}d and MVRV {mvrv_value:.4f} > 1.0 → downgrade to 1x"
+
+    return action, mvrv_note, fuse_note
+
+
+def _stale_note(age: float) -> str:
+    return f"last good, {last_good.format_age(age)} old"
+
+
+def _with_last_good(price_res, gma_res, mvrv_res, cg_res):
+    # Fresh results are remembered; failed / over-budget ones are replaced by the last good
+    # value, marked stale. Returns the four results plus {source: age_seconds}.
+    stale = {}
+    fresh = {}
+
+    def resolve(key, res):
+        if not isinstance(res, BaseException):
+            if res is not None:
+                fresh[key] = res
+            return res
+        hit = last_good.recall(key, LAST_GOOD_MAX_AGE_S[key])
+        if hit is None:
+            return res
+        value, age = hit
+        stale[key] = age
+        return dict(value, staleError=str(res))
+
+    price_res = resolve("price", price_res)
+    mvrv_res = resolve("mvrv", mvrv_res)
+
+    # The self-calc only matters without a fresh CoinGlass value (_market_inputs prefers
+    # it): a failed GMA200 sync next to one neither falls back nor makes the report stale
+    cg_fresh = cg_res is not None and not isinstance(cg_res, BaseException)
+    if isinstance(gma_res, BaseException) and not cg_fresh:
+        # The rolling GMA200 state on disk is the last good sync
+        state = load_rolling_gma()
+        path = os.getenv("DCA_GMA_STATE_PATH", GMA_STATE_PATH)
+        try:
+            age = time.time() - os.path.getmtime(path)
+        except OSError:
+            age = None
+        if state.is_full() and age is not None and age <= LAST_GOOD_MAX_AGE_S["gma200"]:
+            stale["gma200"] = age
+            gma_res = state
+    # A failed CoinGlass read falls back to the self-calc as before; its last good value
+    # is only used when there is no self-calc either
+    if not isinstance(cg_res, BaseException) or isinstance(gma_res, BaseException):
+        cg_res = resolve("ahr999_coinglass", cg_res)
+    last_good.remember(fresh)
+    return price_res, gma_res, mvrv_res, cg_res, stale
+
+
+def _market_inputs(price_res, gma_res, mvrv_res, override, cg_res=None, stale: dict | None = None):
+    # Combine settled fetch results (value or exception) into the report inputs
+    stale = stale or {}
+    inputs = {"price": None, "price_source": None, "ahr": None, "mvrv": None, "error": None, "stale": stale}
+
+    # 1) Price
+    if isinstance(price_res, BaseException):
+        inputs["error"] = f"Error: Price fetch failed ({price_res})."
+        return inputs
+    inputs["price"] = price_res["price"]
+    inputs["price_source"] = price_res["venue"]
+    if "price" in stale:
+        inputs["price_source"] += f", {_stale_note(stale['price'])}"
+
+    # 2) Ahr999 (one spot price shared with the self-calc)
+    if override:
+        inputs["ahr"] = override
+    elif cg_res is not None and not isinstance(cg_res, BaseException):
+        inputs["ahr"] = cg_res
+        if "ahr999_coinglass" in stale:
+            inputs["ahr"] = dict(cg_res, source=f"{cg_res['source']} [{_stale_note(stale['ahr999_coinglass'])}]")
+    elif isinstance(gma_res, BaseException):
+        inputs["error"] = f"Error: Ahr999 fetch/calc failed ({gma_res})."
+        return inputs
+    else:
+        try:
+            inputs["ahr"] = ahr999_from_state(gma_res, inputs["price"])
+            if "gma200" in stale:
+                inputs["ahr"]["source"] += f" [GMA200 {_stale_note(stale['gma200'])}]"
+            if isinstance(cg_res, BaseException):
+                inputs["ahr"]["primaryError"] = str(cg_res)
+        except Exception as e:
+            inputs["error"] = f"Error: Ahr999 fetch/calc failed ({e})."
+            return inputs
+
+    # 3) On-chain confirmation: MVRV Z-Score
+    if isinstance(mvrv_res, BaseException):
+        inputs["mvrv"] = {"date": None, "value": None, "source": f"unavailable ({mvrv_res})"}
+    else:
+        inputs["mvrv"] = mvrv_res
+        if "mvrv" in stale:
+            inputs["mvrv"] = dict(mvrv_res, source=f"{mvrv_res['source']} [{_stale_note(stale['mvrv'])}]")
+    return inputs
+
+
+def _settle(fut, until: float | None = None):
+    # Result or exception; a job still running at `until` (monotonic) counts as over budget
+    if fut is None:
+        return None
+    try:
+        return fut.result(timeout=None if until is None else max(until - time.monotonic(), 0))
+    except FutureTimeout:
+        return http_client.BudgetExceeded("no answer within the latency budget")
+    except Exception as e:
+        return e
+
 
-    # 7) Ammo tracking (record today's recommended action as baseline consumption)
-    tracker_path = os.getenv("DCA_TRACKER_PATH", DEFAULT_TRACKER_PATH)
+def _spawn(fn):
+    # fn on a daemon thread, as a Future. Unlike pool workers, a straggler (a slow streamed
+    # parse, a flock wait) neither blocks the caller nor holds the interpreter at exit.
+    fut = Future()
+
+    def run():
+        try:
+            fut.set_result(fn())
+        except Exception as e:
+            fut.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return fut
+
+
+def fetch_market_inputs(spot_fn=None, gma_fn=None, mvrv_fn=None, budget: float | None = None):
+    # Independent upstream calls run concurrently: latency ~ the slowest one, not the sum,
+    # and never more than the budget. The *_fn hooks let a caller (e.g. advisor_service.py)
+    # serve them from its caches.
+    budget = REPORT_BUDGET_S if budget is None else budget
+    override = ahr999_override()
+    until = time.monotonic() + budget + BUDGET_GRACE_S
+    # Each job is a timing stage of the current metrics trace (see metrics.py) and
+    # inherits the deadline through the same context
+    with http_client.deadline(budget):
+        price_f = _spawn(metrics.staged("price", spot_fn or fetch_btc_spot))
+        # CoinGlass (primary) and the self-calc GMA200 (fallback) run side by side
+        cg_f = None if override else _spawn(metrics.staged("ahr999_coinglass", fetch_ahr999_coinglass))
+        gma_f = None if override else _spawn(metrics.staged("ahr999_selfcalc", gma_fn or sync_gma200_state))
+        mvrv_f = _spawn(metrics.staged("mvrv", mvrv_fn or (lambda: fetch_mvrv_zscore_last(1))))
+    # stragglers finish in the background (their calls are cut off at the deadline)
+    settled = [_settle(f, until) for f in (price_f, gma_f, mvrv_f, cg_f)]
+    price_res, gma_res, mvrv_res, cg_res, stale = _with_last_good(*settled)
+    return _market_inputs(price_res, gma_res, mvrv_res, override, cg_res, stale)
+
+
+async def fetch_market_inputs_async(budget: float | None = None):
+    import asyncio  # imported lazily: ~50ms that the sync CLI path never needs
+
+    budget = REPORT_BUDGET_S if budget is None else budget
+    override = ahr999_override()
+    with http_client.deadline(budget):
+        # staged() binds the context, so every job shares the deadline; daemon threads (not
+        # the loop's default executor) so stragglers don't hold up loop or interpreter exit
+        jobs = [
+            asyncio.wrap_future(_spawn(metrics.staged("price", fetch_btc_spot))),
+            asyncio.wrap_future(_spawn(metrics.staged("ahr999_selfcalc", sync_gma200_state))) if not override else None,
+            asyncio.wrap_future(_spawn(metrics.staged("mvrv", lambda: fetch_mvrv_zscore_last(1)))),
+            asyncio.wrap_future(_spawn(metrics.staged("ahr999_coinglass", fetch_ahr999_coinglass))) if not override else None,
+        ]
+    await asyncio.wait([j for j in jobs if j is not None], timeout=budget + BUDGET_GRACE_S)
+    settled = []
+    for j in jobs:
+        if j is None:
+            settled.append(None)
+        elif not j.done():
+            settled.append(http_client.BudgetExceeded("no answer within the latency budget"))
+        else:
+            settled.append(j.exception() or j.result())
+    price_res, gma_res, mvrv_res, cg_res, stale = _with_last_good(*settled)
+    return _market_inputs(price_res, gma_res, mvrv_res, override, cg_res, stale)
+
+
+def build_dca_report(inputs: dict):
+    memo = decide_today(inputs)
+    with metrics.span("render"):
+        return render_memo(memo)
+
+
+def tracker_path() -> str:
+    return os.getenv("DCA_TRACKER_PATH", DEFAULT_TRACKER_PATH)
+
+
+def config_fingerprint() -> str:
+    # What decides and records a report in this process. advisor_client sends it with /dca and
+    # the service answers 409 when its own differs (another tracker, override or parameters),
+    # so a client never gets, or writes to, the service's tracker by mistake.
+    cfg = {
+        "tracker": tracker_path(),
+        "trackerDb": os.getenv("DCA_TRACKER_DB"),
+        "resultCache": result_cache_path(),
+        "ahr999Override": os.getenv("COINGLASS_AHR999"),
+        "spotMode": os.getenv("DCA_SPOT_MODE", "first"),
+        "totalUnits": DEFAULT_TOTAL_UNITS,
+        "params": DCA_PARAMS,
+    }
+    return hashlib.sha1(json.dumps(cfg, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def result_cache_path():
+    if os.getenv("DCA_RESULT_CACHE", "").lower() in ("off", "0", "false"):
+        return None
+    return os.getenv("DCA_RESULT_CACHE_PATH", DEFAULT_RESULT_CACHE_PATH)
 
-    # Load tracker without mutating to decide fuse/guardrails
-    pre_tracker = load_tracker(tracker_path)
+
+def load_today_result(today: dt.date | None = None):
+    # Today's memo for the configured tracker, or None
+    path = result_cache_path()
+    if not path:
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            memo = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    today = (today or dt.datetime.utcnow().date()).isoformat()
+    if memo.get("date") != today or memo.get("trackerPath") != tracker_path():
+        return None
+    return memo
+
+
+def save_today_result(memo: dict):
+    path = result_cache_path()
+    if not path:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(memo, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        pass  # the decision is recorded in the tracker either way
+
+
+def decide_today(inputs: dict):
+    # Full run: decide, record and memoize. Returns the memo (or {"error"}).
+    # A decision on last good values is returned but neither recorded nor memoized.
+    if inputs["error"]:
+        return {"error": inputs["error"]}
+    record = not inputs.get("stale")
+
+    # 4) Ammo tracking (record today's recommended action as baseline consumption)
+    # SQLite store next to the legacy JSON path (migrated from it on first use)
+    with metrics.span("tracker_open"):
+        store = open_tracker(tracker_path(), DEFAULT_TOTAL_UNITS, os.getenv("DCA_TRACKER_DB"))
+    try:
+        res = evaluate_tracker(store, inputs["price"], inputs["price_source"], inputs["ahr"], inputs["mvrv"], record=record)
+    finally:
+        store.close()
+
+    now = dt.datetime.utcnow()
+    memo = {
+        "date": now.date().isoformat(),
+        "decidedAt": now.strftime("%H:%M"),
+        "trackerPath": tracker_path(),
+        "price": inputs["price"],
+        "priceSource": inputs["price_source"],
+        "ahr": inputs["ahr"],
+        "mvrv": inputs["mvrv"],
+        "stale": inputs.get("stale") or {},
+        "result": res,
+    }
+    if record:
+        save_today_result(memo)
+    return memo
+
+
+def evaluate_tracker(store, price: float, price_source: str, ahr: dict, mvrv: dict, params: dict | None = None,
+                     record: bool = True):
+    # Decide today's action for one tracker and record it. `params` defaults to DCA_PARAMS;
+    # dca_batch.py passes each account's own thresholds / fuses / guardrails.
+    # record=False (stale inputs) decides without writing; "recorded" in the result says
+    # whether today's entry exists.
+    p = params or DCA_PARAMS
+    ahr_val = ahr["value"]
+    ahr_source = ahr["source"]
+
+    # Read running state (no history scan) to decide fuse/guardrails
+    with metrics.span("tracker_load"):
+        pre_tracker = store.summary()
+        streak_3x_pre = store.consecutive_days("3x", pre_tracker)
+        streak_2x_pre = store.consecutive_days("2x", pre_tracker)
 
     # Basic anomaly check on Ahr999 when using selfcalc: compare vs last known ahr
-    last_ahr = last_meta_value(pre_tracker, "ahr")
+    last_ahr = store.last_meta_value("ahr", pre_tracker)
     ahr_anomaly = None
     if last_ahr is not None:
         try:
@@ -261,87 +568,189 @@ def get_dca_instruction():
         except:
             pass
 
-    # Apply guardrails + fuse logic before recording
-    fuse_note = None
-    mvrv_guard_note = mvrv_note
-
-    total_units_pre = int(pre_tracker.get("total_units", DEFAULT_TOTAL_UNITS))
-    used_units_pre = int(pre_tracker.get("units_used", 0))
+    total_units_pre = pre_tracker["total_units"]
+    used_units_pre = pre_tracker["units_used"]
     remaining_pre = max(total_units_pre - used_units_pre, 0)
 
-    # Ammo guardrails
-    if remaining_pre < AMMO_FORCE_1X_BELOW and action != "PAUSE":
-        if action != "1x":
-            fuse_note = f"Ammo guardrail: remaining {remaining_pre} < {AMMO_FORCE_1X_BELOW} → force 1x"
-        action = "1x"
+    # 5) Multiplier + MVRV gate + guardrails + fuses
+    with metrics.span("guardrails"):
+        action, mvrv_guard_note, fuse_note = decide_action(
+            price,
+            ahr_val,
+            ahr_source.startswith("selfcalc"),
+            mvrv.get("value"),
+            remaining_pre,
+            streak_3x_pre,
+            streak_2x_pre,
+            p,
+        )
+
+    with metrics.span("tracker_save"):
+        today = dt.datetime.utcnow().date().isoformat()
+        tracker, inserted = (pre_tracker, False) if not record else store.record_day(
+            today,
+            action,
+            action_to_units(action),
+            meta={
+                "mvrvZ": mvrv.get("value"),
+                "mvrvDate": mvrv.get("date"),
+                "mvrvNote": mvrv_guard_note,
+                "ahr": ahr_val,
+                "ahrSource": ahr_source,
+                "ahrAnomaly": ahr_anomaly,
+                "btc": price,
+                "btcSource": price_source,
+                "fuseNote": fuse_note,
+            },
+        )
+        recorded = inserted
+        if not inserted:
+            # Today was already recorded (an earlier run, another host): report that decision
+            for entry in store.history(today, today):
+                recorded = True
+                meta = entry.get("meta") or {}
+                action = entry["action"]
+                mvrv_guard_note, fuse_note = meta.get("mvrvNote"), meta.get("fuseNote")
+        total_units = tracker["total_units"]
+        used_units = tracker["units_used"]
+        streak_3x_after = store.consecutive_days("3x", tracker)
+        streak_2x_after = store.consecutive_days("2x", tracker)
 
-    if remaining_pre < AMMO_NO_3X_BELOW and action == "3x":
-        action = "2x"
-        fuse_note = f"Ammo guardrail: remaining {remaining_pre} < {AMMO_NO_3X_BELOW} → block 3x, downgrade to 2x"
+    return {
+        "action": action,
+        "units": action_to_units(action),
+        "mvrvNote": mvrv_guard_note,
+        "fuseNote": fuse_note,
+        "ahrAnomaly": ahr_anomaly,
+        "totalUnits": total_units,
+        "usedUnits": used_units,
+        "remainingUnits": max(total_units - used_units, 0),
+        "streak3x": streak_3x_after,
+        "streak2x": streak_2x_after,
+        "tracker": store.path,
+        "params": p,
+        "recorded": recorded,
+    }
 
-    # 3x fuse (hard)
-    streak_3x = consecutive_days(pre_tracker, "3x")
-    if action == "3x" and streak_3x >= FUSE_3X_DAYS:
-        action = "2x"
-        fuse_note = f"Fuse tripped: 3x streak {streak_3x}d >= {FUSE_3X_DAYS}d → downgrade to 2x"
 
-    # 2x soft fuse: if 2x persists too long AND market isn't cheap enough, degrade to 1x
-    streak_2x = consecutive_days(pre_tracker, "2x")
-    if action == "2x" and streak_2x >= FUSE_2X_DAYS:
-        # require MVRV > 1.0 to trigger downgrade, otherwise keep 2x
-        if mvrv.get("value") is not None and mvrv["value"] > 1.0:
-            action = "1x"
-            fuse_note = f"Soft fuse: 2x streak {streak_2x}d >= {FUSE_2X_DAYS}d and MVRV {mvrv['value']:.4f} > 1.0 → downgrade to 1x"
-
-    tracker = update_tracker_for_today(
-        tracker_path,
-        action,
-        meta={
-            "mvrvZ": mvrv.get("value"),
-            "mvrvDate": mvrv.get("date"),
-            "mvrvNote": mvrv_guard_note,
-            "ahr": ahr_val,
-            "ahrSource": ahr_source,
-            "ahrAnomaly": ahr_anomaly,
-            "btc": price,
-            "fuseNote": fuse_note,
-        },
-    )
-    total_units = int(tracker.get("total_units", DEFAULT_TOTAL_UNITS))
-    used_units = int(tracker.get("units_used", 0))
-    remaining_units = max(total_units - used_units, 0)
-    streak_3x_after = consecutive_days(tracker, "3x")
-    streak_2x_after = consecutive_days(tracker, "2x")
-
-    # 8) Report
+def render_report(price: float, price_source: str, ahr: dict, mvrv: dict, res: dict):
+    # 6) Report
+    p = res["params"]
     lines = []
     lines.append("=== QIUQIU DCA ADVISOR ===")
-    lines.append(f"BTC Spot (Coinbase): ${price:,.2f}")
-    lines.append(f"Ahr999:              {ahr_val:.4f}")
-    lines.append(f"Ahr999 Source:       {ahr_source}")
+    lines.append(f"BTC Spot:            ${price:,.2f}  ({price_source})")
+    lines.append(f"Ahr999:              {ahr['value']:.4f}")
+    lines.append(f"Ahr999 Source:       {ahr['source']}")
+    if ahr.get("primaryError"):
+        lines.append(f"Ahr999 Primary:      CoinGlass unavailable ({ahr['primaryError']})")
     if "gma200" in ahr:
         lines.append(f"GMA200 (CG daily):   ${ahr['gma200']:,.2f}")
-        lines.append(f"ExpPrice (fixed):    ${ahr['expPrice']:,.2f}  [a={A_EXP}, b={B_EXP}]")
+        lines.append(f"{'ExpPrice (' + ahr['expFit'] + '):':<21}${ahr['expPrice']:,.2f}  [a={ahr['expA']:.4g}, b={ahr['expB']:.4g}]")
     lines.append(f"MVRV Z-Score:         {mvrv.get('value')}  ({mvrv.get('date')})")
     lines.append(f"MVRV Source:          {mvrv.get('source')}")
-    lines.append(f"Mining Anchors:       Total ${total_cost:,.0f} / Cash ${cash_cost:,.0f}")
+    lines.append(f"Mining Anchors:       Total ${p['total_cost']:,.0f} / Cash ${p['cash_cost']:,.0f}")
     lines.append("--------------------------")
-    lines.append(f"RECOMMENDED ACTION:  [{action}]")
+    lines.append(f"RECOMMENDED ACTION:  [{res['action']}]")
     lines.append("--------------------------")
-    lines.append(f"Ammo (baseline units): used {used_units}/{total_units}, remaining {remaining_units}")
-    lines.append(f"2x streak:            {streak_2x_after} day(s)  (soft fuse={FUSE_2X_DAYS}d)")
-    lines.append(f"3x streak:            {streak_3x_after} day(s)  (fuse={FUSE_3X_DAYS}d)")
-    lines.append(f"Ammo guardrails:      block3x<{AMMO_NO_3X_BELOW}, force1x<{AMMO_FORCE_1X_BELOW}")
-    if mvrv_guard_note:
-        lines.append(f"MVRV gate:            {mvrv_guard_note}")
-    if fuse_note:
-        lines.append(f"Fuse:                 {fuse_note}")
-    if ahr_anomaly:
-        lines.append(f"Data warning:         {ahr_anomaly}")
-    lines.append(f"Tracker:              {tracker_path}")
+    lines.append(f"Ammo (baseline units): used {res['usedUnits']}/{res['totalUnits']}, remaining {res['remainingUnits']}")
+    lines.append(f"2x streak:            {res['streak2x']} day(s)  (soft fuse={p['fuse_2x_days']}d)")
+    lines.append(f"3x streak:            {res['streak3x']} day(s)  (fuse={p['fuse_3x_days']}d)")
+    lines.append(f"Ammo guardrails:      block3x<{p['ammo_no_3x_below']}, force1x<{p['ammo_force_1x_below']}")
+    if res["mvrvNote"]:
+        lines.append(f"MVRV gate:            {res['mvrvNote']}")
+    if res["fuseNote"]:
+        lines.append(f"Fuse:                 {res['fuseNote']}")
+    if res["ahrAnomaly"]:
+        lines.append(f"Data warning:         {res['ahrAnomaly']}")
+    lines.append(f"Tracker:              {res['tracker']}")
+    if not res.get("recorded", True):
+        lines.append("Not recorded:         inputs include last good values; the next run retries with fresh data")
 
     return "\n".join(lines)
 
 
+def render_memo(memo: dict, cached: bool = False):
+    if "error" in memo:
+        return memo["error"]
+    report = render_report(memo["price"], memo["priceSource"], memo["ahr"], memo["mvrv"], memo["result"])
+    if memo.get("stale"):
+        ages = ", ".join(f"{k} ({last_good.format_age(a)} old)" for k, a in memo["stale"].items())
+        report += f"\nLast good values:     {ages}  [missed the {REPORT_BUDGET_S:g}s budget or circuit open]"
+    if cached:
+        report += f"\nDecided:              {memo['date']} {memo['decidedAt']} UTC (cached; `dca intraday` for a live view)"
+    return report
+
+
+def intraday_report(memo: dict, spot_fn=None):
+    # Today's recorded decision plus a live view: only the spot price is fetched, Ahr999 is
+    # recomputed from the saved GMA200 state. Nothing is recorded.
+    lines = [render_memo(memo, cached=True), "--------------------------", "INTRADAY VIEW (not recorded)"]
+    try:
+        with metrics.span("price"):
+            spot = (spot_fn or fetch_btc_spot)()
+    except Exception as e:
+        lines.append(f"BTC Spot now:        unavailable ({e})")
+        return "\n".join(lines)
+    price = spot["price"]
+    lines.append(f"BTC Spot now:        ${price:,.2f}  ({spot['venue']}, {(price / memo['price'] - 1) * 100:+.2f}% since decision)")
+    ahr_now = ahr999_at(price)
+    if ahr_now is not None:
+        ahr = memo["ahr"]
+        lines.append(f"Ahr999 now:          {ahr_now:.4f}  (selfcalc from cached GMA200; at decision {ahr['value']:.4f}, {ahr['source'].split(':')[0]})")
+    else:
+        lines.append("Ahr999 now:          unavailable (no saved GMA200 state)")
+    return "\n".join(lines)
+
+
+def get_dca_result(inputs: dict | None = None):
+    # Structured decision for today: the same-day memo when there is one (no network), else a full run
+    if inputs is None:
+        memo = load_today_result()
+        if memo:
+            return memo
+    with metrics.trace("dca"):
+        return decide_today(inputs or fetch_market_inputs())
+
+
+def get_dca_instruction(inputs: dict | None = None, intraday: bool = False):
+    # One metrics run per report (stage + upstream timings, see metrics.py). Memo hits are
+    # their own run, "dca_cached", so they never replace the last full run's upstream gauges.
+    memo = load_today_result() if inputs is None else None
+    if memo:
+        with metrics.trace("dca_cached"):
+            if intraday:
+                return intraday_report(memo)
+            with metrics.span("render"):
+                return render_memo(memo, cached=True)
+    with metrics.trace("dca"):
+        return build_dca_report(inputs or fetch_market_inputs())
+
+
+async def get_dca_instruction_async():
+    # Awaitable variant for hosts that run an event loop; tracker I/O stays off the loop too
+    import asyncio
+
+    memo = load_today_result()
+    if memo:
+        with metrics.trace("dca_cached"):
+            return render_memo(memo, cached=True)
+    with metrics.trace("dca"):
+        inputs = await fetch_market_inputs_async()
+        return await asyncio.to_thread(build_dca_report, inputs)
+
+
+def main():
+    # `dca intraday`: today's decision plus a live spot/Ahr999 view
+    intraday = "intraday" in sys.argv[1:]
+    # Same-day memo first (no network at all), then the local advisor service, then a direct fetch
+    memo = None if intraday else load_today_result()
+    # A slow or hung service may only cost the report's own budget before the direct run
+    res = None if memo else advisor_client.query(
+        "/dca/intraday" if intraday else "/dca", timeout=REPORT_BUDGET_S,
+        headers={DCA_CONFIG_HEADER: config_fingerprint()},
+    )
+    print(res["report"] if res else get_dca_instruction(intraday=intraday))
+
+
 if __name__ == "__main__":
-    print(get_dca_instruction())
+    main()
@@ -1,6 +1,8 @@
-import requests
+import http_client
 import sys
 
+from get_crypto_price_v2 import fetch_btc_spot_coinbase
+
 def get_comprehensive_score(cg_api_key):
     # This script pulls from multiple sources to give a "Buy/Sell Sentiment"
     # 1. Ahr999 (Simulated/Calculated since CG API 500'd)
@@ -12,15 +14,14 @@ def get_comprehensive_score(cg_api_key):
 
     # Get Price
     try:
-        price = float(requests.get("https://api.coinbase.com/v2/prices/BTC-USD/spot").json()['data']['amount'])
+        price = fetch_btc_spot_coinbase(timeout=10)
     except:
         return "Price fetch failed."
 
     # Indicator 1: Fear & Greed
     try:
-        fng_res = requests.get("https://api.alternative.me/fng/").json()
+        fng_res = http_client.get("https://api.alternative.me/fng/", timeout=10).json()
         fng_val = int(fng_res['data'][0]['value'])
-        details.append(f)
     except:
         fng_val = 50 # neutral fallback
 
@@ -55,5 +56,8 @@ def get_comprehensive_score(cg_api_key):
     for d in details:
         print(f"- {d}")
 
+def main():
+    get_comprehensive_score(sys.argv[1] if len(sys.argv) > 1 else "dummy_key")
+
 if __name__ == "__main__":
-    get_comprehensive_score("dummy_key")
+    main()
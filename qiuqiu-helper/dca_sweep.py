@@ -0,0 +1,189 @@
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from dca_backtest import is_selfcalc_csv, run_backtest
+from dca_daily_report import DCA_PARAMS, DEFAULT_TOTAL_UNITS
+
+# Parameter sweep over the DCA decision rules (thresholds, ALIGN_RATIO, mining anchors,
+# fuses, ammo guardrails). Every grid point is one run_backtest() over the same history.
+# The history arrays are placed in one shared-memory block that workers attach to once,
+# so only the small params dict is pickled per task.
+# Usage: python3 dca_sweep.py history.csv [--grid grid.json] [--top 20] [--workers N]
+
+DEFAULT_GRID = {
+    "thr_3x": [0.35, 0.40, 0.45],
+    "thr_2x": [0.45, 0.50, 0.55],
+    "align_ratio": [0.90, 0.915, 0.93],
+    "total_cost": [75000, 85000, 95000],
+    "cash_cost": [50000, 60000, 70000],
+    "fuse_3x_days": [30, 60, 90],
+    "fuse_2x_days": [120, 180, 240],
+    "ammo_no_3x_below": [150, 200, 250],
+    "ammo_force_1x_below": [80, 120, 160],
+}
+
+# Plans deploying less than this share of the budget rank after those that deploy enough:
+# a plan that almost never buys has a low average cost but doesn't do the job
+MIN_DEPLOYMENT = 0.5
+
+# Per-worker view of the shared history (set by _init_worker)
+_SHM = None
+_HISTORY = None
+
+
+def grid_points(grid: dict):
+    keys = list(grid.keys())
+    for values in itertools.product(*(grid[k] for k in keys)):
+        params = dict(DCA_PARAMS)
+        params.update(zip(keys, values))
+        # skip incoherent combinations
+        if params["thr_3x"] >= params["thr_2x"]:
+            continue
+        if params["cash_cost"] >= params["total_cost"]:
+            continue
+        if params["ammo_force_1x_below"] >= params["ammo_no_3x_below"]:
+            continue
+        yield params
+
+
+def _init_worker(shm_name: str, n: int, total_units: int, using_selfcalc: bool):
+    global _SHM, _HISTORY
+    _SHM = shared_memory.SharedMemory(name=shm_name)
+    arr = np.ndarray((3, n), dtype=np.float64, buffer=_SHM.buf)
+    # one local list copy per worker: scalar loops over lists beat NumPy element access
+    _HISTORY = {
+        "prices": arr[0].tolist(),
+        "ahrs": arr[1].tolist(),
+        "mvrvs": arr[2].tolist(),
+        "total_units": total_units,
+        "using_selfcalc": using_selfcalc,
+    }
+
+
+def _simulate(params: dict):
+    h = _HISTORY
+    res = run_backtest(
+        h["prices"],
+        h["ahrs"],
+        h["mvrvs"],
+        params=params,
+        total_units=h["total_units"],
+        using_selfcalc=h["using_selfcalc"],
+    )
+    return {
+        "params": params,
+        "avg_cost": res["avg_cost"],
+        "units_used": res["units_used"],
+        "deployed": res["units_used"] / h["total_units"] if h["total_units"] else 0.0,
+        "ammo_out_day": res["ammo_out_day"],
+    }
+
+
+def rank_key(row: dict, min_deployment: float = MIN_DEPLOYMENT):
+    # Least overspend first (0 for plans within budget), then plans deploying at least
+    # min_deployment of the budget; then the lowest average cost; among equals, prefer plans
+    # whose ammo lasts longer
+    avg = row["avg_cost"] if row["avg_cost"] is not None else math.inf
+    out = row["ammo_out_day"] if row["ammo_out_day"] is not None else math.inf
+    return (max(row["deployed"] - 1, 0.0), row["deployed"] < min_deployment, avg, -out)
+
+
+def run_sweep(prices, ahrs, mvrvs, grid: dict | None = None, total_units: int = DEFAULT_TOTAL_UNITS,
+              using_selfcalc: bool = False, workers: int | None = None, min_deployment: float = MIN_DEPLOYMENT):
+    n = len(prices)
+    points = list(grid_points(grid or DEFAULT_GRID))
+
+    shm = shared_memory.SharedMemory(create=True, size=3 * n * 8)
+    try:
+        arr = np.ndarray((3, n), dtype=np.float64, buffer=shm.buf)
+        arr[0] = prices
+        arr[1] = ahrs
+        arr[2] = [math.nan if v is None else v for v in mvrvs]
+
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(points) // (workers * 8))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(shm.name, n, total_units, using_selfcalc),
+        ) as pool:
+            rows = list(pool.map(_simulate, points, chunksize=chunksize))
+        del arr
+    finally:
+        shm.close()
+        shm.unlink()
+
+    rows.sort(key=lambda r: rank_key(r, min_deployment))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sweep DCA thresholds, fuses and guardrails over history")
+    ap.add_argument("history", help="CSV with columns date,close,ahr999[,mvrvZ]")
+    ap.add_argument("--grid", help="JSON object {param: [values...]} overriding DEFAULT_GRID")
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--total-units", type=int, default=DEFAULT_TOTAL_UNITS)
+    ap.add_argument("--selfcalc", action="store_true",
+                    help="apply ALIGN_RATIO to thresholds (default for ahr999_backfill.py output)")
+    ap.add_argument("--min-deployment", type=float, default=MIN_DEPLOYMENT,
+                    help="share of total units a plan must use to rank on cost (default 0.5)")
+    args = ap.parse_args()
+
+    dates, prices, ahrs, mvrvs = [], [], [], []
+    with open(args.history, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        using_selfcalc = args.selfcalc or is_selfcalc_csv(reader.fieldnames)
+        for row in reader:
+            try:
+                ahr = float(row["ahr999"])
+            except (TypeError, ValueError):
+                continue
+            if math.isnan(ahr):
+                continue
+            dates.append(row["date"])
+            prices.append(float(row["close"]))
+            ahrs.append(ahr)
+            mv = row.get("mvrvZ")
+            mvrvs.append(float(mv) if mv not in (None, "") else None)
+
+    if not dates:
+        print("Error: no usable rows in input")
+        return 1
+
+    grid = dict(DEFAULT_GRID)
+    if args.grid:
+        with open(args.grid, "r", encoding="utf-8") as f:
+            grid.update(json.load(f))
+
+    t0 = time.perf_counter()
+    rows = run_sweep(prices, ahrs, mvrvs, grid, args.total_units, using_selfcalc, args.workers,
+                     args.min_deployment)
+    elapsed = time.perf_counter() - t0
+
+    keys = list(grid.keys())
+    print("=== QIUQIU DCA SWEEP ===")
+    print(f"History: {dates[0]} → {dates[-1]} ({len(dates)} days)")
+    print(f"Simulations: {len(rows)} in {elapsed:.1f}s")
+    print(f"Budget: {args.total_units} units; over-budget plans rank last (least overspend first), then those under {args.min_deployment:.0%} deployed")
+    print("rank  avg_cost         used  ammo_out    " + "  ".join(keys))
+    for i, r in enumerate(rows[: args.top], 1):
+        avg = f"{r['avg_cost']:,.0f}" if r["avg_cost"] else "-"
+        out = dates[r["ammo_out_day"]] if r["ammo_out_day"] is not None else "never"
+        vals = "  ".join(str(r["params"][k]) for k in keys)
+        used = f"{r['units_used']} ({r['deployed']:.0%})"
+        print(f"{i:>4}  {avg:>9}  {used:>11}  {out:<10}  {vals}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
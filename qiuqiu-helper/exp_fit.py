@@ -0,0 +1,222 @@
+import datetime as dt
+import json
+import math
+import os
+import sys
+
+from btc_model import A_EXP, B_EXP, GENESIS
+
+# Least-squares fit of the ExpPrice curve, log10(price) = a*log10(days_since_genesis) + b,
+# kept as sufficient statistics (n, Σx, Σy, Σxx, Σxy, Σyy) on disk. A new closed day
+# updates the fit in O(1); refit() recomputes the sums from the price history store
+# (price_history.py) in one vectorized pass, over all of it or a rolling window of days.
+# With a window, each new day also drops the day that left the window (read from the store).
+# exp_price() (btc_model.py) uses the fit once it covers enough of the curve (MIN_POINTS,
+# MIN_SPAN_DAYS, MIN_LOG_SPREAD): a year of CoinGecko closes alone says nothing about a
+# 15-year trend, and neither do four: the slope is set by the spread of log10(t), which
+# recent years alone barely move (std ~0.03 for 2022-2026 vs ~0.27 since 2010). So until
+# older history is imported (price_history.py import) the fixed A_EXP/B_EXP stay.
+# Usage: python3 exp_fit.py show | refit [window_days|all]
+
+DEFAULT_STATE_PATH = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/btc_expfit_state.json")
+MIN_POINTS = int(os.getenv("QIUQIU_EXPFIT_MIN_POINTS", "1000"))
+MIN_SPAN_DAYS = int(os.getenv("QIUQIU_EXPFIT_MIN_SPAN_DAYS", "1460"))
+# Standard deviation of log10(days since genesis) over the fitted points (~history from 2014)
+MIN_LOG_SPREAD = float(os.getenv("QIUQIU_EXPFIT_MIN_LOG_SPREAD", "0.15"))
+
+
+class ExpFit:
+    def __init__(self, window: int | None = None):
+        self.window = window  # days; None = all history
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = self.syy = 0.0
+        self.first_date = None
+        self.last_date = None
+
+    def _add(self, date: dt.date, close: float, sign: int):
+        x = math.log10((date - GENESIS).days)
+        y = math.log10(close)
+        self.n += sign
+        self.sx += sign * x
+        self.sy += sign * y
+        self.sxx += sign * x * x
+        self.sxy += sign * x * y
+        self.syy += sign * y * y
+
+    def push(self, date: dt.date, close: float):
+        # One closed day, O(1). Same skips as gma(): missing / non-positive closes.
+        if self.last_date is not None and date <= self.last_date:
+            return
+        if self.window and self.last_date is not None:
+            self._drop_until(date - dt.timedelta(days=self.window))
+        if close and close > 0 and date > GENESIS:
+            self._add(date, close, 1)
+            if self.first_date is None:
+                self.first_date = date
+        self.last_date = date
+
+    def _drop_until(self, cutoff: dt.date):
+        # Removes the stored closes in (last_date - window, cutoff], i.e. the days leaving the window
+        from price_history import dated_closes
+        start = self.last_date - dt.timedelta(days=self.window)
+        k = (cutoff - start).days
+        if k <= 0:
+            return
+        for d, p in dated_closes(k, end=cutoff):
+            if d > start and p > 0 and d > GENESIS and self.n:
+                self._add(d, p, -1)
+        if self.first_date is not None and self.first_date <= cutoff:
+            self.first_date = cutoff + dt.timedelta(days=1)
+
+    def params(self):
+        # (a, b) or None while the points don't determine a line
+        den = self.n * self.sxx - self.sx * self.sx
+        if self.n < 2 or den <= 0:
+            return None
+        a = (self.n * self.sxy - self.sx * self.sy) / den
+        return a, (self.sy - a * self.sx) / self.n
+
+    def r2(self):
+        p = self.params()
+        if p is None:
+            return None
+        a, b = p
+        ss_tot = self.syy - self.sy * self.sy / self.n
+        ss_res = self.syy - 2 * a * self.sxy - 2 * b * self.sy + a * a * self.sxx + 2 * a * b * self.sx + b * b * self.n
+        return 1 - ss_res / ss_tot if ss_tot > 0 else None
+
+    def span_days(self) -> int:
+        if self.first_date is None:
+            return 0
+        return (self.last_date - self.first_date).days + 1
+
+    def log_spread(self) -> float:
+        # std of log10(t): how well the points pin down the slope
+        if self.n < 2:
+            return 0.0
+        return math.sqrt(max(self.sxx / self.n - (self.sx / self.n) ** 2, 0.0))
+
+    def usable(self) -> bool:
+        return (self.n >= MIN_POINTS and self.span_days() >= MIN_SPAN_DAYS
+                and self.log_spread() >= MIN_LOG_SPREAD and self.params() is not None)
+
+    def to_dict(self):
+        return {
+            "window": self.window,
+            "n": self.n,
+            "sx": self.sx,
+            "sy": self.sy,
+            "sxx": self.sxx,
+            "sxy": self.sxy,
+            "syy": self.syy,
+            "firstDate": self.first_date.isoformat() if self.first_date else None,
+            "lastDate": self.last_date.isoformat() if self.last_date else None,
+        }
+
+    @classmethod
+    def from_dict(cls, raw: dict):
+        f = cls(raw.get("window"))
+        f.n = int(raw.get("n", 0))
+        for k in ("sx", "sy", "sxx", "sxy", "syy"):
+            setattr(f, k, float(raw.get(k, 0.0)))
+        f.first_date = dt.date.fromisoformat(raw["firstDate"]) if raw.get("firstDate") else None
+        f.last_date = dt.date.fromisoformat(raw["lastDate"]) if raw.get("lastDate") else None
+        return f
+
+
+def state_path(path: str | None = None) -> str:
+    return path or os.getenv("QIUQIU_EXPFIT_STATE_PATH", DEFAULT_STATE_PATH)
+
+
+def load_exp_fit(path: str | None = None):
+    try:
+        with open(state_path(path), "r", encoding="utf-8") as f:
+            return ExpFit.from_dict(json.load(f))
+    except (FileNotFoundError, ValueError, KeyError):
+        return ExpFit()
+
+
+def save_exp_fit(state: ExpFit, path: str | None = None):
+    path = state_path(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state.to_dict(), f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def refit(window: int | None = None, today: dt.date | None = None):
+    # Vectorized fit over the price history store's closed days (optionally the last `window`)
+    import numpy as np
+    from price_history import column, day_of
+
+    today = today or dt.datetime.utcnow().date()
+    closes = column("close")
+    hi = min(len(closes), (today - GENESIS).days)  # today's point is still the live price
+    lo = max(1, hi - window) if window else 1  # day 0 has log10(0) = -inf
+    f = ExpFit(window)
+    if hi <= lo:
+        return f
+    p = np.asarray(closes[lo:hi])
+    days = np.arange(lo, hi)
+    ok = np.isfinite(p) & (p > 0)
+    x = np.log10(days[ok])
+    y = np.log10(p[ok])
+    f.n = int(ok.sum())
+    f.sx, f.sy = float(x.sum()), float(y.sum())
+    f.sxx, f.sxy, f.syy = float((x * x).sum()), float((x * y).sum()), float((y * y).sum())
+    if f.n:
+        f.first_date = day_of(lo + int(np.argmax(ok)))
+    f.last_date = day_of(hi - 1)
+    return f
+
+
+def sync_exp_fit(dated_closes, path: str | None = None, today: dt.date | None = None):
+    # dated_closes: [(date, close), ...] sorted by date. Closed days after the state's last
+    # date are pushed; an empty state starts with a full refit from the store.
+    today = today or dt.datetime.utcnow().date()
+    state = load_exp_fit(path)
+    if state.last_date is None:
+        state = refit(state.window, today)
+    for d, p in dated_closes:
+        if d < today:
+            state.push(d, p)
+    save_exp_fit(state, path)
+    return state
+
+
+def fitted_params(path: str | None = None):
+    # (a, b) of a usable fit, else None
+    state = load_exp_fit(path)
+    return state.params() if state.usable() else None
+
+
+def main():
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "show"
+    if cmd == "refit":
+        arg = sys.argv[2] if len(sys.argv) > 2 else None
+        if arg in (None, "all"):
+            window = None if arg == "all" else load_exp_fit().window
+        else:
+            window = int(arg)
+        save_exp_fit(refit(window))
+    elif cmd != "show":
+        print("Usage: python3 exp_fit.py show | refit [window_days|all]")
+        return 1
+
+    state = load_exp_fit()
+    p = state.params()
+    print("=== ExpPrice fit ===")
+    print(f"Window:     {f'{state.window} days' if state.window else 'all history'}")
+    print(f"Points:     {state.n}  ({state.first_date} .. {state.last_date}, span {state.span_days()} days, "
+          f"log10(t) spread {state.log_spread():.3f})")
+    if p:
+        r2 = state.r2()
+        print(f"Fitted:     a={p[0]:.4f}, b={p[1]:.4f}" + (f"  (R²={r2:.4f})" if r2 is not None else ""))
+    print(f"Fixed:      a={A_EXP}, b={B_EXP}")
+    print(f"In use:     {'fitted' if state.usable() else f'fixed (needs {MIN_POINTS} points over {MIN_SPAN_DAYS} days, spread {MIN_LOG_SPREAD})'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-import requests
+import http_client
 import sys
 
 def get_market_data(api_key):
@@ -18,7 +18,7 @@ def get_market_data(api_key):
             "include_24hr_change": "true",
             "include_last_updated_at": "true"
         }
-        response = requests.get(f"{base_url}/simple/price", headers=headers, params=params, timeout=10)
+        response = http_client.get(f"{base_url}/simple/price", headers=headers, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()['bitcoin']
         
@@ -1,14 +1,17 @@
-import requests
+import http_client
 import time
 import sys
 
-def get_btc_price():
+def fetch_btc_spot_binance(timeout: float = 5):
     url = "https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT"
+    response = http_client.get(url, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    return float(data['price'])
+
+def get_btc_price():
     try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        price = float(data['price'])
+        price = fetch_btc_spot_binance()
         print(f"BTC/USDT (Binance): ${price:,.2f}")
     except Exception as e:
         print(f"Error fetching price: {e}")
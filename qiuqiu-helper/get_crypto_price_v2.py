@@ -1,26 +1,31 @@
-import requests
+import http_client
 
-def get_btc_price_okx():
+def fetch_btc_spot_okx(timeout: float = 5):
     url = "https://www.okx.com/api/v5/market/ticker?instId=BTC-USDT"
+    response = http_client.get(url, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    if data['code'] != '0':
+        raise RuntimeError(f"OKX API Error: {data['msg']}")
+    return float(data['data'][0]['last'])
+
+def fetch_btc_spot_coinbase(timeout: float = 5):
+    url = "https://api.coinbase.com/v2/prices/BTC-USD/spot"
+    response = http_client.get(url, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+    return float(data['data']['amount'])
+
+def get_btc_price_okx():
     try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        if data['code'] == '0':
-            price = float(data['data'][0]['last'])
-            print(f"BTC/USDT (OKX): ${price:,.2f}")
-        else:
-            print(f"OKX API Error: {data['msg']}")
+        price = fetch_btc_spot_okx()
+        print(f"BTC/USDT (OKX): ${price:,.2f}")
     except Exception as e:
         print(f"Error fetching from OKX: {e}")
 
 def get_btc_price_coinbase():
-    url = "https://api.coinbase.com/v2/prices/BTC-USD/spot"
     try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        price = float(data['data']['amount'])
+        price = fetch_btc_spot_coinbase()
         print(f"BTC/USD (Coinbase): ${price:,.2f}")
     except Exception as e:
         print(f"Error fetching from Coinbase: {e}")
@@ -0,0 +1,379 @@
+import contextvars
+import fcntl
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import metrics
+
+# Shared HTTP client for every qiuqiu-helper fetcher.
+# - one keep-alive Session (connection pool) per host, reused across calls and threads
+# - bounded retries with full-jitter exponential backoff on connection errors, 429 and 5xx
+# - token-bucket rate limit per provider, so bursts don't earn 429s (CoinGecko especially)
+# Callers still get a plain requests.Response and call raise_for_status()/json() as before.
+# QIUQIU_UPSTREAM_OVERRIDE=http://127.0.0.1:PORT sends every call to a local stub instead
+# (as /<original host>/<path>, see bench/stub_server.py); QIUQIU_HTTP_NO_RATE_LIMIT=1
+# disables the token buckets. Every attempt is recorded as a metrics.py "http" span
+# (provider, endpoint, attempt, status, bytes) when a trace is active.
+# `requests` is imported on the first call, not at import time: it is most of the
+# interpreter start-up cost, and pure-compute subcommands never touch the network.
+# deadline(seconds) gives every call inside it (and in threads started via metrics.bind /
+# staged) one shared latency budget: timeouts are clamped to what is left, and retries,
+# backoff and rate-limit waits that would overrun it raise BudgetExceeded instead.
+# A per-provider circuit breaker (state shared across runs in QIUQIU_BREAKER_PATH) fails
+# calls fast with CircuitOpen after BREAKER_THRESHOLD consecutive failures (connection
+# errors, timeouts, 429/5xx) until BREAKER_COOLDOWN_S has passed. Then it is half-open: the
+# first caller (in any process) takes the trial token and goes through, everyone else keeps
+# failing fast until the trial's outcome closes or re-opens the breaker (or the token expires
+# after BREAKER_TRIAL_S); a trial that ends without an outcome (BudgetExceeded: our deadline,
+# not the provider's failure) hands the token back at once. The file is re-read when it changes and updated under a flock, one
+# provider entry at a time, so the advisor service and CLI runs share one view.
+# QIUQIU_BREAKER=off disables it.
+
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 8.0
+POOL_MAXSIZE = 10
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+BREAKER_THRESHOLD = int(os.getenv("QIUQIU_BREAKER_THRESHOLD", "3"))
+BREAKER_COOLDOWN_S = float(os.getenv("QIUQIU_BREAKER_COOLDOWN_S", "120"))
+BREAKER_TRIAL_S = float(os.getenv("QIUQIU_BREAKER_TRIAL_S", "30"))  # a lost trial token frees up after this
+DEFAULT_BREAKER_PATH = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/http_breakers.json")
+
+PROVIDERS = {
+    "api.coinbase.com": "coinbase",
+    "api.coingecko.com": "coingecko",
+    "open-api.coinglass.com": "coinglass",
+    "bitcoin-data.com": "bitcoin-data",
+    "www.okx.com": "okx",
+    "api.binance.com": "binance",
+    "api.alternative.me": "alternative",
+}
+
+# provider: (tokens per second, burst)
+RATE_LIMITS = {
+    "coinbase": (10.0, 10),
+    "coingecko": (0.5, 5),  # demo plan is ~30 calls/min
+    "coinglass": (0.5, 5),
+    "bitcoin-data": (0.2, 2),
+    "okx": (10.0, 10),
+    "binance": (10.0, 10),
+    "alternative": (1.0, 2),
+}
+
+_sessions = {}
+_buckets = {}
+_lock = threading.Lock()
+_deadline = contextvars.ContextVar("qiuqiu_http_deadline", default=None)
+_breakers = (None, {})  # ((inode, mtime_ns), provider -> {"failures", "openUntil", "trialUntil"})
+
+
+class BudgetExceeded(TimeoutError):
+    pass
+
+
+class CircuitOpen(ConnectionError):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, max_wait: float | None = None):
+        # Blocks until a token is available (BudgetExceeded if that takes longer than max_wait)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                raise BudgetExceeded("rate limit wait exceeds the latency budget")
+            time.sleep(wait)
+
+
+def provider_for(url: str) -> str:
+    host = urlsplit(url).hostname or ""
+    return PROVIDERS.get(host, host)
+
+
+def session_for(url: str):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    host = urlsplit(url).netloc
+    with _lock:
+        s = _sessions.get(host)
+        if s is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _sessions[host] = s
+        return s
+
+
+def rewrite_url(url: str) -> str:
+    override = os.getenv("QIUQIU_UPSTREAM_OVERRIDE")
+    if not override:
+        return url
+    parts = urlsplit(url)
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{override.rstrip('/')}/{parts.netloc}{parts.path}{query}"
+
+
+def rate_limit_for(provider: str):
+    # QIUQIU_RATE_LIMIT_<PROVIDER>="rate,burst" overrides RATE_LIMITS (e.g. a paid plan)
+    raw = os.getenv(f"QIUQIU_RATE_LIMIT_{provider.upper().replace('-', '_')}")
+    if raw:
+        try:
+            rate, burst = raw.split(",")
+            return float(rate), int(burst)
+        except ValueError:
+            pass
+    return RATE_LIMITS.get(provider)
+
+
+def bucket_for(provider: str):
+    if os.getenv("QIUQIU_HTTP_NO_RATE_LIMIT"):
+        return None
+    limit = rate_limit_for(provider)
+    if not limit:
+        return None
+    with _lock:
+        b = _buckets.get(provider)
+        if b is None:
+            b = TokenBucket(*limit)
+            _buckets[provider] = b
+        return b
+
+
+@contextmanager
+def deadline(seconds: float):
+    # Nested budgets keep the tighter deadline
+    outer = _deadline.get()
+    end = time.monotonic() + seconds
+    token = _deadline.set(end if outer is None else min(outer, end))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    # Seconds left in the current budget, or None without one
+    end = _deadline.get()
+    return None if end is None else end - time.monotonic()
+
+
+def _budget_timeout(timeout: float) -> float:
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise BudgetExceeded("latency budget exhausted")
+    return min(timeout, left)
+
+
+def breaker_path() -> str:
+    return os.getenv("QIUQIU_BREAKER_PATH", DEFAULT_BREAKER_PATH)
+
+
+def _breaker_state():
+    # Current file contents; re-parsed only when the file changed (callers hold _lock)
+    global _breakers
+    try:
+        st = os.stat(breaker_path())
+    except OSError:
+        return {}
+    version = (st.st_ino, st.st_mtime_ns)  # every save is a new file (os.replace)
+    if _breakers[0] != version:
+        try:
+            with open(breaker_path(), "r", encoding="utf-8") as f:
+                _breakers = (version, json.load(f))
+        except (OSError, ValueError):
+            _breakers = (version, {})
+    return _breakers[1]
+
+
+@contextmanager
+def _breaker_update():
+    # Read-modify-write of the shared state under an exclusive flock (one writer across
+    # processes); yields the freshly read state, saved on exit
+    path = breaker_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            state = dict(_breaker_state())
+            yield state
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def breaker_enabled() -> bool:
+    return os.getenv("QIUQIU_BREAKER", "").lower() not in ("off", "0", "false")
+
+
+def _is_open(b) -> bool:
+    return bool(b) and b["failures"] >= BREAKER_THRESHOLD
+
+
+def breaker_check(provider: str) -> bool:
+    # Raises CircuitOpen while failing fast; True when this call took the half-open trial token
+    if not breaker_enabled():
+        return False
+    with _lock:
+        b = _breaker_state().get(provider)
+        if not _is_open(b):
+            return False
+        now = time.time()
+        if now < b["openUntil"]:
+            raise CircuitOpen(f"{provider} circuit open for {b['openUntil'] - now:.0f}s "
+                              f"after {b['failures']} consecutive failures")
+        # Half-open: take the trial token unless another caller holds it
+        busy = trial = False
+        try:
+            with _breaker_update() as state:
+                b = state.get(provider)
+                if _is_open(b) and now >= b["openUntil"]:
+                    busy = now < b.get("trialUntil", 0)
+                    if not busy:
+                        state[provider] = dict(b, trialUntil=now + BREAKER_TRIAL_S)
+                        trial = True
+        except OSError:
+            pass  # no shared state: let the call through
+        if busy:
+            raise CircuitOpen(f"{provider} circuit half-open, trial call in flight")
+        return trial
+
+
+def breaker_release(provider: str):
+    # Hands back a trial token whose call ended without an outcome (still half-open)
+    with _lock:
+        if provider not in _breaker_state():
+            return
+        try:
+            with _breaker_update() as state:
+                b = state.get(provider)
+                if b and b.get("trialUntil"):
+                    state[provider] = dict(b, trialUntil=0)
+        except OSError:
+            pass
+
+
+def breaker_record(provider: str, ok: bool):
+    if not breaker_enabled():
+        return
+    with _lock:
+        if ok and provider not in _breaker_state():
+            return
+        try:
+            with _breaker_update() as state:
+                if ok:
+                    state.pop(provider, None)
+                    return
+                b = dict(state.get(provider) or {"failures": 0, "openUntil": 0})
+                b["failures"] += 1
+                b["trialUntil"] = 0
+                if b["failures"] >= BREAKER_THRESHOLD:
+                    b["openUntil"] = time.time() + BREAKER_COOLDOWN_S
+                state[provider] = b
+        except OSError:
+            pass
+
+
+def backoff_delay(attempt: int, retry_after: str | None = None) -> float:
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_CAP)
+        except ValueError:
+            pass
+    # full jitter: uniform(0, min(cap, base * 2^attempt))
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def response_bytes(r, stream: bool):
+    # Body size for metrics: exact when already read, else the advertised Content-Length
+    if not stream:
+        return len(r.content)
+    try:
+        return int(r.headers.get("Content-Length", ""))
+    except ValueError:
+        return None
+
+
+def get(url: str, params=None, headers=None, timeout: float = 10, retries: int = MAX_RETRIES, stream: bool = False):
+    provider = provider_for(url)
+    parts = urlsplit(url)
+    endpoint = f"{parts.netloc}{parts.path}"  # no query string (may carry keys)
+    bucket = bucket_for(provider)
+    url = rewrite_url(url)
+    session = session_for(url)
+    trial = breaker_check(provider)
+    try:
+        return _get(session, url, params, headers, timeout, retries, stream, provider, endpoint, bucket)
+    except BaseException:
+        if trial:
+            breaker_release(provider)  # no-op once a failure was recorded (token already cleared)
+        raise
+
+
+def _get(session, url, params, headers, timeout, retries, stream, provider, endpoint, bucket):
+    # The attempts of one get(): retries, backoff and breaker outcomes
+    import requests
+
+    attempt = 0
+    while True:
+        if bucket:
+            bucket.acquire(remaining())
+        attempt_timeout = _budget_timeout(timeout)
+        try:
+            # one span per attempt; rate-limit waits are not counted as request time
+            with metrics.span("http", kind="http", provider=provider, endpoint=endpoint, attempt=attempt) as sp:
+                r = session.get(url, params=params, headers=headers, timeout=attempt_timeout, stream=stream)
+                sp["status"] = r.status_code
+                sp["bytes"] = response_bytes(r, stream)
+        except (requests.ConnectionError, requests.Timeout):
+            delay = backoff_delay(attempt)
+            if attempt >= retries or not _fits_budget(delay):
+                breaker_record(provider, ok=False)
+                raise
+            time.sleep(delay)
+            attempt += 1
+            continue
+
+        if r.status_code in RETRY_STATUS:
+            delay = backoff_delay(attempt, r.headers.get("Retry-After"))
+            if attempt < retries and _fits_budget(delay):
+                r.close()
+                time.sleep(delay)
+                attempt += 1
+                continue
+            breaker_record(provider, ok=False)
+            return r
+        breaker_record(provider, ok=True)
+        return r
+
+
+def _fits_budget(delay: float) -> bool:
+    # A retry is only worth it if some budget is left after the backoff sleep
+    left = remaining()
+    return left is None or delay < left
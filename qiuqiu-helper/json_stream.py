@@ -0,0 +1,117 @@
+import codecs
+import json
+from collections import deque
+
+# Incremental parsing for large indicator payloads shaped like {"key": [elem, elem, ...], ...}
+# (CoinGecko market_chart "prices", CoinGlass indicator "data").
+# The body is read chunk by chunk and the target array is yielded one element at a time,
+# so peak memory is one chunk plus one element instead of the whole decoded history.
+# Other top-level values are decoded normally (they are small for these endpoints).
+
+CHUNK_SIZE = 64 * 1024
+_WS = " \t\n\r"
+_NUMBER_TAIL = ".eE+-"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self, at_least: int = 1):
+        # Reads until at least `at_least` new characters arrived (or EOF)
+        parts = [self.buf[self.pos:]]  # drop the consumed prefix
+        got = 0
+        while got < at_least and not self.eof:
+            try:
+                chunk = next(self.chunks)
+            except StopIteration:
+                self.eof = True
+                chunk = self.utf8.decode(b"", final=True)
+            else:
+                if isinstance(chunk, bytes):
+                    chunk = self.utf8.decode(chunk)
+            parts.append(chunk)
+            got += len(chunk)
+        self.buf = "".join(parts)
+        self.pos = 0
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ""
+            self.more()
+
+    def take(self, expected: str):
+        ch = self.peek()
+        if ch not in expected:
+            raise ValueError(f"Malformed JSON stream: expected {expected!r}, got {ch!r} at {self.pos}")
+        self.pos += 1
+        return ch
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                # at least double the pending text before retrying, so a large value
+                # costs amortized linear time instead of one re-parse per chunk
+                self.more(len(self.buf) - self.pos)
+                continue
+            # a number that ends at the buffer end, or before a "." / exponent still to come,
+            # may be truncated ("0." | "5" decodes as 0 and leaves ".")
+            if self.eof or (end < len(self.buf) and not (
+                    isinstance(obj, (int, float)) and self.buf[end] in _NUMBER_TAIL)):
+                self.pos = end
+                return obj
+            self.more()
+
+
+def iter_array(chunks, key: str, envelope: dict | None = None, read_rest: bool = False):
+    # Yields the elements of the top-level array `key`. Other top-level keys seen before it
+    # (and after it, when read_rest=True) are stored in `envelope`.
+    r = _Reader(chunks)
+    r.take("{")
+    if r.peek() == "}":
+        return
+    while True:
+        k = r.value()
+        r.take(":")
+        if k == key:
+            r.take("[")
+            if r.peek() == "]":
+                r.pos += 1
+            else:
+                while True:
+                    yield r.value()
+                    if r.take(",]") == "]":
+                        break
+            if not read_rest:
+                return
+        else:
+            v = r.value()
+            if envelope is not None:
+                envelope[k] = v
+        if r.take(",}") == "}":
+            return
+
+
+def tail_array(chunks, key: str, n: int, envelope: dict | None = None, read_rest: bool = True):
+    # Last n elements of the top-level array `key`, in bounded memory
+    return list(deque(iter_array(chunks, key, envelope, read_rest), maxlen=n))
+
+
+def response_chunks(response, chunk_size: int = CHUNK_SIZE):
+    # Raw body chunks of a requests.Response opened with stream=True
+    return response.iter_content(chunk_size=chunk_size)
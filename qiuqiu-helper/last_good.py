@@ -0,0 +1,67 @@
+import json
+import os
+import threading
+import time
+
+# Last known good value per upstream datum (JSON-serializable), with the time it was fetched.
+# A run whose source misses the latency budget, or finds its provider's circuit open
+# (http_client.py), answers from here and shows how old the answer is.
+# QIUQIU_LAST_GOOD_PATH overrides the file.
+
+DEFAULT_PATH = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/qiuqiu_last_good.json")
+
+_lock = threading.Lock()
+
+
+def store_path() -> str:
+    return os.getenv("QIUQIU_LAST_GOOD_PATH", DEFAULT_PATH)
+
+
+def _load():
+    try:
+        with open(store_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def remember(values: dict):
+    # {key: value}; one read-modify-write for the whole batch
+    if not values:
+        return
+    path = store_path()
+    with _lock:
+        data = _load()
+        now = time.time()
+        for k, v in values.items():
+            data[k] = {"at": now, "value": v}
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+
+def recall(key: str, max_age: float | None = None):
+    # (value, age in seconds), or None when there is none (or it is older than max_age)
+    hit = _load().get(key)
+    if not hit:
+        return None
+    age = max(time.time() - hit["at"], 0.0)
+    if max_age is not None and age > max_age:
+        return None
+    return hit["value"], age
+
+
+def format_age(seconds: float) -> str:
+    s = int(seconds)
+    if s < 60:
+        return f"{s}s"
+    if s < 3600:
+        return f"{s // 60}m"
+    if s < 86400:
+        return f"{s // 3600}h {s % 3600 // 60}m"
+    return f"{s // 86400}d {s % 86400 // 3600}h"
@@ -0,0 +1,204 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Timing spans for pipeline runs (dca_daily_report.get_dca_instruction and friends).
+#   with metrics.trace("dca"):            # one run; exported when the block exits
+#       with metrics.span("price"): ...   # a stage
+#   http_client.get() adds an "http" span per attempt (provider, status, bytes, retry)
+# Spans nest through contextvars; work handed to pool/daemon threads keeps its parent
+# when wrapped with staged() / bind(). Outside a trace, span() is a no-op.
+# Each run is exported as
+# - JSON lines (one per span) appended to QIUQIU_METRICS_JSONL
+# - a Prometheus textfile-collector file {QIUQIU_METRICS_TEXTFILE_DIR}/qiuqiu_<run>.prom
+#   (last-run gauges; only written when the directory is configured)
+# QIUQIU_METRICS=off disables both.
+
+DEFAULT_JSONL_PATH = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/qiuqiu_metrics.jsonl")
+JSONL_MAX_BYTES = 16 * 1024 * 1024  # rotated to .1 beyond this
+
+_trace = contextvars.ContextVar("qiuqiu_trace", default=None)
+_parent = contextvars.ContextVar("qiuqiu_span", default=None)
+_ids = itertools.count(1)
+_write_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.getenv("QIUQIU_METRICS", "").lower() not in ("off", "0", "false")
+
+
+class Trace:
+    def __init__(self, name: str):
+        self.name = name
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self.t0 = time.perf_counter()
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def add(self, rec: dict):
+        with self.lock:
+            self.spans.append(rec)
+
+
+@contextmanager
+def span(name: str, kind: str = "stage", **attrs):
+    # Yields the span's attrs dict so the caller can attach results (status, bytes, ...)
+    tr = _trace.get()
+    if tr is None:
+        yield attrs
+        return
+    sid = next(_ids)
+    parent = _parent.get()
+    token = _parent.set(sid)
+    start = time.perf_counter()
+    rec = {"id": sid, "parent": parent, "name": name, "kind": kind, "ok": True, "attrs": attrs}
+    try:
+        yield attrs
+    except BaseException as e:
+        rec["ok"] = False
+        rec["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _parent.reset(token)
+        rec["startMs"] = round((start - tr.t0) * 1000, 3)
+        rec["ms"] = round((time.perf_counter() - start) * 1000, 3)
+        tr.add(rec)
+
+
+@contextmanager
+def trace(name: str):
+    # Inside another trace this is just a span; otherwise it starts (and exports) a run
+    if _trace.get() is not None or not enabled():
+        with span(name) as attrs:
+            yield attrs
+        return
+    tr = Trace(name)
+    token = _trace.set(tr)
+    try:
+        with span(name, kind="run") as attrs:
+            yield attrs
+    finally:
+        _trace.reset(token)
+        export(tr)
+
+
+def bind(fn):
+    # fn bound to a copy of the current context (trace + parent span), for another thread.
+    # Each bound callable must run once: a context can't be entered by two threads at a time.
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.run(fn, *args, **kwargs)
+
+
+def staged(name: str, fn, kind: str = "stage"):
+    # bind() + a span around fn, e.g. pool.submit(staged("price", fetch_btc_spot))
+    def run(*args, **kwargs):
+        with span(name, kind):
+            return fn(*args, **kwargs)
+    return bind(run)
+
+
+# --- export ---
+
+def _jsonl_path() -> str:
+    return os.getenv("QIUQIU_METRICS_JSONL", DEFAULT_JSONL_PATH)
+
+
+def write_jsonl(tr: Trace, path: str | None = None):
+    path = path or _jsonl_path()
+    lines = []
+    for rec in sorted(tr.spans, key=lambda r: r["startMs"]):
+        row = {"ts": round(tr.started + rec["startMs"] / 1000, 3), "run": tr.name, "runId": tr.run_id}
+        row.update(rec)
+        lines.append(json.dumps(row, ensure_ascii=False, default=str))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with _write_lock:
+        try:
+            if os.path.getsize(path) > JSONL_MAX_BYTES:
+                os.replace(path, path + ".1")
+        except OSError:
+            pass
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def _labels(**labels) -> str:
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels.items()) + "}"
+
+
+def prometheus_text(tr: Trace) -> str:
+    root = next((r for r in tr.spans if r["kind"] == "run"), None)
+    stages = {}
+    upstream = {}
+    for r in tr.spans:
+        if r["kind"] == "stage":
+            stages[r["name"]] = stages.get(r["name"], 0.0) + r["ms"] / 1000
+        elif r["kind"] == "http":
+            a = r["attrs"]
+            u = upstream.setdefault(a.get("provider", "unknown"), {"requests": {}, "retries": 0, "bytes": 0, "sum": 0.0, "max": 0.0})
+            status = a.get("status") or "error"
+            u["requests"][status] = u["requests"].get(status, 0) + 1
+            u["retries"] += 1 if a.get("attempt", 0) > 0 else 0
+            u["bytes"] += a.get("bytes") or 0
+            u["sum"] += r["ms"] / 1000
+            u["max"] = max(u["max"], r["ms"] / 1000)
+
+    run = tr.name
+    out = []
+
+    def metric(name: str, help_: str, samples):
+        out.append(f"# HELP {name} {help_}")
+        out.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            out.append(f"{name}{_labels(**labels)} {round(float(value), 6)}")
+
+    metric("qiuqiu_run_duration_seconds", "Wall time of the last run.",
+           [({"run": run}, (root["ms"] if root else 0.0) / 1000)])
+    metric("qiuqiu_run_success", "1 if the last run finished without an exception.",
+           [({"run": run}, 1 if root and root["ok"] else 0)])
+    metric("qiuqiu_run_last_timestamp_seconds", "Unix time the last run started.",
+           [({"run": run}, tr.started)])
+    metric("qiuqiu_stage_duration_seconds", "Time spent per pipeline stage in the last run.",
+           [({"run": run, "stage": k}, v) for k, v in sorted(stages.items())])
+    metric("qiuqiu_upstream_requests", "Upstream HTTP attempts in the last run, by status.",
+           [({"run": run, "provider": p, "status": s}, n)
+            for p, u in sorted(upstream.items()) for s, n in sorted(u["requests"].items(), key=str)])
+    metric("qiuqiu_upstream_retries", "Upstream HTTP retries in the last run.",
+           [({"run": run, "provider": p}, u["retries"]) for p, u in sorted(upstream.items())])
+    metric("qiuqiu_upstream_bytes", "Upstream response bytes in the last run (Content-Length for streamed bodies).",
+           [({"run": run, "provider": p}, u["bytes"]) for p, u in sorted(upstream.items())])
+    metric("qiuqiu_upstream_duration_seconds_sum", "Total upstream request time in the last run.",
+           [({"run": run, "provider": p}, u["sum"]) for p, u in sorted(upstream.items())])
+    metric("qiuqiu_upstream_duration_seconds_max", "Slowest upstream request in the last run.",
+           [({"run": run, "provider": p}, u["max"]) for p, u in sorted(upstream.items())])
+    return "\n".join(out) + "\n"
+
+
+def write_textfile(tr: Trace, directory: str):
+    # Atomic replace: node_exporter must never read a half-written file
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"qiuqiu_{tr.name}.prom")
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(tr))
+    os.replace(tmp, path)
+
+
+def export(tr: Trace):
+    # Metrics must never break the run they describe
+    try:
+        write_jsonl(tr)
+    except OSError:
+        pass
+    directory = os.getenv("QIUQIU_METRICS_TEXTFILE_DIR")
+    if directory:
+        try:
+            write_textfile(tr, directory)
+        except OSError:
+            pass
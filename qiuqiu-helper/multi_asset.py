@@ -0,0 +1,248 @@
+import datetime as dt
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import http_client
+import metrics
+from ahr999_backfill import rolling_gma_array
+from btc_model import GENESIS, exp_params
+from closes_cache import get_daily_closes
+from exp_fit import MIN_LOG_SPREAD, MIN_POINTS, MIN_SPAN_DAYS
+
+# Ahr999-style valuation for a watchlist of coins (CoinGecko ids).
+#   index = (price / GMA200) * (price / growth curve)
+#   growth curve = 10^(a*log10(days_since_genesis) + b)
+# One batched simple/price call gives every live price; daily closes come from the
+# per-coin closes_cache files, refreshed at most once per UTC day (daily_refresh). Those
+# files keep every close (keep_all), so the history grows by a day per run beyond the
+# HISTORY_DAYS fetch window; `closes_cache.py import <id> <csv>` loads a long one at once.
+# Everything else is computed on assets x days NumPy arrays:
+# - GMA200 with rolling_gma_array() (same semantics as gma())
+# - a least-squares curve fit per row (masked sums, no Python loop over coins). Like
+#   exp_fit.py, a fit is only used over MIN_POINTS closes spanning MIN_SPAN_DAYS with a
+#   log10(t) spread of MIN_LOG_SPREAD: with t in the thousands of days, recent closes barely
+#   move log10(t), so (a, b) would be a recent trend, not a growth curve. Below that the
+#   coin gets no curve and no index.
+# Bitcoin keeps btc_model's curve (fixed or exp_fit.py), so its index equals the self-calc Ahr999.
+# Usage: python3 multi_asset.py [id ...]   (default: QIUQIU_WATCHLIST or DEFAULT_WATCHLIST)
+
+DEFAULT_WATCHLIST = [
+    "bitcoin", "ethereum", "solana", "binancecoin", "ripple", "cardano", "dogecoin", "tron",
+    "chainlink", "avalanche-2", "polkadot", "litecoin", "bitcoin-cash", "stellar", "monero",
+    "cosmos", "uniswap", "near",
+]
+
+# First trading day per coin (the curve's x axis). Unknown ids fall back to one year
+# before their first cached close.
+ASSET_GENESIS = {
+    "bitcoin": GENESIS,
+    "ethereum": dt.date(2015, 7, 30),
+    "solana": dt.date(2020, 3, 16),
+    "binancecoin": dt.date(2017, 7, 25),
+    "ripple": dt.date(2013, 8, 4),
+    "cardano": dt.date(2017, 10, 1),
+    "dogecoin": dt.date(2013, 12, 15),
+    "tron": dt.date(2017, 9, 13),
+    "chainlink": dt.date(2017, 9, 19),
+    "avalanche-2": dt.date(2020, 9, 22),
+    "polkadot": dt.date(2020, 8, 19),
+    "litecoin": dt.date(2013, 4, 28),
+    "bitcoin-cash": dt.date(2017, 8, 1),
+    "stellar": dt.date(2014, 8, 5),
+    "monero": dt.date(2014, 5, 21),
+    "cosmos": dt.date(2019, 3, 14),
+    "uniswap": dt.date(2020, 9, 17),
+    "near": dt.date(2020, 10, 14),
+}
+GENESIS_FALLBACK_DAYS = 365
+
+# Days fetched when a coin has no (or too short a) cache: CoinGecko's demo plan serves at
+# most 365. A fit needs MIN_SPAN_DAYS, so a coin gets its curve once the cache has grown
+# that long, or right after an import
+HISTORY_DAYS = int(os.getenv("QIUQIU_VALUATION_HISTORY_DAYS", "365"))
+GMA_WINDOW = 200
+MAX_PARALLEL_HISTORY = 4
+SIMPLE_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
+
+
+def fixed_curves():
+    # Curves that are not fitted here (bitcoin: the same params as dca_daily_report)
+    return {"bitcoin": exp_params()[:2]}
+
+
+def watchlist(ids=None):
+    ids = ids or [c for c in os.getenv("QIUQIU_WATCHLIST", "").split(",") if c.strip()] or DEFAULT_WATCHLIST
+    return list(dict.fromkeys(c.strip().lower() for c in ids))
+
+
+def fetch_spot_batch(ids, cg_api_key: str | None = None, timeout: float = 10):
+    # {id: {"price", "change24h"}} for every id CoinGecko knows, in one request
+    headers = {"x-cg-demo-api-key": cg_api_key} if cg_api_key else None
+    params = {"ids": ",".join(ids), "vs_currencies": "usd", "include_24hr_change": "true"}
+    r = http_client.get(SIMPLE_PRICE_URL, params=params, headers=headers, timeout=timeout)
+    r.raise_for_status()
+    out = {}
+    for coin, row in r.json().items():
+        if row.get("usd"):
+            out[coin] = {"price": float(row["usd"]), "change24h": row.get("usd_24h_change")}
+    return out
+
+
+def fetch_histories(ids, days: int = HISTORY_DAYS, timeout: float = 20):
+    # {id: [(date, close), ...] (all cached) or Exception}; cache hits cost no request at all
+    def one(coin):
+        try:
+            return get_daily_closes(days, timeout=timeout, coin_id=coin, daily_refresh=True, keep_all=True)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_HISTORY) as pool:
+        futs = [pool.submit(metrics.bind(one), coin) for coin in ids]
+        return {coin: f.result() for coin, f in zip(ids, futs)}
+
+
+def _closes(histories: dict, coin: str):
+    h = histories.get(coin)
+    return h if isinstance(h, list) else []
+
+
+def history_days(histories: dict, ids, today: dt.date, days: int) -> int:
+    # Matrix width: the fetch window, or the longest cached history if that is longer
+    first = min((_closes(histories, coin)[0][0] for coin in ids if _closes(histories, coin)), default=today)
+    return max(days, (today - first).days)
+
+
+def price_matrix(histories: dict, spots: dict, ids, today: dt.date, days: int):
+    # assets x days array ending today (NaN where a coin has no close); column -1 is the
+    # live batched price, since the cached point for today is only as fresh as its fetch
+    start = today - dt.timedelta(days=days)
+    p = np.full((len(ids), days + 1), np.nan)
+    for i, coin in enumerate(ids):
+        for d, close in _closes(histories, coin):
+            j = (d - start).days
+            if 0 <= j < days:
+                p[i, j] = close
+        if coin in spots:
+            p[i, -1] = spots[coin]["price"]
+    return start, p
+
+
+def genesis_days(ids, histories: dict, start: dt.date, days: int):
+    # assets x days array of days since each coin's genesis (NaN before genesis)
+    g = np.empty(len(ids))
+    for i, coin in enumerate(ids):
+        gen = ASSET_GENESIS.get(coin)
+        if gen is None:
+            first = min((d for d, _ in _closes(histories, coin)), default=start)
+            gen = first - dt.timedelta(days=GENESIS_FALLBACK_DAYS)
+        g[i] = (start - gen).days
+    t = g[:, None] + np.arange(days + 1)[None, :]
+    return np.where(t > 0, t, np.nan)
+
+
+def fit_growth_curves(p, t, min_points: int = MIN_POINTS, min_span_days: int = MIN_SPAN_DAYS,
+                      min_log_spread: float = MIN_LOG_SPREAD):
+    # Row-wise least squares of log10(price) = a*log10(t) + b over valid points.
+    # Returns (a, b, n_points, span_days, log10(t) std); rows with fewer than min_points
+    # points, spanning less than min_span_days, or with less spread get NaN.
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = np.log10(t)
+        y = np.log10(p)
+    m = np.isfinite(x) & np.isfinite(y)
+    x = np.where(m, x, 0.0)
+    y = np.where(m, y, 0.0)
+    n = m.sum(axis=1)
+    sx, sy = x.sum(axis=1), y.sum(axis=1)
+    sxx, sxy = (x * x).sum(axis=1), (x * y).sum(axis=1)
+    den = n * sxx - sx * sx
+    first, last = np.where(m, t, np.inf).min(axis=1), np.where(m, t, -np.inf).max(axis=1)
+    span = np.where(n > 0, last - first + 1, 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        spread = np.sqrt(np.maximum(den, 0.0)) / n
+        ok = (n >= max(min_points, 2)) & (span >= min_span_days) & (spread >= min_log_spread) & (den > 0)
+        a = np.where(ok, (n * sxy - sx * sy) / den, np.nan)
+        b = (sy - a * sx) / n
+    return a, b, n, span, spread
+
+
+def valuation(ids=None, cg_api_key: str | None = None, days: int = HISTORY_DAYS, today: dt.date | None = None):
+    ids = watchlist(ids)
+    today = today or dt.datetime.utcnow().date()
+    with metrics.trace("valuation"):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            spot_f = pool.submit(metrics.staged("prices", lambda: fetch_spot_batch(ids, cg_api_key)))
+            hist_f = pool.submit(metrics.staged("histories", lambda: fetch_histories(ids, days)))
+            spots, histories = spot_f.result(), hist_f.result()
+
+        with metrics.span("compute"):
+            width = history_days(histories, ids, today, days)
+            start, p = price_matrix(histories, spots, ids, today, width)
+            t = genesis_days(ids, histories, start, width)
+            gma200 = rolling_gma_array(p, GMA_WINDOW)[:, -1]
+            a, b, n, span, spread = fit_growth_curves(p, t)
+            fixed = fixed_curves()
+            for coin, (fa, fb) in fixed.items():
+                if coin in ids:
+                    i = ids.index(coin)
+                    a[i], b[i] = fa, fb
+            with np.errstate(invalid="ignore", divide="ignore"):
+                curve = 10 ** (a * np.log10(t[:, -1]) + b)
+                price = p[:, -1]
+                index = (price / gma200) * (price / curve)
+
+    rows = []
+    for i, coin in enumerate(ids):
+        h = histories.get(coin)
+        error = None
+        if coin not in spots:
+            error = "no price from simple/price"
+        elif isinstance(h, Exception):
+            error = f"history: {h}"
+        elif np.isnan(gma200[i]):
+            error = f"not enough history for GMA{GMA_WINDOW}"
+        elif np.isnan(curve[i]):
+            error = (f"history too short for a growth curve: {int(n[i])} closes over {int(span[i])}d "
+                     f"(log10(t) spread {np.nan_to_num(spread[i]):.3f}), "
+                     f"needs {MIN_POINTS} over {MIN_SPAN_DAYS}d (spread {MIN_LOG_SPREAD})")
+        rows.append({
+            "id": coin,
+            "price": spots.get(coin, {}).get("price"),
+            "change24h": spots.get(coin, {}).get("change24h"),
+            "gma200": None if np.isnan(gma200[i]) else float(gma200[i]),
+            "curve": None if np.isnan(curve[i]) else float(curve[i]),
+            "a": None if np.isnan(a[i]) else float(a[i]),
+            "b": None if np.isnan(b[i]) else float(b[i]),
+            "fixedCurve": coin in fixed,
+            "points": int(n[i]),
+            "index": None if np.isnan(index[i]) else float(index[i]),
+            "error": error,
+        })
+    return rows
+
+
+def print_valuation(rows):
+    print("=== QIUQIU MULTI-ASSET VALUATION ===")
+    print(f"{'asset':<14} {'price':>12} {'24h':>7} {'/GMA200':>8} {'/curve':>8} {'index':>8}  curve")
+    ranked = sorted(rows, key=lambda r: (r["index"] is None, r["index"] or 0))
+    for r in ranked:
+        # whatever was computed is shown; a row without an index says why in the last column
+        price = f"{r['price']:,.4f}" if r["price"] is not None else ""
+        chg = f"{r['change24h']:+.1f}%" if r["change24h"] is not None else ""
+        vs_gma = f"{r['price'] / r['gma200']:.3f}" if r["price"] is not None and r["gma200"] else ""
+        if r["index"] is None:
+            print(f"{r['id']:<14} {price:>12} {chg:>7} {vs_gma:>8} {'':>8} {'-':>8}  {r['error']}")
+            continue
+        src = "fixed" if r["fixedCurve"] else f"fit a={r['a']:.2f} b={r['b']:.2f} ({r['points']}d)"
+        print(f"{r['id']:<14} {price:>12} {chg:>7} {vs_gma:>8} "
+              f"{r['price'] / r['curve']:>8.3f} {r['index']:>8.4f}  {src}")
+
+
+def main():
+    print_valuation(valuation(sys.argv[1:] or None, os.getenv("CG_API_KEY")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import csv
+import datetime as dt
+import fcntl
+import os
+import sys
+from array import array
+
+import http_client
+from btc_model import GENESIS
+from json_stream import iter_array, response_chunks
+
+# Local BTC daily history, one flat column file per field, indexed by days since GENESIS:
+#   <dir>/close.f64, <dir>/volume.f64   little-endian float64, value for day i at offset 8*i
+# Days without data (2009-2010, gaps) are NaN. Readers memory-map the columns, so
+# "last 200 closes" or "2018..2022" is a zero-copy NumPy view found by arithmetic, not
+# a search. `sync` appends the days after the last stored one from CoinGecko
+# market_chart (the last stored day is re-fetched: until the UTC day closes its point is
+# the live price); `import` loads older history from a CSV (date,close[,volume]).
+# Writes and the dca hot path use plain file I/O; NumPy is only imported for the views.
+# Usage: python3 price_history.py sync | import <history.csv> | show [start] [end]
+
+DEFAULT_DIR = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/btc_history")
+COLUMNS = ("close", "volume")
+ITEM = 8
+# First sync without any history: CoinGecko's demo plan serves at most 365 days
+SYNC_DAYS = int(os.getenv("QIUQIU_PRICE_HISTORY_SYNC_DAYS", "365"))
+COINGECKO_MARKET_CHART = "https://api.coingecko.com/api/v3/coins/bitcoin/market_chart"
+
+
+def history_dir() -> str:
+    return os.getenv("QIUQIU_PRICE_HISTORY_DIR", DEFAULT_DIR)
+
+
+def column_path(name: str) -> str:
+    return os.path.join(history_dir(), f"{name}.f64")
+
+
+def day_index(d: dt.date) -> int:
+    return (d - GENESIS).days
+
+
+def day_of(i: int) -> dt.date:
+    return GENESIS + dt.timedelta(days=i)
+
+
+def length() -> int:
+    # Days stored (the shortest column wins, so a torn write is never read)
+    sizes = []
+    for name in COLUMNS:
+        try:
+            sizes.append(os.path.getsize(column_path(name)) // ITEM)
+        except FileNotFoundError:
+            return 0
+    return min(sizes)
+
+
+def last_day():
+    n = length()
+    return day_of(n - 1) if n else None
+
+
+def _to_le(a: array) -> array:
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a
+
+
+def _read(name: str, lo: int, hi: int) -> array:
+    # Values for days [lo, hi) as array('d'), without NumPy
+    a = array("d")
+    if hi <= lo:
+        return a
+    with open(column_path(name), "rb") as f:
+        f.seek(lo * ITEM)
+        a.frombytes(f.read((hi - lo) * ITEM))
+    return _to_le(a)
+
+
+def _has_close_until(i: int) -> bool:
+    # Any close stored on days [0, i]? (a NaN gap on day i itself doesn't matter)
+    return any(v == v for v in _read("close", 0, min(i + 1, length())))  # v == v: not NaN
+
+
+def column(name: str = "close"):
+    # Read-only memmap of a whole column (index = days since GENESIS)
+    import numpy as np
+    n = length()
+    if n == 0:
+        return np.zeros(0)
+    return np.memmap(column_path(name), dtype="<f8", mode="r", shape=(n,))
+
+
+def window(days: int, end: dt.date | None = None, name: str = "close"):
+    # View of the `days` days ending at `end` (inclusive, default the last stored day)
+    col = column(name)
+    hi = len(col) if end is None else min(len(col), day_index(end) + 1)
+    return col[max(0, hi - days):hi]
+
+
+def date_range(start: dt.date, end: dt.date, name: str = "close"):
+    # View of [start, end] inclusive, clipped to the stored days
+    col = column(name)
+    return col[max(0, day_index(start)):max(0, min(len(col), day_index(end) + 1))]
+
+
+def dated_closes(days: int, end: dt.date | None = None):
+    # [(date, close), ...] for the trailing window, missing days skipped (rolling_gma input)
+    n = length()
+    hi = n if end is None else min(n, day_index(end) + 1)
+    lo = max(0, hi - days)
+    return [(day_of(lo + i), p) for i, p in enumerate(_read("close", lo, hi)) if p == p]
+
+
+def write_days(rows: dict) -> int:
+    # rows: {date: (close, volume)}; overwrites stored days, extends (NaN-filled) past the end
+    if not rows:
+        return 0
+    os.makedirs(history_dir(), exist_ok=True)
+    n = length()
+    idx = {day_index(d): v for d, v in rows.items() if day_index(d) >= 0}
+    if not idx:
+        return 0
+    lo, hi = min(min(idx), n), max(max(idx) + 1, n)
+    for j, name in enumerate(COLUMNS):
+        path = column_path(name)
+        with open(path, "ab"):
+            pass
+        with open(path, "r+b") as f:
+            f.truncate(n * ITEM)  # drop a torn tail left by an interrupted write
+            vals = _read(name, lo, n)
+            vals.extend([float("nan")] * (hi - lo - len(vals)))
+            for i, v in idx.items():
+                vals[i - lo] = float("nan") if v[j] is None else float(v[j])
+            f.seek(lo * ITEM)
+            f.write(_to_le(vals).tobytes())
+    return len(idx)
+
+
+def fetch_market_chart(days: int, timeout: int = 20):
+    # {date: (close, volume)} from CoinGecko's daily market_chart
+    params = {"vs_currency": "usd", "days": str(days), "interval": "daily"}
+    r = http_client.get(COINGECKO_MARKET_CHART, params=params, timeout=timeout, stream=True)
+    try:
+        r.raise_for_status()
+        rest = {}
+        closes = {}
+        for ts_ms, price in iter_array(response_chunks(r), "prices", rest, read_rest=True):
+            closes[dt.datetime.utcfromtimestamp(ts_ms / 1000).date()] = float(price)
+    finally:
+        r.close()
+    volumes = {dt.datetime.utcfromtimestamp(ts_ms / 1000).date(): float(v) for ts_ms, v in rest.get("total_volumes", [])}
+    return {d: (p, volumes.get(d)) for d, p in closes.items()}
+
+
+class _Lock:
+    # One writer at a time (cron sync vs advisor service vs a manual run)
+    def __enter__(self):
+        os.makedirs(history_dir(), exist_ok=True)
+        self.f = open(os.path.join(history_dir(), ".lock"), "w")
+        fcntl.flock(self.f, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.f, fcntl.LOCK_UN)
+        self.f.close()
+
+
+def sync(timeout: int = 20, min_days: int = SYNC_DAYS) -> int:
+    # Fetches from the last stored day (inclusive) to today; returns the days written.
+    # The store covers the window when it holds closes from its start on: gaps inside it
+    # stay NaN rather than re-downloading the window. The request runs outside the lock,
+    # so concurrent runs only wait for each other's write, not for the network.
+    today = dt.datetime.utcnow().date()
+    last = last_day()
+    start = day_index(today - dt.timedelta(days=min_days))
+    covered = last is not None and start < length() and _has_close_until(start)
+    # Only the tail is missing: re-fetch from the last stored day (inclusive)
+    fetch_days = max((today - last).days, 1) if covered else min_days
+    rows = fetch_market_chart(fetch_days, timeout=timeout)
+    with _Lock():
+        return write_days(rows)
+
+
+def recent_closes(days: int, timeout: int = 20):
+    # Synced trailing window of closes as a memmap view (replaces per-run list building)
+    sync(timeout=timeout, min_days=days)
+    return window(days)
+
+
+def recent_dated_closes(days: int, timeout: int = 20):
+    # Synced [(date, close), ...] for the trailing window (rolling GMA200 input)
+    sync(timeout=timeout, min_days=days)
+    return dated_closes(days)
+
+
+def import_csv(path: str) -> int:
+    rows = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            vol = row.get("volume")
+            rows[dt.date.fromisoformat(row["date"])] = (float(row["close"]), float(vol) if vol else None)
+    with _Lock():
+        return write_days(rows)
+
+
+def main():
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "show"
+    if cmd == "sync":
+        written = sync()
+        print(f"synced {written} days, history now ends {last_day()}")
+    elif cmd == "import" and len(sys.argv) > 2:
+        written = import_csv(sys.argv[2])
+        print(f"imported {written} days, history now ends {last_day()}")
+    elif cmd == "show":
+        end = dt.date.fromisoformat(sys.argv[3]) if len(sys.argv) > 3 else last_day()
+        start = dt.date.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else (end and end - dt.timedelta(days=13))
+        if end is None:
+            print(f"No price history in {history_dir()} (run: price_history.py sync)")
+            return 1
+        closes, volumes = date_range(start, end), date_range(start, end, "volume")
+        first = max(day_index(start), 0)
+        for i in range(len(closes)):
+            print(f"{day_of(first + i).isoformat()}  {closes[i]:>12,.2f}  {volumes[i] / 1e9:>8.2f}B")
+    else:
+        print("Usage: python3 price_history.py sync | import <history.csv> | show [start] [end]")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+import datetime as dt
+import math
+import os
+import sys
+import time
+
+from crypto_pulse import fetch_pulse
+
+# Continuous BTC pulse: polls Coinbase + CoinGecko (crypto_pulse.fetch_pulse, so every sample
+# also lands in the time-series store) and keeps rolling statistics over the last samples:
+# - volatility of Coinbase log returns, over a short and a long window. Each return is
+#   scaled by 1/sqrt(seconds since the previous price) (bps/√s): the interval adapts, and
+#   per-sample returns would shrink as polling speeds up, damping the very spike that sped it up
+# - mean / std of the Coinbase-CoinGecko spread, and z-scores of the latest spread and return
+# Each window is a ring buffer with windowed Welford updates: O(1) per sample, whatever its size.
+# Alerts are edge-triggered (printed when a condition starts and when it clears, not on
+# every sample). The poll interval shrinks when short-window volatility spikes above the
+# long-window level and stretches when the market is calm.
+# Usage: python3 pulse_monitor.py <cg_api_key> [interval_s] [samples]   (Ctrl+C to stop)
+
+INTERVAL_S = float(os.getenv("PULSE_INTERVAL_S", "30"))
+MIN_INTERVAL_S = float(os.getenv("PULSE_MIN_INTERVAL_S", "5"))  # CoinGecko demo plan: ~30 calls/min
+MAX_INTERVAL_S = float(os.getenv("PULSE_MAX_INTERVAL_S", "120"))
+SHORT_WINDOW = int(os.getenv("PULSE_SHORT_WINDOW", "20"))
+LONG_WINDOW = int(os.getenv("PULSE_LONG_WINDOW", "240"))
+# Statistics need a few samples before z-scores mean anything
+MIN_SAMPLES = 10
+
+SPREAD_Z = float(os.getenv("PULSE_SPREAD_Z", "3"))
+SPREAD_FLOOR_USD = float(os.getenv("PULSE_SPREAD_FLOOR_USD", "20"))  # ignore statistically odd but tiny spreads
+RETURN_Z = float(os.getenv("PULSE_RETURN_Z", "4"))
+VOL_SPIKE_RATIO = float(os.getenv("PULSE_VOL_SPIKE_RATIO", "2"))
+CHANGE_24H_PCT = 5.0
+SOURCE_DOWN_AFTER = 3  # consecutive failed polls
+# An active alert clears only once its measure falls below this fraction of the threshold,
+# so a value hovering at the threshold doesn't start/clear on every sample
+CLEAR_RATIO = 0.8
+
+
+class RollingStats:
+    # Mean / variance of the last `window` values (ring buffer + windowed Welford)
+    def __init__(self, window: int):
+        self.window = window
+        self.values = [0.0] * window
+        self.head = 0  # next slot to write
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        # recompute from the buffer every `window` pushes to cancel float drift (amortized O(1))
+        self.pushes_since_resum = 0
+
+    def push(self, x: float):
+        if self.count == self.window:
+            old = self.values[self.head]
+            # remove the oldest value (Welford in reverse), then add x
+            self.count -= 1
+            if self.count:
+                d = old - self.mean
+                self.mean -= d / self.count
+                self.m2 -= d * (old - self.mean)
+            else:
+                self.mean = self.m2 = 0.0
+        self.values[self.head] = x
+        self.head = (self.head + 1) % self.window
+        self.count += 1
+        d = x - self.mean
+        self.mean += d / self.count
+        self.m2 += d * (x - self.mean)
+
+        self.pushes_since_resum += 1
+        if self.pushes_since_resum >= self.window:
+            self._resum()
+
+    def _resum(self):
+        vals = self.values if self.count == self.window else self.values[:self.count]
+        self.mean = math.fsum(vals) / self.count
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in vals)
+        self.pushes_since_resum = 0
+
+    def std(self):
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1)) if self.count > 1 else None
+
+    def zscore(self, x: float):
+        s = self.std()
+        if self.count < MIN_SAMPLES or not s:
+            return None
+        return (x - self.mean) / s
+
+
+class PulseMonitor:
+    def __init__(self, short_window: int = SHORT_WINDOW, long_window: int = LONG_WINDOW):
+        self.returns_short = RollingStats(short_window)
+        self.returns_long = RollingStats(long_window)
+        self.spread = RollingStats(long_window)
+        self.last_price = None
+        self.last_time = None  # monotonic seconds of last_price
+        self.failures = 0
+        self.active = {}  # alert name -> message when it started
+
+    def update(self, sample: dict, now: float | None = None):
+        # One poll result (crypto_pulse.fetch_pulse dict) taken at `now` (monotonic seconds)
+        # -> (view dict, [alert lines])
+        now = time.monotonic() if now is None else now
+        cb, cg = sample.get("cb_price"), sample.get("cg_price")
+        view = {"cb": cb, "cg": cg, "change24h": sample.get("change_24h")}
+        conditions = {}
+
+        if cb is None and cg is None:
+            self.failures += 1
+        else:
+            self.failures = 0
+        if self.failures >= SOURCE_DOWN_AFTER:
+            conditions["source_down"] = f"no price from Coinbase or CoinGecko for {self.failures} polls"
+
+        if cb:
+            if self.last_price:
+                r = math.log(cb / self.last_price) * 1e4  # bps
+                elapsed = max(now - self.last_time, 1e-3)
+                rn = r / math.sqrt(elapsed)  # bps/√s
+                # z against the window before this return is added
+                view["returnZ"] = self.returns_long.zscore(rn)
+                self.returns_short.push(rn)
+                self.returns_long.push(rn)
+                view["return"] = r
+                view["elapsed"] = elapsed
+            self.last_price = cb
+            self.last_time = now
+        if cb and cg:
+            s = cb - cg
+            view["spreadZ"] = self.spread.zscore(s)
+            self.spread.push(s)
+            view["spread"] = s
+        view["volShort"] = self.returns_short.std()
+        view["volLong"] = self.returns_long.std()
+        view["spreadMean"] = self.spread.mean if self.spread.count else None
+
+        z = view.get("spreadZ")
+        if z is not None and abs(z) >= self._threshold("spread", SPREAD_Z) and abs(view["spread"]) >= SPREAD_FLOOR_USD:
+            conditions["spread"] = f"spread ${view['spread']:+,.2f} is {z:+.1f}σ from its mean ${view['spreadMean']:+,.2f}"
+        z = view.get("returnZ")
+        if z is not None and abs(z) >= self._threshold("jump", RETURN_Z):
+            conditions["jump"] = f"price move {view['return']:+.1f}bps in {view['elapsed']:.0f}s is {z:+.1f}σ"
+        if self.vol_ratio() >= self._threshold("volatility", VOL_SPIKE_RATIO):
+            conditions["volatility"] = (f"short-window volatility {view['volShort']:.2f}bps/√s is "
+                                        f"{self.vol_ratio():.1f}x the long-window {view['volLong']:.2f}bps/√s")
+        chg = view["change24h"]
+        if chg is not None and chg <= -CHANGE_24H_PCT:
+            conditions["drawdown_24h"] = f"24h change {chg:.2f}%: blood on the streets, watch for bottom support"
+        if chg is not None and chg >= CHANGE_24H_PCT:
+            conditions["rally_24h"] = f"24h change {chg:+.2f}%: strong momentum, watch for resistance"
+        return view, self._edges(conditions)
+
+    def _threshold(self, name: str, level: float) -> float:
+        return level * CLEAR_RATIO if name in self.active else level
+
+    def _edges(self, conditions: dict):
+        # Alert lines for conditions that just started or just cleared
+        lines = []
+        for name, msg in conditions.items():
+            if name not in self.active:
+                lines.append(f"ALERT {name}: {msg}")
+        for name in list(self.active):
+            if name not in conditions:
+                lines.append(f"CLEAR {name} (was: {self.active[name]})")
+        self.active = dict(conditions)
+        return lines
+
+    def vol_ratio(self) -> float:
+        short, long_ = self.returns_short.std(), self.returns_long.std()
+        if self.returns_short.count < MIN_SAMPLES or not short or not long_:
+            return 1.0
+        return short / long_
+
+    def next_interval(self, base: float = INTERVAL_S) -> float:
+        # Volatility spike -> poll faster; calm market -> slower
+        return min(max(base / self.vol_ratio(), MIN_INTERVAL_S), MAX_INTERVAL_S)
+
+
+def format_view(view: dict, interval: float) -> str:
+    def f(v, fmt, none="-"):
+        return fmt.format(v) if v is not None else none
+    return (f"{dt.datetime.utcnow():%H:%M:%S}  cb {f(view['cb'], '${:,.2f}')}  cg {f(view['cg'], '${:,.2f}')}  "
+            f"spread {f(view.get('spread'), '{:+.2f}')} (z {f(view.get('spreadZ'), '{:+.1f}')})  "
+            f"ret {f(view.get('return'), '{:+.1f}bps')}  vol {f(view['volShort'], '{:.2f}')}/{f(view['volLong'], '{:.2f}')}bps/√s  "
+            f"next {interval:.0f}s")
+
+
+def run(cg_api_key: str, interval: float = INTERVAL_S, samples: int | None = None, fetch=None):
+    mon = PulseMonitor()
+    fetch = fetch or (lambda: fetch_pulse(cg_api_key))
+    n = 0
+    while samples is None or n < samples:
+        t0 = time.monotonic()
+        sample = fetch()
+        view, alerts = mon.update(sample, time.monotonic())
+        wait = mon.next_interval(interval)
+        print(format_view(view, wait))
+        for line in alerts:
+            print(line)
+        sys.stdout.flush()
+        n += 1
+        if samples is None or n < samples:
+            time.sleep(max(wait - (time.monotonic() - t0), 0))
+    return mon
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 pulse_monitor.py <cg_api_key> [interval_s] [samples]")
+        return 1
+    interval = float(sys.argv[2]) if len(sys.argv) > 2 else INTERVAL_S
+    samples = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    try:
+        run(sys.argv[1], interval, samples)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
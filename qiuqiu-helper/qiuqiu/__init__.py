@@ -0,0 +1,3 @@
+# qiuqiu-helper command-line entry point: `python3 -m qiuqiu <subcommand>` (or bin/qiuqiu).
+# The shared modules stay flat next to this package (http_client.py, btc_model.py, ...);
+# see cli.py for the subcommand table.
@@ -0,0 +1,5 @@
+import sys
+
+from qiuqiu.cli import main
+
+sys.exit(main())
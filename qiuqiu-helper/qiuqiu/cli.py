@@ -0,0 +1,76 @@
+import os
+import sys
+
+# Single dispatcher for the qiuqiu-helper scripts.
+#   qiuqiu <subcommand> [args...]
+# Nothing but the chosen subcommand's module is imported (and `requests` only once a
+# fetch actually happens, see http_client.py), so the host pays interpreter start-up plus
+# one module per call instead of every script importing everything.
+# Each entry is "module:function"; the function reads its arguments from sys.argv as it
+# does when the script is run directly (python3 <module>.py args...).
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {
+    "dca": ("dca_daily_report:main", "daily DCA instruction, cached for the UTC day  [intraday]"),
+    "dca-batch": ("dca_batch:main", "DCA for every account in a batch config  [accounts.json]"),
+    "pulse": ("crypto_pulse:main", "BTC pulse: Coinbase vs CoinGecko  <cg_api_key>"),
+    "pulse-monitor": ("pulse_monitor:main", "continuous BTC pulse with rolling stats and alerts  <cg_api_key> [interval_s] [samples]"),
+    "ahr999": ("qiuqiu.cli:ahr999", "self-calculated Ahr999, or CoinGlass with  <coinglass_api_key>"),
+    "coinglass": ("get_coinglass_data:main", "BTC derivatives insight  <coinglass_api_key>"),
+    "derivatives": ("coinglass_snapshot:main", "multi-symbol derivatives snapshot  <coinglass_api_key> [SYMBOL ...]"),
+    "price": ("spot_aggregator:main", "hedged BTC spot across venues  [first|median]"),
+    "panel": ("dca_strategy_panel:main", "strategy panel score  [cg_api_key]"),
+    "valuation": ("multi_asset:main", "Ahr999-style index for a watchlist  [coingecko_id ...]"),
+    "ts": ("timeseries:main", "recorded snapshots  list | query <series[@1h|@1d]> [start] [end] | rollup"),
+    "clean-logs": ("clean_logs:main", "log retention  [days] [path ...] [--compress-after D] [--max-bytes SIZE] [--dry-run]"),
+    "history": ("price_history:main", "local BTC daily history  sync | import <history.csv> | show [start] [end]"),
+    "expfit": ("exp_fit:main", "ExpPrice least-squares fit  show | refit [window_days|all]"),
+    "backtest": ("dca_backtest:main", "replay decide_action over a history CSV  <history.csv>"),
+    "backfill": ("ahr999_backfill:main", "full-history Ahr999 CSV  [closes.csv]"),
+    "sweep": ("dca_sweep:main", "parameter sweep over a history CSV (see --help)"),
+    "tracker": ("tracker_store:main", "tracker store  migrate <tracker.json> | show <tracker.db>"),
+    "serve": ("advisor_service:main", "run the local advisor service  [port]"),
+}
+
+
+def ahr999():
+    # With a CoinGlass key: the official value; without: the self-calculated one
+    if len(sys.argv) > 1:
+        from get_coinglass_ahr999 import main as coinglass_main
+        coinglass_main()
+    else:
+        from ahr999_selfcalc import main as selfcalc_main
+        selfcalc_main()
+
+
+def usage():
+    print("Usage: qiuqiu <subcommand> [args...]")
+    print()
+    for name, (_, desc) in COMMANDS.items():
+        print(f"  {name:<11} {desc}")
+
+
+def resolve(target: str):
+    import importlib
+    module, func = target.split(":")
+    return getattr(importlib.import_module(module), func)
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help", "help"):
+        usage()
+        return 0
+    name, args = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"Error: unknown subcommand '{name}'")
+        usage()
+        return 2
+
+    # The shared modules live next to the package, not inside it
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    sys.argv = [f"qiuqiu {name}", *args]
+    rc = resolve(COMMANDS[name][0])()
+    return rc if isinstance(rc, int) else 0
@@ -0,0 +1,129 @@
+import datetime as dt
+import json
+import math
+import os
+
+# Rolling geometric mean (GMA200) over daily closes.
+# Keeps ln(close) in a fixed-size ring buffer plus their running sum, so a new
+# daily close (or an intraday update of today's close) is O(1) instead of
+# re-taking 200 logs. State is saved to disk between runs.
+
+DEFAULT_STATE_PATH = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/btc_gma200_state.json")
+DEFAULT_WINDOW = 200
+
+
+class RollingGMA:
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.logs = [0.0] * window
+        self.head = 0  # next slot to write
+        self.count = 0
+        self.log_sum = 0.0
+        self.last_date = None
+        # re-sum the buffer every `window` pushes to cancel float drift (amortized O(1))
+        self.pushes_since_resum = 0
+
+    def push(self, date: dt.date, close: float):
+        # Same semantics as gma(): non-positive / missing closes are ignored
+        if not close or close <= 0:
+            return
+        if self.last_date is not None and date < self.last_date:
+            return
+        lp = math.log(close)
+
+        if self.last_date is not None and date == self.last_date and self.count:
+            # Today's close is still moving: replace the newest slot
+            idx = (self.head - 1) % self.window
+            self.log_sum += lp - self.logs[idx]
+            self.logs[idx] = lp
+        else:
+            if self.count == self.window:
+                self.log_sum -= self.logs[self.head]
+            else:
+                self.count += 1
+            self.logs[self.head] = lp
+            self.log_sum += lp
+            self.head = (self.head + 1) % self.window
+            self.last_date = date
+
+        self.pushes_since_resum += 1
+        if self.pushes_since_resum >= self.window:
+            self.log_sum = math.fsum(self.logs)  # unused slots are 0.0
+            self.pushes_since_resum = 0
+
+    def is_full(self) -> bool:
+        return self.count == self.window
+
+    def value(self):
+        return math.exp(self.log_sum / self.count) if self.count else None
+
+    def ahr999_at(self, price: float, exp_p: float):
+        # Intraday what-if: Ahr999 at an arbitrary spot price against the current GMA200
+        g = self.value()
+        if not g:
+            return None
+        return (price / g) * (price / exp_p)
+
+    def to_dict(self):
+        return {
+            "window": self.window,
+            "logs": self.logs,
+            "head": self.head,
+            "count": self.count,
+            "logSum": self.log_sum,
+            "lastDate": self.last_date.isoformat() if self.last_date else None,
+            "pushesSinceResum": self.pushes_since_resum,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict):
+        g = cls(int(d.get("window", DEFAULT_WINDOW)))
+        logs = d.get("logs") or []
+        if len(logs) != g.window:
+            return g
+        g.logs = [float(x) for x in logs]
+        g.head = int(d.get("head", 0))
+        g.count = int(d.get("count", 0))
+        g.log_sum = float(d.get("logSum", 0.0))
+        g.last_date = dt.date.fromisoformat(d["lastDate"]) if d.get("lastDate") else None
+        g.pushes_since_resum = int(d.get("pushesSinceResum", 0))
+        return g
+
+
+def load_rolling_gma(path: str | None = None, window: int = DEFAULT_WINDOW):
+    path = path or os.getenv("DCA_GMA_STATE_PATH", DEFAULT_STATE_PATH)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            g = RollingGMA.from_dict(json.load(f))
+    except (FileNotFoundError, ValueError, KeyError):
+        return RollingGMA(window)
+    return g if g.window == window else RollingGMA(window)
+
+
+def save_rolling_gma(state: RollingGMA, path: str | None = None):
+    path = path or os.getenv("DCA_GMA_STATE_PATH", DEFAULT_STATE_PATH)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state.to_dict(), f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def sync_rolling_gma(dated_closes, path: str | None = None, window: int = DEFAULT_WINDOW):
+    # dated_closes: [(date, close), ...] sorted by date (e.g. closes_cache.get_daily_closes)
+    # Only closes from the state's last date onwards are pushed; a stale or empty
+    # state (gap longer than the window) is rebuilt from the list.
+    state = load_rolling_gma(path, window)
+    if not dated_closes:
+        return state
+
+    newest = dated_closes[-1][0]
+    if state.last_date is None or (newest - state.last_date).days >= window:
+        state = RollingGMA(window)
+
+    for d, p in dated_closes:
+        if state.last_date is None or d >= state.last_date:
+            state.push(d, p)
+
+    save_rolling_gma(state, path)
+    return state
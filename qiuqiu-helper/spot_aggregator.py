@@ -0,0 +1,207 @@
+import json
+import math
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+
+import http_client
+import metrics
+from crypto_pulse import fetch_btc_spot_coingecko
+from get_crypto_price import fetch_btc_spot_binance
+from get_crypto_price_v2 import fetch_btc_spot_coinbase, fetch_btc_spot_okx
+
+# Hedged BTC spot price across venues.
+# All venues are queried at once (best-ranked first); one slow or failing exchange
+# can no longer stall the caller.
+# - mode "first":  first valid price wins
+# - mode "median": median of the valid prices back within window_ms of the first one
+# Per-venue latency histograms and error counts are kept on disk and used to rank venues.
+# Note: Binance/OKX quote BTC-USDT, Coinbase/CoinGecko BTC-USD (basis is usually a few $).
+# Usage: python3 spot_aggregator.py [first|median]
+
+DEFAULT_STATS_PATH = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/spot_venue_stats.json")
+
+VENUES = {
+    "coinbase": fetch_btc_spot_coinbase,
+    "binance": fetch_btc_spot_binance,
+    "okx": fetch_btc_spot_okx,
+    "coingecko": lambda timeout: fetch_btc_spot_coingecko(os.getenv("CG_API_KEY"), timeout=timeout),
+}
+
+# Latency histogram bucket upper bounds (ms); the last bucket is open-ended
+LATENCY_BUCKETS_MS = [50, 100, 200, 400, 800, 1600, 3200, 6400]
+# Halve all counts once a venue has this many samples, so rankings follow recent behaviour
+STATS_DECAY_AT = 1000
+
+_stats_lock = threading.Lock()
+_stats = None
+
+
+def _empty_stats():
+    return {"buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1), "ok": 0, "errors": 0}
+
+
+def load_stats(path: str | None = None):
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            path = path or os.getenv("DCA_SPOT_STATS_PATH", DEFAULT_STATS_PATH)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    _stats = json.load(f)
+            except (FileNotFoundError, ValueError):
+                _stats = {}
+        return _stats
+
+
+def save_stats(path: str | None = None):
+    path = path or os.getenv("DCA_SPOT_STATS_PATH", DEFAULT_STATS_PATH)
+    with _stats_lock:
+        data = json.dumps(_stats or {}, separators=(",", ":"))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # stats are best-effort
+
+
+def record(venue: str, latency_ms: float, ok: bool):
+    stats = load_stats()
+    with _stats_lock:
+        s = stats.setdefault(venue, _empty_stats())
+        if ok:
+            i = 0
+            while i < len(LATENCY_BUCKETS_MS) and latency_ms > LATENCY_BUCKETS_MS[i]:
+                i += 1
+            s["buckets"][i] += 1
+            s["ok"] += 1
+        else:
+            s["errors"] += 1
+        if s["ok"] + s["errors"] >= STATS_DECAY_AT:
+            s["buckets"] = [b // 2 for b in s["buckets"]]
+            s["ok"] //= 2
+            s["errors"] //= 2
+
+
+def latency_quantile_ms(s: dict, q: float):
+    # Upper bound of the bucket holding the q-quantile (inf when unknown/slow)
+    total = sum(s["buckets"])
+    if not total:
+        return math.inf
+    seen = 0
+    for i, c in enumerate(s["buckets"]):
+        seen += c
+        if seen >= q * total:
+            return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else math.inf
+    return math.inf
+
+
+def venue_order(venues=None):
+    # Rank by error rate, then p50 latency; venues without history keep their configured order
+    stats = load_stats()
+    names = list(venues or VENUES)
+
+    def key(name):
+        s = stats.get(name)
+        if not s or not (s["ok"] + s["errors"]):
+            return (0.0, 0.0, names.index(name))
+        err_rate = s["errors"] / (s["ok"] + s["errors"])
+        return (round(err_rate, 1), latency_quantile_ms(s, 0.5), names.index(name))
+
+    return sorted(names, key=key)
+
+
+def _query(name: str, fn, timeout: float, out: queue.Queue):
+    t0 = time.perf_counter()
+    try:
+        price = float(fn(timeout=timeout))
+        if not (price > 0 and math.isfinite(price)):
+            raise ValueError(f"invalid price {price!r}")
+        err = None
+    except Exception as e:
+        price, err = None, e
+    latency_ms = (time.perf_counter() - t0) * 1000
+    record(name, latency_ms, err is None)
+    out.put((name, price, err, latency_ms))
+
+
+def aggregate_spot(mode: str = "first", venues=None, window_ms: float = 300, timeout: float = 5):
+    order = venue_order(venues)
+    out = queue.Queue()
+    # daemon threads: a straggling venue never blocks the caller (or interpreter exit)
+    for name in order:
+        # bound to the caller's trace; stragglers that finish after the run ends are dropped
+        target = metrics.staged(name, _query, kind="venue")
+        threading.Thread(target=target, args=(name, VENUES[name], timeout, out), daemon=True).start()
+
+    prices = {}
+    errors = {}
+    wait = timeout + 1
+    left = http_client.remaining()  # inside a report's latency budget, never wait past it
+    if left is not None:
+        wait = min(wait, max(left, 0.0))
+    deadline = time.monotonic() + wait
+    window_end = None
+    pending = len(order)
+    while pending:
+        now = time.monotonic()
+        limit = window_end if window_end is not None else deadline
+        if now >= limit:
+            break
+        try:
+            name, price, err, latency_ms = out.get(timeout=limit - now)
+        except queue.Empty:
+            break
+        pending -= 1
+        if err is not None:
+            errors[name] = str(err)
+            continue
+        prices[name] = price
+        if mode == "first":
+            break
+        if window_end is None:
+            window_end = time.monotonic() + window_ms / 1000
+
+    save_stats()
+
+    if not prices:
+        raise RuntimeError(f"All spot venues failed: {errors or 'timeout'}")
+
+    if mode == "first":
+        venue = next(iter(prices))
+        value = prices[venue]
+    else:
+        value = statistics.median(prices.values())
+        venue = "median(" + ",".join(sorted(prices)) + ")"
+    return {"price": value, "venue": venue, "prices": prices, "errors": errors, "mode": mode}
+
+
+def main():
+    mode = sys.argv[1] if len(sys.argv) > 1 else "first"
+    try:
+        res = aggregate_spot(mode)
+    except Exception as e:
+        print(f"Error: {e}")
+        return
+    print(f"=== BTC SPOT ({mode}) ===")
+    print(f"Price:  ${res['price']:,.2f}  via {res['venue']}")
+    for name, p in res["prices"].items():
+        print(f"  {name:<10} ${p:,.2f}")
+    for name, e in res["errors"].items():
+        print(f"  {name:<10} error: {e}")
+    stats = load_stats()
+    for name in venue_order():
+        s = stats.get(name)
+        if s:
+            p50, p90 = latency_quantile_ms(s, 0.5), latency_quantile_ms(s, 0.9)
+            print(f"  [{name}] ok={s['ok']} err={s['errors']} p50<={p50}ms p90<={p90}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import requests
+import http_client
 import sys
 
 def test_coinglass_v2(api_key):
@@ -9,7 +9,7 @@ def test_coinglass_v2(api_key):
         "coinglassApiKeys": api_key
     }
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10)
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.text[:500]}")
     except Exception as e:
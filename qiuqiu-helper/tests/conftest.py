@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path[:0] = [ROOT, os.path.join(ROOT, "bench")]
+
+from run_bench import bench_env  # noqa: E402
+
+
+@pytest.fixture
+def qiuqiu_env(tmp_path, monkeypatch):
+    # Every state file under tmp_path, upstream calls sent nowhere (same paths as the bench)
+    for k, v in bench_env("http://127.0.0.1:9", str(tmp_path)).items():
+        monkeypatch.setenv(k, v)
+    monkeypatch.setenv("DCA_CLOSES_CACHE_DIR", str(tmp_path / "daily_closes"))
+    for k in ("COINGLASS_API_KEY", "COINGLASS_AHR999", "DCA_TRACKER_DB", "DCA_RESULT_CACHE"):
+        monkeypatch.delenv(k, raising=False)
+    return tmp_path
@@ -0,0 +1,30 @@
+import inspect
+import socket
+import time
+
+import advisor_client
+
+
+def test_hung_service_returns_none_within_the_timeout(monkeypatch):
+    # accepts the connection but never answers
+    srv = socket.socket()
+    srv.bind(("127.0.0.1", 0))
+    srv.listen(1)
+    monkeypatch.setenv("QIUQIU_ADVISOR_URL", f"http://127.0.0.1:{srv.getsockname()[1]}")
+    monkeypatch.delenv("QIUQIU_ADVISOR", raising=False)
+    try:
+        t0 = time.monotonic()
+        assert advisor_client.query("/ahr999", timeout=0.3) is None
+        assert time.monotonic() - t0 < 2
+    finally:
+        srv.close()
+
+
+def test_default_timeout_is_short():
+    assert inspect.signature(advisor_client.query).parameters["timeout"].default == advisor_client.TIMEOUT_S
+    assert advisor_client.TIMEOUT_S <= 5
+
+
+def test_disabled(monkeypatch):
+    monkeypatch.setenv("QIUQIU_ADVISOR", "off")
+    assert advisor_client.query("/health") is None
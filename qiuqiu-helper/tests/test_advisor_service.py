@@ -0,0 +1,41 @@
+import datetime as dt
+import threading
+import time
+import types
+
+import advisor_service
+
+
+def test_single_flight_collapses_concurrent_calls():
+    cache = advisor_service.SingleFlightCache()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("k", 60, slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [42] * 8
+    assert len(calls) == 1
+    assert cache.get("k", 60, slow) == 42 and len(calls) == 1
+
+
+def test_gma200_cache_rolls_over_at_utc_midnight(monkeypatch):
+    monkeypatch.setattr(advisor_service, "cache", advisor_service.SingleFlightCache())
+    syncs = []
+    monkeypatch.setattr(advisor_service.dca, "sync_gma200_state", lambda: syncs.append(1) or len(syncs))
+    now = [dt.datetime(2026, 10, 17, 23, 59)]
+    fake_dt = types.SimpleNamespace(datetime=types.SimpleNamespace(utcnow=lambda: now[0]))
+    monkeypatch.setattr(advisor_service, "dt", fake_dt)
+
+    assert advisor_service.cached_gma200() == 1
+    assert advisor_service.cached_gma200() == 1  # within the TTL, same day
+    now[0] = dt.datetime(2026, 10, 18, 0, 1)
+    assert advisor_service.cached_gma200() == 2  # new UTC day: re-synced
+    assert len(advisor_service.cache.entries) == 2
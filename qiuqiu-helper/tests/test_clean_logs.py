@@ -0,0 +1,50 @@
+import gzip
+import os
+import time
+
+import clean_logs
+
+DAY = 86400
+
+
+def _log(path, days_old: float, text="line\n" * 2000):
+    path.write_text(text)
+    t = time.time() - days_old * DAY
+    os.utime(path, (t, t))
+
+
+def test_expired_deleted_warm_compressed(tmp_path):
+    _log(tmp_path / "old.log", 10)
+    _log(tmp_path / "warm.log", 4)
+    _log(tmp_path / "new.log", 0)
+    rep = clean_logs.clean(str(tmp_path), days=7, compress_after=3)
+    assert sorted(os.listdir(tmp_path)) == ["new.log", "warm.log.gz"]
+    assert gzip.open(tmp_path / "warm.log.gz").read() == ("line\n" * 2000).encode()
+    assert rep["totals"]["deleted"][0] == 1 and rep["totals"]["compressed"][0] == 1
+    # mtime is kept, so the file keeps aging
+    assert time.time() - os.path.getmtime(tmp_path / "warm.log.gz") > 3.9 * DAY
+
+
+def test_existing_gz_is_never_overwritten(tmp_path):
+    _log(tmp_path / "y.log", 4)
+    (tmp_path / "y.log.gz").write_bytes(b"OLD")
+    for dry_run in (True, False):
+        rep = clean_logs.clean(str(tmp_path), days=30, compress_after=3, dry_run=dry_run)
+        assert rep["totals"]["skipped"][0] == 1
+        assert "compressed" not in rep["totals"]
+    assert (tmp_path / "y.log.gz").read_bytes() == b"OLD"
+    assert (tmp_path / "y.log").exists()
+
+
+def test_dry_run_touches_nothing(tmp_path):
+    _log(tmp_path / "old.log", 10)
+    _log(tmp_path / "warm.log", 4)
+    clean_logs.clean(str(tmp_path), days=7, compress_after=3, dry_run=True)
+    assert sorted(os.listdir(tmp_path)) == ["old.log", "warm.log"]
+
+
+def test_size_budget_trims_oldest_first(tmp_path):
+    for i in range(5):
+        _log(tmp_path / f"f{i}.log", 5 - i, "x" * 1000)
+    clean_logs.clean(str(tmp_path), days=30, max_bytes=2500)
+    assert sorted(os.listdir(tmp_path)) == ["f3.log", "f4.log"]
@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+import coinglass_cache
+import dca_daily_report as dca
+
+
+def _cache_latest(point):
+    coinglass_cache.save_entry("ahr999", {"tail": [point], "latest": point, "expiresAt": time.time() + 3600})
+
+
+def test_latest_value(qiuqiu_env):
+    _cache_latest({"date": "2026/10/17", "ahr999": "0.52"})
+    latest = coinglass_cache.fetch_coinglass_ahr999_latest("key")
+    assert latest["value"] == 0.52
+    assert latest["date"] == "2026/10/17"
+
+
+@pytest.mark.parametrize("point", [
+    {"date": "2026/10/17"},
+    {"date": "2026/10/17", "ahr999": None},
+    {"date": "2026/10/17", "ahr999": "NaN"},
+    {"date": "2026/10/17", "ahr999": ""},
+])
+def test_missing_value_is_an_error_not_zero(qiuqiu_env, monkeypatch, point):
+    _cache_latest(point)
+    with pytest.raises(RuntimeError):
+        coinglass_cache.fetch_coinglass_ahr999_latest("key")
+
+    # the report's primary source fails, so the self-calc decides instead
+    monkeypatch.setenv("COINGLASS_API_KEY", "key")
+    with pytest.raises(RuntimeError):
+        dca.fetch_ahr999_coinglass()
+
+
+def test_expiry_follows_the_point_date():
+    now = 1_792_108_800.0  # 2026-10-16 00:00 UTC
+    # today's point: fresh until the next midnight + grace
+    assert coinglass_cache.expires_at({"date": "2026/10/16"}, now) == now + 86400 + coinglass_cache.UPDATE_GRACE_S
+    # yesterday's point after its update time: re-checked soon
+    later = now + 2 * 3600
+    assert coinglass_cache.expires_at({"date": "2026/10/15"}, later) == later + coinglass_cache.RETRY_S
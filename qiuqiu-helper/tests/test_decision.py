@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from dca_backtest import is_selfcalc_csv, run_backtest
+from dca_daily_report import DCA_PARAMS, decide_action
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+P = DCA_PARAMS
+MID = (P["total_cost"] * 1.1)  # above total cost, below the PAUSE line: Ahr999 decides
+
+
+def _decide(ahr, mvrv=0.5, selfcalc=False, remaining=600, streak_3x=0, streak_2x=0, price=MID):
+    return decide_action(price, ahr, selfcalc, mvrv, remaining, streak_3x, streak_2x)
+
+
+@pytest.mark.parametrize("price, ahr, action", [
+    (P["total_cost"] * 1.3, 0.1, "PAUSE"),
+    (P["cash_cost"], 2.0, "3x"),
+    (P["total_cost"], 2.0, "2x"),
+    (MID, P["thr_3x"] - 0.01, "3x"),
+    (MID, P["thr_2x"] - 0.01, "2x"),
+    (MID, P["thr_2x"] + 0.01, "1x"),
+])
+def test_multiplier(price, ahr, action):
+    assert _decide(ahr, price=price)[0] == action
+
+
+def test_selfcalc_scales_thresholds_down():
+    ahr = P["thr_3x"] * (1 + P["align_ratio"]) / 2  # between the scaled and the CoinGlass threshold
+    assert _decide(ahr)[0] == "3x"
+    assert _decide(ahr, selfcalc=True)[0] == "2x"
+
+
+@pytest.mark.parametrize("mvrv", [None, 1.5])
+def test_mvrv_blocks_3x(mvrv):
+    action, note, _ = _decide(0.1, mvrv=mvrv)
+    assert action == "2x"
+    assert "block 3x" in note
+
+
+def test_ammo_guardrails_and_fuses():
+    assert _decide(0.1, remaining=P["ammo_no_3x_below"] - 1)[0] == "2x"
+    assert _decide(0.1, remaining=P["ammo_force_1x_below"] - 1)[0] == "1x"
+    assert _decide(0.1, streak_3x=P["fuse_3x_days"])[0] == "2x"
+    assert _decide(P["thr_2x"] - 0.01, mvrv=1.5, streak_2x=P["fuse_2x_days"])[0] == "1x"
+    assert _decide(P["thr_2x"] - 0.01, mvrv=0.5, streak_2x=P["fuse_2x_days"])[0] == "2x"
+
+
+def test_backtest_streak_trips_the_3x_fuse():
+    days = P["fuse_3x_days"] + 5
+    res = run_backtest([MID] * days, [0.1] * days, [0.5] * days, total_units=10_000)
+    assert res["actions"][:P["fuse_3x_days"]] == ["3x"] * P["fuse_3x_days"]
+    assert res["actions"][P["fuse_3x_days"]] == "2x"
+
+
+def test_backtest_selfcalc_matches_the_live_thresholds():
+    ahr = P["thr_3x"] * (1 + P["align_ratio"]) / 2
+    assert run_backtest([MID], [ahr], [0.5])["actions"] == ["3x"]
+    assert run_backtest([MID], [ahr], [0.5], using_selfcalc=True)["actions"] == ["2x"]
+
+
+def test_backfill_csv_is_selfcalc(tmp_path):
+    assert is_selfcalc_csv(["date", "close", "gma200", "expPrice", "ahr999"])
+    assert not is_selfcalc_csv(["date", "close", "ahr999"])
+
+    path = tmp_path / "backfill.csv"
+    ahr = P["thr_3x"] * (1 + P["align_ratio"]) / 2
+    path.write_text(f"date,close,gma200,expPrice,ahr999,mvrvZ\n2026-10-01,{MID},1,1,{ahr},0.5\n")
+    out = subprocess.run([sys.executable, os.path.join(ROOT, "dca_backtest.py"), str(path)],
+                         capture_output=True, text=True, check=True).stdout
+    assert "Thresholds:    self-calc" in out
+    assert "2x=1" in out
@@ -0,0 +1,37 @@
+import datetime as dt
+import math
+
+import exp_fit
+from btc_model import GENESIS
+
+
+def _fit(first: dt.date, last: dt.date, a=5.8, b=-17.0):
+    f = exp_fit.ExpFit()
+    d = first
+    while d <= last:
+        f.push(d, 10 ** (a * math.log10((d - GENESIS).days) + b))
+        d += dt.timedelta(days=1)
+    return f
+
+
+def test_full_history_is_usable_and_recovers_the_curve():
+    f = _fit(dt.date(2010, 7, 18), dt.date(2026, 10, 17))
+    assert f.usable()
+    a, b = f.params()
+    assert abs(a - 5.8) < 1e-6 and abs(b + 17.0) < 1e-5
+    assert f.r2() > 0.999
+
+
+def test_recent_years_only_are_not_usable():
+    # over MIN_POINTS and MIN_SPAN_DAYS, but log10(t) barely moves
+    f = _fit(dt.date(2021, 10, 1), dt.date(2026, 10, 17))
+    assert f.n >= exp_fit.MIN_POINTS and f.span_days() >= exp_fit.MIN_SPAN_DAYS
+    assert f.log_spread() < exp_fit.MIN_LOG_SPREAD
+    assert not f.usable()
+
+
+def test_state_round_trip_keeps_the_spread():
+    f = _fit(dt.date(2012, 1, 1), dt.date(2026, 10, 17))
+    g = exp_fit.ExpFit.from_dict(f.to_dict())
+    assert g.log_spread() == f.log_spread()
+    assert g.usable() == f.usable()
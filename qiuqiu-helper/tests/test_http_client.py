@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+import http_client
+from stub_server import StubServer
+
+URL = "https://api.coinbase.com/v2/prices/BTC-USD/spot"
+
+
+@pytest.fixture
+def stub(qiuqiu_env, monkeypatch):
+    s = StubServer(config={}).start()
+    monkeypatch.setenv("QIUQIU_UPSTREAM_OVERRIDE", s.url)
+    monkeypatch.setattr(http_client, "BREAKER_COOLDOWN_S", 0.2)
+    monkeypatch.setattr(http_client, "backoff_delay", lambda attempt, retry_after=None: 0.0)
+    yield s
+    s.stop()
+
+
+def _state():
+    return http_client._breaker_state().get("coinbase")
+
+
+def _trip(stub):
+    stub.config["error_rate"] = 1.0
+    for _ in range(http_client.BREAKER_THRESHOLD):
+        http_client.get(URL, retries=0)
+    assert http_client._is_open(_state())
+
+
+def test_opens_after_threshold_and_fails_fast(stub):
+    _trip(stub)
+    with pytest.raises(http_client.CircuitOpen):
+        http_client.get(URL, retries=0)
+
+
+def test_half_open_trial_closes_on_success(stub):
+    _trip(stub)
+    stub.config["error_rate"] = 0.0
+    time.sleep(0.25)
+    assert http_client.get(URL, retries=0).status_code == 200
+    assert _state() is None
+
+
+def test_half_open_trial_reopens_on_failure(stub):
+    _trip(stub)
+    time.sleep(0.25)
+    assert http_client.get(URL, retries=0).status_code >= 500
+    with pytest.raises(http_client.CircuitOpen, match="circuit open"):
+        http_client.get(URL, retries=0)
+
+
+def test_only_one_trial_at_a_time(stub):
+    _trip(stub)
+    time.sleep(0.25)
+    assert http_client.breaker_check("coinbase") is True
+    with pytest.raises(http_client.CircuitOpen, match="trial call in flight"):
+        http_client.breaker_check("coinbase")
+
+
+def test_trial_cut_off_by_the_budget_hands_the_token_back(stub):
+    _trip(stub)
+    stub.config["error_rate"] = 0.0
+    time.sleep(0.25)
+    with http_client.deadline(0.0):
+        with pytest.raises(http_client.BudgetExceeded):
+            http_client.get(URL, retries=0)
+    assert not _state().get("trialUntil")
+    # the next caller gets the trial at once, not after BREAKER_TRIAL_S
+    assert http_client.get(URL, retries=0).status_code == 200
+    assert _state() is None
@@ -0,0 +1,64 @@
+import json
+import random
+
+import pytest
+
+from json_stream import iter_array, tail_array
+
+DOC = {
+    "success": True,
+    "msg": "ok",
+    "data": [{"date": f"2026/10/{i:02d}", "ahr999": 0.4 + i / 100, "note": "é→✓"} for i in range(1, 31)],
+    "total_volumes": [[1_700_000_000_000 + i, 1.5e9 + i] for i in range(5)],
+}
+
+
+def _chunks(obj, size: int):
+    raw = json.dumps(obj, ensure_ascii=False, indent=1).encode("utf-8")
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 16])
+def test_any_chunking_gives_the_same_elements(size):
+    # 1-byte chunks split multi-byte UTF-8 characters and numbers across reads
+    envelope = {}
+    assert list(iter_array(_chunks(DOC, size), "data", envelope)) == DOC["data"]
+    assert envelope == {"success": True, "msg": "ok"}
+
+
+def test_read_rest_collects_keys_after_the_array():
+    envelope = {}
+    out = list(iter_array(_chunks(DOC, 5), "data", envelope, read_rest=True))
+    assert len(out) == 30
+    assert envelope["total_volumes"] == DOC["total_volumes"]
+
+
+def test_tail_array_keeps_the_last_n():
+    envelope = {}
+    assert tail_array(_chunks(DOC, 11), "data", 3, envelope) == DOC["data"][-3:]
+    assert envelope["success"] is True
+
+
+def test_numbers_split_at_a_chunk_boundary():
+    raw = b'{"prices": [[1, 123456.789], [2, 1e-7]]}'
+    for cut in range(1, len(raw)):
+        assert list(iter_array([raw[:cut], raw[cut:]], "prices")) == [[1, 123456.789], [2, 1e-7]]
+
+
+@pytest.mark.parametrize("doc, out", [('{}', []), ('{"data": []}', []), ('{"other": [1]}', [])])
+def test_empty_or_missing(doc, out):
+    assert list(iter_array([doc.encode()], "data")) == out
+
+
+@pytest.mark.parametrize("doc", ['[1, 2]', '{"data": [1, 2', '{"data": [1 2]}'])
+def test_malformed(doc):
+    with pytest.raises(ValueError):
+        list(iter_array([doc.encode()], "data"))
+
+
+def test_random_documents_match_json_loads():
+    rng = random.Random(7)
+    for _ in range(50):
+        arr = [[rng.randint(0, 10**13), rng.uniform(-1e6, 1e6)] for _ in range(rng.randint(0, 40))]
+        doc = {"a": rng.random(), "prices": arr, "z": "x" * rng.randint(0, 100)}
+        assert list(iter_array(_chunks(doc, rng.randint(1, 50)), "prices")) == json.loads(json.dumps(arr))
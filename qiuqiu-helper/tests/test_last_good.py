@@ -0,0 +1,76 @@
+import datetime as dt
+
+import dca_daily_report as dca
+import last_good
+from http_client import BudgetExceeded
+from rolling_gma import RollingGMA, save_rolling_gma
+from tracker_store import open_tracker
+
+PRICE = {"price": 60000.0, "venue": "coinbase"}
+MVRV = {"date": "2026-10-17", "value": 0.8, "source": "bitcoin-data.com"}
+CG = {"value": 0.5, "source": "CoinGlass /indicator/ahr999 (2026/10/17)"}
+
+
+def _save_gma_state():
+    # A full GMA200 state on disk: what the self-calc falls back to when its sync fails
+    state = RollingGMA()
+    start = dt.date.today() - dt.timedelta(days=state.window)
+    for i in range(state.window):
+        state.push(start + dt.timedelta(days=i), 50000.0)
+    save_rolling_gma(state)
+
+
+def _inputs(price_res, gma_res, mvrv_res, cg_res):
+    price_res, gma_res, mvrv_res, cg_res, stale = dca._with_last_good(price_res, gma_res, mvrv_res, cg_res)
+    return dca._market_inputs(price_res, gma_res, mvrv_res, None, cg_res, stale)
+
+
+def _history():
+    store = open_tracker(dca.tracker_path(), dca.DEFAULT_TOTAL_UNITS)
+    try:
+        return store.summary()["units_used"], dca.load_today_result()
+    finally:
+        store.close()
+
+
+def test_gma_failure_next_to_fresh_coinglass_is_recorded(qiuqiu_env):
+    _save_gma_state()
+    inputs = _inputs(PRICE, BudgetExceeded("slow sync"), MVRV, CG)
+    assert inputs["error"] is None
+    assert inputs["stale"] == {}
+    assert inputs["ahr"] == CG
+
+    memo = dca.decide_today(inputs)
+    assert memo["result"]["recorded"]
+    units, saved = _history()
+    assert units > 0
+    assert saved is not None
+    assert "Last good" not in dca.render_memo(memo)
+
+
+def test_gma_failure_without_coinglass_uses_the_state_on_disk(qiuqiu_env):
+    _save_gma_state()
+    inputs = _inputs(PRICE, BudgetExceeded("slow sync"), MVRV, None)
+    assert set(inputs["stale"]) == {"gma200"}
+    assert inputs["ahr"]["source"].startswith("selfcalc")
+
+    memo = dca.decide_today(inputs)
+    assert not memo["result"]["recorded"]
+    assert _history() == (0, None)
+
+
+def test_last_good_price_is_shown_but_not_recorded(qiuqiu_env):
+    last_good.remember({"price": PRICE})
+    inputs = _inputs(BudgetExceeded("slow spot"), BudgetExceeded("slow sync"), MVRV, CG)
+    assert set(inputs["stale"]) == {"price"}
+
+    memo = dca.decide_today(inputs)
+    assert not memo["result"]["recorded"]
+    assert _history() == (0, None)
+
+
+def test_last_good_older_than_the_cap_is_not_used(qiuqiu_env, monkeypatch):
+    last_good.remember({"price": PRICE})
+    monkeypatch.setitem(dca.LAST_GOOD_MAX_AGE_S, "price", -1)
+    inputs = _inputs(BudgetExceeded("slow spot"), BudgetExceeded("slow sync"), MVRV, CG)
+    assert inputs["error"].startswith("Error: Price fetch failed")
@@ -0,0 +1,73 @@
+import datetime as dt
+import math
+
+import closes_cache
+import multi_asset
+
+TODAY = dt.date(2026, 10, 18)
+GENESIS = multi_asset.ASSET_GENESIS["ethereum"]
+
+
+def _curve(d: dt.date) -> float:
+    # a power law in days since genesis, with a yearly wobble around it
+    t = (d - GENESIS).days
+    return 10 ** (2.0 * math.log10(t) - 4.5) * (1.1 if d.month < 7 else 0.9)
+
+
+def _write_csv(path, days: int):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("date,close\n")
+        for i in range(days, 0, -1):
+            d = TODAY - dt.timedelta(days=i)
+            f.write(f"{d.isoformat()},{_curve(d)}\n")
+
+
+def _valuation(monkeypatch, days_cached: int, tmp_path):
+    csv_path = tmp_path / "eth.csv"
+    _write_csv(csv_path, days_cached)
+    closes_cache.import_csv("ethereum", str(csv_path))
+    # refreshed today: no request for the history, and one stubbed batched price
+    cached = closes_cache.load_closes_cache(closes_cache.cache_path_for("ethereum"))
+    closes_cache.save_closes_cache(closes_cache.cache_path_for("ethereum"), cached, None, dt.datetime.utcnow().date())
+    monkeypatch.setattr(multi_asset, "fetch_spot_batch",
+                        lambda ids, key=None: {"ethereum": {"price": _curve(TODAY), "change24h": 1.0}})
+    return multi_asset.valuation(["ethereum"], today=TODAY)[0]
+
+
+def test_import_keeps_every_close(qiuqiu_env, tmp_path):
+    csv_path = tmp_path / "eth.csv"
+    _write_csv(csv_path, 2000)
+    assert closes_cache.import_csv("ethereum", str(csv_path)) == 2000
+    assert len(closes_cache.load_closes_cache(closes_cache.cache_path_for("ethereum"))) == 2000
+
+
+def test_history_since_genesis_gets_a_curve(qiuqiu_env, monkeypatch, tmp_path):
+    days = (TODAY - GENESIS).days - 1
+    row = _valuation(monkeypatch, days, tmp_path)
+    assert row["error"] is None
+    assert row["points"] >= days
+    assert abs(row["a"] - 2.0) < 0.1
+    assert row["index"] is not None
+
+
+def test_recent_years_only_get_no_curve(qiuqiu_env, monkeypatch, tmp_path):
+    # long enough, but log10(t) hardly moves over the last 2000 of ~4100 days
+    row = _valuation(monkeypatch, 2000, tmp_path)
+    assert row["index"] is None
+    assert "spread" in row["error"]
+
+
+def test_one_year_of_history_gets_no_curve(qiuqiu_env, monkeypatch, tmp_path):
+    row = _valuation(monkeypatch, 365, tmp_path)
+    assert row["index"] is None
+    assert row["error"].startswith("history too short for a growth curve")
+    assert row["gma200"] is not None
+
+
+def test_rows_without_index_keep_price_and_gma_ratio(qiuqiu_env, monkeypatch, tmp_path, capsys):
+    row = _valuation(monkeypatch, 365, tmp_path)
+    multi_asset.print_valuation([row])
+    line = capsys.readouterr().out.splitlines()[-1]
+    assert f"{row['price']:,.4f}" in line
+    assert f"{row['price'] / row['gma200']:.3f}" in line
+    assert "history too short" in line
@@ -0,0 +1,52 @@
+import datetime as dt
+import fcntl
+import math
+import os
+
+import price_history
+
+
+def _fake_fetch(calls, today):
+    def fetch(days, timeout=20):
+        # the history lock is free while the request runs
+        os.makedirs(price_history.history_dir(), exist_ok=True)
+        with open(os.path.join(price_history.history_dir(), ".lock"), "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        calls.append(days)
+        return {today - dt.timedelta(days=i): (100.0 + i, 1e9) for i in range(days + 1)}
+    return fetch
+
+
+def test_first_sync_then_tail_only(qiuqiu_env, monkeypatch):
+    today = dt.datetime.utcnow().date()
+    calls = []
+    monkeypatch.setattr(price_history, "fetch_market_chart", _fake_fetch(calls, today))
+    price_history.sync(min_days=240)
+    price_history.sync(min_days=240)
+    assert calls == [240, 1]
+    assert price_history.last_day() == today
+
+
+def test_gap_at_the_window_start_doesnt_refetch_the_window(qiuqiu_env, monkeypatch):
+    today = dt.datetime.utcnow().date()
+    start = today - dt.timedelta(days=240)
+    rows = {today - dt.timedelta(days=i): (100.0, None) for i in range(1, 400)}
+    rows[start] = (None, None)  # CoinGecko gap on the first day of the window
+    price_history.write_days(rows)
+    assert math.isnan(price_history.date_range(start, start)[0])
+
+    calls = []
+    monkeypatch.setattr(price_history, "fetch_market_chart", _fake_fetch(calls, today))
+    price_history.sync(min_days=240)
+    price_history.sync(min_days=240)
+    assert calls == [1, 1]
+
+
+def test_window_older_than_the_store_is_fetched(qiuqiu_env, monkeypatch):
+    today = dt.datetime.utcnow().date()
+    price_history.write_days({today - dt.timedelta(days=i): (100.0, None) for i in range(1, 30)})
+    calls = []
+    monkeypatch.setattr(price_history, "fetch_market_chart", _fake_fetch(calls, today))
+    price_history.sync(min_days=240)
+    assert calls == [240]
+    assert len(price_history.dated_closes(241)) == 241
@@ -0,0 +1,66 @@
+import math
+import random
+import statistics
+
+import pulse_monitor as pm
+
+
+def test_rolling_stats_match_the_window():
+    rng = random.Random(3)
+    rs = pm.RollingStats(20)
+    seen = []
+    for i in range(500):
+        # a level shift halfway: the removed values must really leave the statistics
+        x = rng.gauss(0 if i < 250 else 1000, 5)
+        rs.push(x)
+        seen.append(x)
+        win = seen[-20:]
+        assert math.isclose(rs.mean, statistics.fmean(win), rel_tol=1e-9, abs_tol=1e-9)
+        if len(win) > 1:
+            assert math.isclose(rs.std(), statistics.stdev(win), rel_tol=1e-6)
+
+
+def test_zscore_needs_min_samples():
+    rs = pm.RollingStats(50)
+    for x in range(pm.MIN_SAMPLES - 1):
+        rs.push(float(x))
+    assert rs.zscore(100.0) is None
+    rs.push(5.0)
+    assert rs.zscore(100.0) > 10
+
+
+def _sample(price):
+    return {"cb_price": price, "cg_price": price - 5, "change_24h": 0.0}
+
+
+def test_returns_are_normalised_by_elapsed_time():
+    # the same per-√s volatility polled every 5s or every 120s gives the same statistics
+    stds = []
+    for interval in (5.0, 120.0):
+        rng = random.Random(1)
+        m = pm.PulseMonitor()
+        p, t = 100_000.0, 0.0
+        for _ in range(240):
+            t += interval
+            p *= math.exp(rng.gauss(0, 2.0 * math.sqrt(interval)) / 1e4)
+            m.update(_sample(p), t)
+        stds.append(m.returns_long.std())
+    assert all(abs(s - 2.0) < 0.3 for s in stds)
+
+
+def test_volatility_spike_raises_the_ratio_and_speeds_up_polling():
+    rng = random.Random(2)
+    m = pm.PulseMonitor()
+    p, t = 100_000.0, 0.0
+    peak, fastest = 0.0, 30.0
+    for i in range(330):
+        sigma = 1.0 if i < 300 else 6.0
+        wait = m.next_interval(30)
+        t += wait
+        p *= math.exp(rng.gauss(0, sigma * math.sqrt(wait)) / 1e4)
+        m.update(_sample(p), t)
+        if i >= 300:
+            # shortly after onset, before the long window absorbs the spike
+            peak, fastest = max(peak, m.vol_ratio()), min(fastest, m.next_interval(30))
+    assert peak > pm.VOL_SPIKE_RATIO
+    assert fastest < 30 / pm.VOL_SPIKE_RATIO
@@ -0,0 +1,48 @@
+import datetime as dt
+import math
+import random
+
+from btc_model import gma
+from rolling_gma import RollingGMA, load_rolling_gma, save_rolling_gma, sync_rolling_gma
+
+START = dt.date(2026, 1, 1)
+
+
+def _closes(n, seed=5):
+    rng = random.Random(seed)
+    return [(START + dt.timedelta(days=i), rng.uniform(20_000, 120_000)) for i in range(n)]
+
+
+def test_matches_gma_over_the_last_window():
+    g = RollingGMA(200)
+    closes = _closes(1000)
+    for i, (d, p) in enumerate(closes):
+        g.push(d, p)
+        want = gma([c for _, c in closes[max(0, i - 199):i + 1]])
+        assert math.isclose(g.value(), want, rel_tol=1e-12)
+    assert g.is_full()
+
+
+def test_intraday_update_replaces_todays_close():
+    g = RollingGMA(3)
+    for d, p in [(START, 1.0), (START + dt.timedelta(days=1), 2.0), (START + dt.timedelta(days=2), 4.0)]:
+        g.push(d, p)
+    g.push(START + dt.timedelta(days=2), 32.0)
+    assert math.isclose(g.value(), gma([1.0, 2.0, 32.0]))
+    g.push(START, 1000.0)  # older dates are ignored
+    assert math.isclose(g.value(), gma([1.0, 2.0, 32.0]))
+
+
+def test_sync_round_trips_through_disk(qiuqiu_env):
+    closes = _closes(300)
+    sync_rolling_gma(closes[:250])
+    state = sync_rolling_gma(closes[240:])  # overlap: only days from the last one on are pushed
+    assert math.isclose(state.value(), gma([c for _, c in closes[-200:]]), rel_tol=1e-12)
+    assert math.isclose(load_rolling_gma().value(), state.value())
+
+
+def test_save_leaves_no_temp_file(qiuqiu_env):
+    g = RollingGMA(3)
+    g.push(START, 1.0)
+    save_rolling_gma(g)
+    assert [p.name for p in qiuqiu_env.iterdir() if p.name.startswith("btc_gma200")] == ["btc_gma200_state.json"]
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from tracker_store import TrackerStore, open_tracker, tracker_db_path
+
+HISTORY = [
+    {"date": "2026-10-01", "action": "2x", "units": 2, "meta": {"ahr": 0.5}},
+    {"date": "2026-10-02", "action": "3x", "units": 3, "meta": {"ahr": 0.38, "mvrv": None}},
+    {"date": "2026-10-02", "action": "3x", "units": 3},  # duplicate day
+    {"date": "2026-10-03", "action": "3x", "units": 3, "meta": {"mvrv": 0.7}},
+]
+
+
+def _write_json(path, history, units_used=8, total_units=600):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"total_units": total_units, "units_used": units_used, "history": history}, f)
+
+
+def test_record_day_streaks_and_same_day_dedup(tmp_path):
+    store = TrackerStore(str(tmp_path / "t.db"), 600)
+    assert store.is_empty()
+    store.record_day("2026-10-01", "2x", 2, {"ahr": 0.5})
+    store.record_day("2026-10-02", "3x", 3, {"ahr": None})
+    s, inserted = store.record_day("2026-10-03", "3x", 3)
+    assert inserted
+    _, inserted = store.record_day("2026-10-03", "1x", 1)
+    assert not inserted
+
+    s = store.summary()
+    assert s["units_used"] == 8
+    assert store.consecutive_days("3x", s) == 2
+    assert store.consecutive_days("2x", s) == 0
+    assert store.last_meta_value("ahr", s) == 0.5  # None doesn't overwrite
+    assert [h["action"] for h in store.history()] == ["2x", "3x", "3x"]
+    store.close()
+
+
+def test_open_migrates_json_on_first_use(tmp_path):
+    json_path = str(tmp_path / "tracker.json")
+    _write_json(json_path, HISTORY)
+    store = open_tracker(json_path, 600)
+    s = store.summary()
+    assert (s["units_used"], s["last_date"]) == (8, "2026-10-03")
+    assert store.consecutive_days("3x", s) == 2
+    assert s["last_meta"] == {"ahr": 0.38, "mvrv": 0.7}
+    store.record_day("2026-10-04", "1x", 1)
+    store.close()
+
+    # later opens keep the database, not the JSON
+    store = open_tracker(json_path, 600)
+    assert store.summary()["units_used"] == 9
+    store.close()
+
+
+def test_failed_migration_is_retried_not_read_as_empty(tmp_path):
+    json_path = str(tmp_path / "tracker.json")
+    _write_json(json_path, HISTORY + [{"date": "2026-10-04", "action": "1x", "units": "one"}])
+    with pytest.raises(ValueError):
+        open_tracker(json_path, 600)
+
+    # the database file exists now, but nothing was committed: still migrated on next open
+    _write_json(json_path, HISTORY)
+    store = open_tracker(json_path, 600, tracker_db_path(json_path))
+    assert store.summary()["units_used"] == 8
+    store.close()
+
+
+def test_history_items_without_action_are_skipped(tmp_path):
+    json_path = str(tmp_path / "tracker.json")
+    _write_json(json_path, [{"date": "2026-09-30", "units": 0}] + HISTORY)
+    store = open_tracker(json_path, 600)
+    assert len(store.history()) == 3
+    assert store.summary()["units_used"] == 8
+    store.close()
+
+
+def test_new_tracker_without_json(tmp_path):
+    store = open_tracker(str(tmp_path / "missing.json"), 300)
+    s = store.summary()
+    assert (s["total_units"], s["units_used"]) == (300, 0)
+    store.close()
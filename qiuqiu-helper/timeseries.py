@@ -0,0 +1,232 @@
+import datetime as dt
+import math
+import os
+import struct
+import sys
+import time
+
+# Append-only binary time series, one file per metric (e.g. "BTC.funding", "pulse.spread").
+# File layout: 16-byte header (magic, version, record size), then fixed-width
+# little-endian records:
+#   raw series   <name>.ts      (ts int64 unix seconds, value float64)             16 B
+#   rollups      <name>@1h.ts   (ts, count int64, min, max, mean, last float64)    48 B
+#                <name>@1d.ts
+# Appends are a single O_APPEND write per series. Reads memory-map the file and
+# binary-search the (monotonic) ts column, so a range scan only touches the pages it
+# returns. rollup() is incremental: it resumes after the last complete bucket.
+# Recording uses struct only; NumPy is imported by the read/rollup side.
+# QIUQIU_TS_DIR overrides the directory; QIUQIU_TS=off disables recording.
+# Usage: python3 timeseries.py list | query <series> [start] [end] | rollup [series ...]
+
+DEFAULT_DIR = os.path.expanduser("/home/mmogdeveloper/.openclaw/workspace/memory/timeseries")
+MAGIC = b"QQTS"
+VERSION = 1
+HEADER_SIZE = 16
+
+RAW = struct.Struct("<qd")
+ROLLUP = struct.Struct("<qqdddd")
+ROLLUP_FIELDS = ("ts", "count", "min", "max", "mean", "last")
+ROLLUPS = {"1h": 3600, "1d": 86400}
+
+
+def ts_dir() -> str:
+    return os.getenv("QIUQIU_TS_DIR", DEFAULT_DIR)
+
+
+def recording_enabled() -> bool:
+    return os.getenv("QIUQIU_TS", "").lower() not in ("off", "0", "false")
+
+
+def series_path(series: str, rollup: str | None = None) -> str:
+    name = f"{series}@{rollup}" if rollup else series
+    return os.path.join(ts_dir(), f"{name}.ts")
+
+
+def _dtype(rollup: str | None):
+    import numpy as np
+    if rollup:
+        return np.dtype([(f, "<i8" if f in ("ts", "count") else "<f8") for f in ROLLUP_FIELDS])
+    return np.dtype([("ts", "<i8"), ("value", "<f8")])
+
+
+def _header(rec: struct.Struct) -> bytes:
+    return MAGIC + VERSION.to_bytes(4, "little") + rec.size.to_bytes(4, "little") + bytes(4)
+
+
+def _open_append(path: str, rec: struct.Struct) -> int:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o644)
+        os.write(fd, _header(rec))
+        return fd
+    except FileExistsError:
+        return os.open(path, os.O_RDWR | os.O_APPEND)
+
+
+def _check_header(path: str, rec: struct.Struct):
+    with open(path, "rb") as f:
+        head = f.read(HEADER_SIZE)
+    if len(head) < HEADER_SIZE or head[:4] != MAGIC or int.from_bytes(head[8:12], "little") != rec.size:
+        raise ValueError(f"Not a {rec.size}-byte record series file: {path}")
+
+
+def open_series(series: str, rollup: str | None = None):
+    # Read-only memmap of every complete record (empty array if the file doesn't exist).
+    # A torn trailing record (crash mid-append) is ignored.
+    import numpy as np
+    path = series_path(series, rollup)
+    rec, dtype = (ROLLUP if rollup else RAW), _dtype(rollup)
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return np.zeros(0, dtype=dtype)
+    _check_header(path, rec)
+    n = (size - HEADER_SIZE) // rec.size
+    if n <= 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(n,))
+
+
+def _last_ts(fd: int, rec: struct.Struct):
+    size = os.fstat(fd).st_size
+    n = (size - HEADER_SIZE) // rec.size
+    if size > HEADER_SIZE + n * rec.size:
+        # drop a torn trailing record so the next append stays aligned
+        os.ftruncate(fd, HEADER_SIZE + max(n, 0) * rec.size)
+    if n <= 0:
+        return None
+    return rec.unpack(os.pread(fd, rec.size, HEADER_SIZE + (n - 1) * rec.size))[0]
+
+
+def _append(path: str, rec: struct.Struct, rows) -> int:
+    # rows: tuples (ts first) sorted by ts; writes those newer than the file's last ts
+    # (keeps ts monotonic for searchsorted) in one write
+    fd = _open_append(path, rec)
+    try:
+        last = _last_ts(fd, rec)
+        rows = [r for r in rows if last is None or r[0] > last]
+        if rows:
+            os.write(fd, b"".join(rec.pack(*r) for r in rows))
+        return len(rows)
+    finally:
+        os.close(fd)
+
+
+def append(series: str, value: float, ts: float | None = None) -> int:
+    return _append(series_path(series), RAW, [(int(ts if ts is not None else time.time()), value)])
+
+
+def record(prefix: str, values: dict, ts: float | None = None):
+    # One sample per numeric field: record("BTC", {"funding": 0.01, "oi": 2.6e10})
+    # -> BTC.funding, BTC.oi. Never raises: losing a sample must not break the caller.
+    if not recording_enabled():
+        return
+    ts = ts if ts is not None else time.time()
+    for field, v in values.items():
+        if isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v):
+            try:
+                append(f"{prefix}.{field}", float(v), ts)
+            except (OSError, ValueError):
+                pass
+
+
+def query(series: str, start: float | None = None, end: float | None = None, rollup: str | None = None):
+    # Records with start <= ts < end, as a NumPy structured array (copied out of the memmap)
+    import numpy as np
+    recs = open_series(series, rollup)
+    ts = recs["ts"]
+    lo = 0 if start is None else int(np.searchsorted(ts, int(start), side="left"))
+    hi = len(recs) if end is None else int(np.searchsorted(ts, int(end), side="left"))
+    return np.array(recs[lo:hi])
+
+
+def query_arrays(series: str, start: float | None = None, end: float | None = None):
+    # (ts int64 array, value float64 array) for a raw series
+    r = query(series, start, end)
+    return r["ts"], r["value"]
+
+
+def aggregate_buckets(ts, values, width: int):
+    # Vectorized bucket stats for sorted samples: one ROLLUP record per non-empty bucket
+    import numpy as np
+    out = np.zeros(0, dtype=_dtype("1h"))
+    if len(ts) == 0:
+        return out
+    bucket = ts // width
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(ts)]
+    out = np.zeros(len(starts), dtype=out.dtype)
+    out["ts"] = bucket[starts] * width
+    out["count"] = ends - starts
+    out["min"] = np.minimum.reduceat(values, starts)
+    out["max"] = np.maximum.reduceat(values, starts)
+    out["mean"] = np.add.reduceat(values, starts) / out["count"]
+    out["last"] = values[ends - 1]
+    return out
+
+
+def rollup(series: str, name: str, now: float | None = None) -> int:
+    # Appends the complete buckets not rolled up yet; the current bucket waits until it closes
+    width = ROLLUPS[name]
+    now = int(now if now is not None else time.time())
+    done = open_series(series, name)
+    resume = int(done["ts"][-1]) + width if len(done) else None
+    cutoff = now - now % width
+    r = query(series, resume, cutoff)
+    return _append(series_path(series, name), ROLLUP, aggregate_buckets(r["ts"], r["value"], width).tolist())
+
+
+def list_series():
+    try:
+        names = sorted(f[:-3] for f in os.listdir(ts_dir()) if f.endswith(".ts"))
+    except FileNotFoundError:
+        return []
+    return [n for n in names if "@" not in n]
+
+
+def rollup_all(series=None, now: float | None = None):
+    # {series: {rollup: records written}}; meant for a cron job
+    return {s: {name: rollup(s, name, now) for name in ROLLUPS} for s in (series or list_series())}
+
+
+def _parse_time(s: str) -> float:
+    try:
+        return float(s)
+    except ValueError:
+        d = dt.datetime.fromisoformat(s)
+        if d.tzinfo is None:
+            d = d.replace(tzinfo=dt.timezone.utc)
+        return d.timestamp()
+
+
+def main():
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "list"
+    if cmd == "list":
+        for s in list_series():
+            recs = open_series(s)
+            if len(recs):
+                first = dt.datetime.fromtimestamp(int(recs["ts"][0]), dt.timezone.utc)
+                last = dt.datetime.fromtimestamp(int(recs["ts"][-1]), dt.timezone.utc)
+                print(f"{s:<28} {len(recs):>9} pts  {first:%Y-%m-%d %H:%M} → {last:%Y-%m-%d %H:%M}")
+    elif cmd == "query" and len(sys.argv) > 2:
+        start = _parse_time(sys.argv[3]) if len(sys.argv) > 3 else None
+        end = _parse_time(sys.argv[4]) if len(sys.argv) > 4 else None
+        series, _, name = sys.argv[2].partition("@")
+        recs = query(series, start, end, name or None)
+        for rec in recs:
+            when = dt.datetime.fromtimestamp(int(rec["ts"]), dt.timezone.utc).isoformat()
+            if name:
+                print(f"{when}  n={rec['count']} min={rec['min']:.6g} max={rec['max']:.6g} mean={rec['mean']:.6g} last={rec['last']:.6g}")
+            else:
+                print(f"{when}  {rec['value']:.6g}")
+    elif cmd == "rollup":
+        for s, written in rollup_all(sys.argv[2:] or None).items():
+            print(f"{s:<28} " + "  ".join(f"{k}+{v}" for k, v in written.items()))
+    else:
+        print("Usage: python3 timeseries.py list | query <series[@1h|@1d]> [start] [end] | rollup [series ...]")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import json
+import os
+import sqlite3
+import sys
+
+# SQLite backend for the DCA ammo tracker (replaces rewriting dca_ammo_tracker.json).
+# - history rows keyed by date (PRIMARY KEY = date index, same-day dedup)
+# - running state kept up to date on every write: units_used, current streak
+#   (action + length), last date and the most recent non-null value of each meta key,
+#   so the report never scans history
+# - writes run in BEGIN IMMEDIATE transactions (WAL), so concurrent runs serialize
+#   instead of losing an update
+# Usage: python3 tracker_store.py migrate <tracker.json> [tracker.db]
+#        python3 tracker_store.py show <tracker.db>
+
+BUSY_TIMEOUT_S = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    date   TEXT PRIMARY KEY,
+    action TEXT NOT NULL,
+    units  INTEGER NOT NULL,
+    meta   TEXT
+);
+"""
+
+
+def tracker_db_path(json_path: str) -> str:
+    return os.path.splitext(json_path)[0] + ".db"
+
+
+class TrackerStore:
+    def __init__(self, path: str, total_units: int):
+        self.path = path
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(
+            "INSERT OR IGNORE INTO state (key, value) VALUES ('total_units', ?)", (str(total_units),)
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def _state(self):
+        rows = self.conn.execute("SELECT key, value FROM state").fetchall()
+        return {k: json.loads(v) for k, v in rows}
+
+    def summary(self) -> dict:
+        st = self._state()
+        return {
+            "total_units": int(st.get("total_units", 0)),
+            "units_used": int(st.get("units_used", 0)),
+            "streak_action": st.get("streak_action"),
+            "streak_days": int(st.get("streak_days", 0)),
+            "last_date": st.get("last_date"),
+            "last_meta": st.get("last_meta") or {},
+        }
+
+    def is_empty(self) -> bool:
+        # Nothing recorded yet (new database, or a migration that never committed)
+        return not self.conn.execute("SELECT 1 FROM history LIMIT 1").fetchone() and "units_used" not in self._state()
+
+    def consecutive_days(self, action: str, summary: dict | None = None) -> int:
+        s = summary or self.summary()
+        return s["streak_days"] if s["streak_action"] == action else 0
+
+    def last_meta_value(self, key: str, summary: dict | None = None):
+        s = summary or self.summary()
+        return s["last_meta"].get(key)
+
+    def record_day(self, date: str, action: str, units: int, meta: dict | None = None):
+        # Returns (summary, inserted). A second write for the same date is a no-op.
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            st = self._state()
+            if st.get("last_date") == date or self.conn.execute(
+                "SELECT 1 FROM history WHERE date = ?", (date,)
+            ).fetchone():
+                self.conn.execute("COMMIT")
+                return self.summary(), False
+
+            self.conn.execute(
+                "INSERT INTO history (date, action, units, meta) VALUES (?, ?, ?, ?)",
+                (date, action, units, json.dumps(meta, ensure_ascii=False) if meta else None),
+            )
+            self._advance(st, date, action, units, meta)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return self.summary(), True
+
+    def _advance(self, st: dict, date: str, action: str, units: int, meta: dict | None):
+        streak_days = int(st.get("streak_days", 0)) + 1 if st.get("streak_action") == action else 1
+        last_meta = st.get("last_meta") or {}
+        for k, v in (meta or {}).items():
+            if v is not None:
+                last_meta[k] = v
+        updates = {
+            "units_used": int(st.get("units_used", 0)) + units,
+            "streak_action": action,
+            "streak_days": streak_days,
+            "last_date": date,
+            "last_meta": last_meta,
+        }
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+            [(k, json.dumps(v, ensure_ascii=False)) for k, v in updates.items()],
+        )
+        st.update(updates)
+
+    def history(self, start: str | None = None, end: str | None = None):
+        q = "SELECT date, action, units, meta FROM history WHERE date >= ? AND date <= ? ORDER BY date"
+        rows = self.conn.execute(q, (start or "", end or "9999-12-31")).fetchall()
+        out = []
+        for d, a, u, m in rows:
+            entry = {"date": d, "action": a, "units": u}
+            if m:
+                entry["meta"] = json.loads(m)
+            out.append(entry)
+        return out
+
+
+def migrate_json(json_path: str, db_path: str, total_units: int = 600) -> TrackerStore:
+    # One-shot import of dca_ammo_tracker.json (history order and units_used are kept as-is),
+    # in one transaction: a failed import leaves the database empty, and the next open retries
+    with open(json_path, "r", encoding="utf-8") as f:
+        tracker = json.load(f)
+
+    store = TrackerStore(db_path, int(tracker.get("total_units", total_units)))
+    store.conn.execute("BEGIN IMMEDIATE")
+    try:
+        if not store.is_empty():
+            store.conn.execute("COMMIT")
+            return store  # already migrated
+
+        st = {}
+        for item in tracker.get("history", []):
+            date = item.get("date")
+            action = item.get("action")
+            if not date or not action or st.get("last_date") == date:
+                continue
+            units = int(item.get("units", 0))
+            meta = item.get("meta")
+            cur = store.conn.execute(
+                "INSERT OR IGNORE INTO history (date, action, units, meta) VALUES (?, ?, ?, ?)",
+                (date, action, units, json.dumps(meta, ensure_ascii=False) if meta else None),
+            )
+            if cur.rowcount:
+                store._advance(st, date, action, units, meta)
+
+        store.conn.executemany(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+            [
+                ("total_units", json.dumps(int(tracker.get("total_units", total_units)))),
+                ("units_used", json.dumps(int(tracker.get("units_used", st.get("units_used", 0))))),
+            ],
+        )
+        store.conn.execute("COMMIT")
+    except BaseException:
+        store.conn.execute("ROLLBACK")
+        store.close()
+        raise
+    return store
+
+
+def open_tracker(json_path: str, total_units: int, db_path: str | None = None) -> TrackerStore:
+    # Opens the SQLite tracker next to the legacy JSON file, migrating it while the database
+    # is still empty (not just missing: an import that failed must not read as a fresh tracker)
+    db_path = db_path or tracker_db_path(json_path)
+    store = TrackerStore(db_path, total_units)
+    if os.path.exists(json_path) and store.is_empty():
+        store.close()
+        return migrate_json(json_path, db_path, total_units)
+    return store
+
+
+def main():
+    if len(sys.argv) >= 3 and sys.argv[1] == "migrate":
+        json_path = sys.argv[2]
+        db_path = sys.argv[3] if len(sys.argv) > 3 else tracker_db_path(json_path)
+        store = migrate_json(json_path, db_path)
+        s = store.summary()
+        print(f"Migrated {json_path} → {db_path}: used {s['units_used']}/{s['total_units']}, last {s['last_date']}")
+    elif len(sys.argv) >= 3 and sys.argv[1] == "show":
+        store = TrackerStore(sys.argv[2], 600)
+        print(json.dumps(store.summary(), ensure_ascii=False, indent=2))
+    else:
+        print("Usage: python3 tracker_store.py migrate <tracker.json> [tracker.db] | show <tracker.db>")
+
+
+if __name__ == "__main__":
+    main()